@@ -0,0 +1,374 @@
+"""
+Saved-search alerts over the scraped contracts.
+
+Every contract of a run is added to a persistent inverted index (SQLite): for each word of its
+name, department and attachment file names, a posting row points back to its Notice ID.
+Contracts whose text has not changed since they were last indexed are not re-tokenized, so
+each run only indexes what is new.
+
+Alert rules are read from a JSON file (ALERT_RULES_PATH), a list of objects such as
+
+  {"name": "Zero trust", "keywords": ["zero trust", "ztna"], "fields": ["name", "file_names"]}
+  {"name": "DoD cloud due soon", "keywords": ["cloud"], "departments": ["DEPT OF DEFENSE"],
+   "due_within_days": 14}
+
+  keywords         any of these words or phrases (a phrase matches consecutive words)
+  departments      any of these departments (all of its words appear in the department)
+  due_within_days  offers due within this many days of the evaluation
+  fields           where keywords are searched: name, department, file_names (default: all)
+
+A rule matches a contract when every condition it sets holds. Rules are evaluated from the
+posting lists of the words they mention, fetched once per word for all rules together, so the
+cost grows with the number of matching postings rather than with rules x contracts.
+Matches are written to a separate alert report CSV.
+"""
+import argparse
+import bisect
+import csv
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from file_numbers import next_file_number
+from sam_dates import parse_sam_datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    notice_id TEXT PRIMARY KEY,
+    contract_name TEXT,
+    department TEXT,
+    contract_link TEXT,
+    file_names TEXT NOT NULL,
+    due_at TEXT,
+    fingerprint TEXT NOT NULL,
+    last_run TEXT,
+    indexed_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    field TEXT NOT NULL,
+    notice_id TEXT NOT NULL,
+    PRIMARY KEY (token, field, notice_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS postings_notice_idx ON postings (notice_id);
+"""
+
+FIELDS = ["name", "department", "file_names"]
+TOKEN = re.compile(r"[a-z0-9]+")
+REPORT_COLUMNS = ["Rule", "Notice ID", "Contract Name", "Department", "Offers Due", "Contract Link", "Matched"]
+SQL_BATCH = 500  # Host parameters per query, well below SQLite's limit
+
+
+def tokenize(text):
+    return TOKEN.findall((text or "").lower())
+
+
+def contains_sequence(tokens, phrase):
+    """True if `phrase` (a list of tokens) occurs as consecutive tokens in `tokens`."""
+    size = len(phrase)
+    return any(tokens[i:i + size] == phrase for i in range(len(tokens) - size + 1) if tokens[i] == phrase[0])
+
+
+def _batches(items, size=SQL_BATCH):
+    items = iter(items)
+    while batch := list(itertools.islice(items, size)):
+        yield batch
+
+
+class AlertRule:
+    """One saved search, parsed from its JSON object."""
+
+    def __init__(self, spec):
+        self.name = spec.get("name") or "Unnamed rule"
+        unknown = set(spec) - {"name", "keywords", "departments", "due_within_days", "fields"}
+        if unknown:
+            raise ValueError(f"Alert rule {self.name!r} has unknown keys: {', '.join(sorted(unknown))}")
+        keywords = spec.get("keywords") or []
+        departments = spec.get("departments") or []
+        # Terms are kept as token tuples; a multi-word term is a phrase
+        self.keywords = [tuple(tokenize(term)) for term in ([keywords] if isinstance(keywords, str) else keywords)]
+        self.keywords = [term for term in self.keywords if term]
+        self.departments = [tuple(tokenize(department)) for department in
+                            ([departments] if isinstance(departments, str) else departments)]
+        self.departments = [department for department in self.departments if department]
+        self.due_within_days = spec.get("due_within_days")
+        self.fields = spec.get("fields") or FIELDS
+        if set(self.fields) - set(FIELDS):
+            raise ValueError(f"Alert rule {self.name!r} has unknown fields; use {', '.join(FIELDS)}")
+        if not (self.keywords or self.departments or self.due_within_days is not None):
+            raise ValueError(f"Alert rule {self.name!r} has no conditions")
+
+    def tokens(self):
+        """Every (token, field) posting list the rule needs."""
+        needed = {(token, field) for term in self.keywords for token in term for field in self.fields}
+        needed.update((token, "department") for department in self.departments for token in department)
+        return needed
+
+
+def load_rules(path):
+    """Parse the JSON rules file at `path` into AlertRules."""
+    with open(path, encoding="utf-8") as file:
+        return [AlertRule(spec) for spec in json.load(file)]
+
+
+def read_run_contracts(csv_path):
+    """
+    Stream a combined CSV and yield one dict per contract with its Notice ID, name, department,
+    link, offers due date and attachment file names (attachment rows carry only the file name).
+    Contracts without a Notice ID (failed rows) and the summary row are skipped.
+    """
+    contract = None
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            if row.get("Contract Number") == "Summary":
+                continue
+            if row.get("Notice ID") or row.get("Contract Name"):
+                if contract and contract["notice_id"]:
+                    yield contract
+                contract = {
+                    "notice_id": row.get("Notice ID") or "",
+                    "name": row.get("Contract Name") or "",
+                    "department": row.get("Department") or "",
+                    "link": row.get("Contract Link") or "",
+                    "due": row.get("Updated Date Offers Due") or row.get("Original Date Offers Due") or "",
+                    "file_names": [],
+                }
+            if contract is not None and row.get("File Name"):
+                contract["file_names"].append(row["File Name"])
+    if contract and contract["notice_id"]:
+        yield contract
+
+
+class AlertIndex:
+    """Persistent inverted index of contract words, backed by SQLite at `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def update(self, contracts, run_timestamp=None):
+        """
+        Add or refresh contracts (as yielded by read_run_contracts) in the index, in batches.
+        Only contracts whose text changed since they were last indexed get new postings.
+        Returns the list of Notice IDs seen, in order.
+        """
+        seen, reindexed = [], 0
+        with self.conn:
+            for batch in _batches(contracts):
+                seen.extend(contract["notice_id"] for contract in batch)
+                reindexed += self._update_batch(batch, run_timestamp)
+        logging.info(f"Alert index: {len(seen)} contracts seen, {reindexed} new or changed contracts indexed.")
+        return seen
+
+    def _update_batch(self, contracts, run_timestamp):
+        now = datetime.now().isoformat(timespec="seconds")
+        parse = functools.lru_cache(maxsize=1024)(parse_sam_datetime)
+        marks = ",".join("?" * len(contracts))
+        fingerprints = dict(self.conn.execute(
+            f"SELECT notice_id, fingerprint FROM documents WHERE notice_id IN ({marks})",
+            [contract["notice_id"] for contract in contracts]
+        ))
+        documents, changed = [], []
+        for contract in contracts:
+            texts = {
+                "name": contract["name"],
+                "department": contract["department"],
+                "file_names": "\n".join(contract["file_names"]),
+            }
+            fingerprint = hashlib.sha256(json.dumps(texts, sort_keys=True).encode("utf-8")).hexdigest()
+            due = parse(contract["due"])
+            documents.append((
+                contract["notice_id"], contract["name"], contract["department"], contract["link"],
+                json.dumps(contract["file_names"]), due.astimezone(timezone.utc).isoformat() if due else None,
+                fingerprint, run_timestamp, now
+            ))
+            if fingerprints.get(contract["notice_id"]) != fingerprint:
+                changed.append((contract["notice_id"], texts))
+
+        self.conn.executemany(
+            """
+            INSERT INTO documents (notice_id, contract_name, department, contract_link, file_names,
+                                   due_at, fingerprint, last_run, indexed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (notice_id) DO UPDATE SET
+                contract_name = excluded.contract_name, department = excluded.department,
+                contract_link = excluded.contract_link, file_names = excluded.file_names,
+                due_at = excluded.due_at, fingerprint = excluded.fingerprint,
+                last_run = excluded.last_run,
+                indexed_at = CASE WHEN documents.fingerprint = excluded.fingerprint
+                                  THEN documents.indexed_at ELSE excluded.indexed_at END
+            """,
+            documents
+        )
+        self.conn.executemany("DELETE FROM postings WHERE notice_id = ?", [(notice_id,) for notice_id, _ in changed])
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO postings (token, field, notice_id) VALUES (?, ?, ?)",
+            [(token, field, notice_id) for notice_id, texts in changed
+             for field, text in texts.items() for token in set(tokenize(text))]
+        )
+        return len(changed)
+
+    def _postings(self, needed, scope):
+        """Posting sets for the (token, field) pairs in `needed`, restricted to `scope` if given."""
+        postings = {key: set() for key in needed}
+        tokens = sorted({token for token, _ in needed})
+        for batch in _batches(tokens):
+            marks = ",".join("?" * len(batch))
+            for token, field, notice_id in self.conn.execute(
+                    f"SELECT token, field, notice_id FROM postings WHERE token IN ({marks})", batch):
+                if (token, field) in postings and (scope is None or notice_id in scope):
+                    postings[(token, field)].add(notice_id)
+        return postings
+
+    def _documents(self, notice_ids):
+        documents = {}
+        for batch in _batches(notice_ids):
+            marks = ",".join("?" * len(batch))
+            for row in self.conn.execute(
+                    f"SELECT notice_id, contract_name, department, contract_link, file_names, due_at "
+                    f"FROM documents WHERE notice_id IN ({marks})", batch):
+                documents[row[0]] = {
+                    "name": row[1], "department": row[2], "link": row[3],
+                    "file_names": json.loads(row[4]), "due_at": row[5],
+                }
+        return documents
+
+    def _due_dates(self, scope):
+        """Sorted (due_at, notice_id) pairs of the documents in `scope` (or all) that have a due date."""
+        if scope is None:
+            rows = self.conn.execute("SELECT due_at, notice_id FROM documents WHERE due_at IS NOT NULL").fetchall()
+        else:
+            rows = []
+            for batch in _batches(scope):
+                marks = ",".join("?" * len(batch))
+                rows.extend(self.conn.execute(
+                    f"SELECT due_at, notice_id FROM documents WHERE due_at IS NOT NULL AND notice_id IN ({marks})",
+                    batch
+                ))
+        return sorted(rows)
+
+    def evaluate(self, rules, notice_ids=None, now=None):
+        """
+        Match `rules` against the indexed contracts in `notice_ids` (default: every contract).
+        Returns a list of (rule, notice_id, matched terms) in rule order.
+        """
+        scope = set(notice_ids) if notice_ids is not None else None
+        now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(microsecond=0)
+        needed = set().union(*(rule.tokens() for rule in rules)) if rules else set()
+        postings = self._postings(needed, scope)
+        due_dates = self._due_dates(scope) if any(rule.due_within_days is not None for rule in rules) else []
+        due_keys = [due_at for due_at, _ in due_dates]
+        tokens = {}  # Per-field token lists of documents whose phrases need checking, fetched in batches
+
+        def phrase_holds(notice_id, term, fields):
+            return any(contains_sequence(field_tokens, list(term))
+                       for field in fields for field_tokens in tokens[notice_id][field])
+
+        def term_matches(term, fields):
+            per_field = [set.intersection(*(postings[(token, field)] for token in term)) for field in fields]
+            found = set().union(*per_field)
+            if len(term) > 1:
+                for notice_id, document in self._documents(found - tokens.keys()).items():
+                    tokens[notice_id] = {
+                        "name": [tokenize(document["name"])],
+                        "department": [tokenize(document["department"])],
+                        "file_names": [tokenize(name) for name in document["file_names"]],
+                    }
+                found = {notice_id for notice_id in found if phrase_holds(notice_id, term, fields)}
+            return found
+
+        matches = []
+        for rule in rules:
+            conditions = []
+            matched_terms = {}
+            if rule.keywords:
+                keyword_hits = set()
+                for term in rule.keywords:
+                    found = term_matches(term, rule.fields)
+                    for notice_id in found:
+                        matched_terms.setdefault(notice_id, []).append(" ".join(term))
+                    keyword_hits |= found
+                conditions.append(keyword_hits)
+            if rule.departments:
+                conditions.append(set().union(*(
+                    set.intersection(*(postings[(token, "department")] for token in department))
+                    for department in rule.departments
+                )))
+            if rule.due_within_days is not None:
+                start = bisect.bisect_left(due_keys, now.isoformat())
+                end = bisect.bisect_right(due_keys, (now + timedelta(days=rule.due_within_days)).isoformat())
+                conditions.append({notice_id for _, notice_id in due_dates[start:end]})
+            # Intersect starting from the smallest set
+            conditions.sort(key=len)
+            hits = conditions[0].intersection(*conditions[1:])
+            matches.extend((rule, notice_id, matched_terms.get(notice_id, [])) for notice_id in sorted(hits))
+        return matches
+
+    def write_report(self, matches, report_path):
+        """Write the matches as a CSV with one row per (rule, contract). Returns the number of rows."""
+        documents = self._documents({notice_id for _, notice_id, _ in matches})
+        with open(report_path, "w", newline="", encoding="utf-8") as report:
+            writer = csv.DictWriter(report, fieldnames=REPORT_COLUMNS)
+            writer.writeheader()
+            for rule, notice_id, terms in matches:
+                document = documents[notice_id]
+                writer.writerow({
+                    "Rule": rule.name,
+                    "Notice ID": notice_id,
+                    "Contract Name": document["name"],
+                    "Department": document["department"],
+                    "Offers Due": document["due_at"] or "",
+                    "Contract Link": document["link"],
+                    "Matched": "; ".join(terms),
+                })
+        return len(matches)
+
+    def close(self):
+        self.conn.close()
+
+
+def alert_report_path(directory, run_timestamp):
+    """Path of a run's alert report, numbered by the alerts_ counter in `directory`."""
+    return os.path.join(directory, f"alerts_{next_file_number(directory, 'alerts_')}_{run_timestamp}.csv")
+
+
+def run_alerts(csv_path, rules_path, index_path, report_path, run_timestamp=None):
+    """
+    Index the contracts of a run's combined CSV and write the alert report of the rules
+    in `rules_path` matched by them. Returns the number of matches.
+    """
+    rules = load_rules(rules_path)
+    index = AlertIndex(index_path)
+    try:
+        notice_ids = index.update(read_run_contracts(csv_path), run_timestamp)
+        matches = index.evaluate(rules, notice_ids)
+        index.write_report(matches, report_path)
+    finally:
+        index.close()
+    logging.info(f"{len(matches)} alert matches for {len(rules)} rules over {len(notice_ids)} contracts "
+                 f"written to {report_path}")
+    return len(matches)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Evaluate the alert rules against the whole alert index.")
+    parser.add_argument("rules", help="JSON rules file (ALERT_RULES_PATH)")
+    parser.add_argument("index", help="Alert index database (ALERT_INDEX_PATH)")
+    parser.add_argument("report", help="Alert report CSV to write")
+    args = parser.parse_args()
+    alert_index = AlertIndex(args.index)
+    try:
+        alert_index.write_report(alert_index.evaluate(load_rules(args.rules)), args.report)
+    finally:
+        alert_index.close()
@@ -0,0 +1,114 @@
+"""
+Compare page load time and browser memory between the "default" and "lean" browser profiles.
+
+Each page is loaded once per profile in a fresh driver per profile. For every page the
+script records:
+  - load:      wall-clock seconds for driver.get() plus the wait for the page's content
+  - resources: number of resources the page requested (Resource Timing API)
+  - rss:       resident memory of Firefox and geckodriver (all processes) after the load
+
+Uses the .env configuration of main.py. Memory measurement needs psutil.
+
+Usage:
+    python benchmarks/bench_browser_profile.py <contract links or final_combined_data CSV> [--limit N]
+    python benchmarks/bench_browser_profile.py --search   # also include the search results page
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from bench_detail_extraction import load_links  # noqa: E402
+
+try:
+    import psutil
+except ImportError:  # Memory is reported as n/a without psutil
+    psutil = None
+
+PROFILES = ["default", "lean"]
+
+
+def browser_rss_mb(driver):
+    """Resident memory of geckodriver and every Firefox process it started, in MiB."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (psutil.Error, AttributeError):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+def page_content_ready(driver):
+    """Either a contract detail page or a search results page has rendered its content."""
+    return main.EC.presence_of_element_located((main.By.ID, "general-original-published-date"))(driver) or \
+        main.result_notice_ids(driver)
+
+
+def measure_page(driver, url):
+    """Load `url` and return (seconds, resource count, rss MiB)."""
+    start = time.perf_counter()
+    driver.get(url)
+    try:
+        main.wait_until(driver, page_content_ready, main.SEARCH_WAIT_TIMEOUT)
+    except main.TimeoutException:
+        print(f"  content did not appear before the timeout: {url}")
+    seconds = time.perf_counter() - start
+    resources = driver.execute_script("return performance.getEntriesByType('resource').length;")
+    return seconds, resources, browser_rss_mb(driver)
+
+
+def summarize(profile, results):
+    loads = sorted(result[0] for result in results)
+    p95 = loads[min(len(loads) - 1, int(round(0.95 * (len(loads) - 1))))]
+    rss = [result[2] for result in results if result[2] is not None]
+    memory = f"mean rss={statistics.mean(rss):.0f}MiB peak rss={max(rss):.0f}MiB" if rss else "rss=n/a"
+    print(f"{profile:<8} n={len(loads):<4} mean={statistics.mean(loads):.2f}s p50={statistics.median(loads):.2f}s "
+          f"p95={p95:.2f}s resources/page={statistics.mean(result[1] for result in results):.0f} {memory}")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", help="Contract links or CSV files with a 'Contract Link' column")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of contract pages to benchmark")
+    parser.add_argument("--search", action="store_true", help="Also load TARGET_URL (the search results page)")
+    args = parser.parse_args()
+
+    urls = ([main.TARGET_URL] if args.search else []) + load_links(args.sources, args.limit)
+    if not urls:
+        sys.exit("No pages to benchmark.")
+
+    results = {profile: [] for profile in PROFILES}
+    for profile in PROFILES:
+        driver = main.initialize_driver(profile)
+        try:
+            for url in urls:
+                seconds, resources, rss = measure_page(driver, url)
+                results[profile].append((seconds, resources, rss))
+                memory = f"{rss:6.0f}MiB" if rss is not None else "   n/a"
+                print(f"{profile:<8} {seconds:6.2f}s  {resources:>4} resources  {memory}  {url}")
+        finally:
+            driver.quit()
+
+    print()
+    for profile in PROFILES:
+        summarize(profile, results[profile])
+    speedup = sum(r[0] for r in results["default"]) / max(sum(r[0] for r in results["lean"]), 1e-9)
+    print(f"The lean profile loads pages {speedup:.1f}x faster.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s")
+    main_benchmark()
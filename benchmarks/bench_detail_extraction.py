@@ -0,0 +1,86 @@
+"""
+Compare per-contract latency of the two detail-page extraction paths:
+  - per-element: one explicit wait per date field and per attachment row
+  - snapshot:    one DOM snapshot script for all dates and the attachment table
+
+Each contract page is loaded once per path with the same pooled driver, and the
+page load plus extraction is timed. Uses the .env configuration of main.py.
+
+Usage:
+    python benchmarks/bench_detail_extraction.py <contract links or final_combined_data CSV> [--limit N]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import pandas as pd  # noqa: E402
+
+
+def load_links(sources, limit):
+    """Collect contract links from URLs given directly or from the "Contract Link" column of CSVs."""
+    links = []
+    for source in sources:
+        if source.endswith(".csv"):
+            links.extend(link for link in pd.read_csv(source)["Contract Link"].dropna() if link)
+        else:
+            links.append(source)
+    return links[:limit] if limit else links
+
+
+def time_extraction(driver, contract_link, extract):
+    """Load `contract_link` and run `extract`, returning (seconds, attachment count)."""
+    start = time.perf_counter()
+    driver.get(contract_link)
+    details = extract(driver, contract_link)
+    return time.perf_counter() - start, len(details[0]) if details else 0
+
+
+def summarize(name, durations):
+    durations = sorted(durations)
+    p95 = durations[min(len(durations) - 1, int(round(0.95 * (len(durations) - 1))))]
+    print(f"{name:<12} n={len(durations):<4} mean={statistics.mean(durations):.2f}s "
+          f"p50={statistics.median(durations):.2f}s p95={p95:.2f}s total={sum(durations):.1f}s")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", help="Contract links or CSV files with a 'Contract Link' column")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of contracts to benchmark")
+    args = parser.parse_args()
+
+    links = load_links(args.sources, args.limit)
+    if not links:
+        sys.exit("No contract links to benchmark.")
+
+    paths = {
+        "per-element": main.extract_details_per_element,
+        "snapshot": lambda driver, contract_link: main.extract_detail_snapshot(driver),
+    }
+    durations = {name: [] for name in paths}
+    driver_pool = main.DriverPool(size=1)
+    try:
+        for contract_link in links:
+            for name, extract in paths.items():
+                with driver_pool.driver() as driver:
+                    seconds, attachments = time_extraction(driver, contract_link, extract)
+                durations[name].append(seconds)
+                print(f"{name:<12} {seconds:6.2f}s  {attachments:>3} attachments  {contract_link}")
+    finally:
+        driver_pool.close()
+
+    print()
+    for name, values in durations.items():
+        summarize(name, values)
+    speedup = sum(durations["per-element"]) / max(sum(durations["snapshot"]), 1e-9)
+    print(f"Snapshot extraction is {speedup:.1f}x faster per contract.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s")
+    main_benchmark()
@@ -0,0 +1,164 @@
+"""
+Offline throughput benchmark: run the scraper against a synthetic copy of SAM.gov served locally.
+
+A synthetic site (see synthetic_site.py) is generated in a temporary directory and served by
+stub_server.py. The benchmark then runs both scraper phases against it:
+  - search:  scrape_contracts over every results page
+  - details: scrape_attachments for every contract (through scrape_all_attachments)
+and reports contracts/second, per-page latency (p50/p95 from the run metrics) and the peak
+resident memory of the scraper plus its browsers. Results do not depend on SAM.gov's load,
+so runs before and after a change are directly comparable.
+
+Uses GECKO_DRIVER_PATH and the other .env settings of main.py. Peak RSS needs psutil.
+
+Usage:
+    python benchmarks/bench_offline.py [--pages 5] [--results-per-page 25] [--attachments 3]
+                                       [--workers 1] [--render-delay-ms 50] [--output report.json]
+"""
+import argparse
+import logging
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from metrics import METRICS  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+from synthetic_site import generate_site  # noqa: E402
+
+try:
+    import psutil
+except ImportError:  # Peak RSS is reported as n/a without psutil
+    psutil = None
+
+
+class PeakRssSampler:
+    """Samples the RSS of this process and all of its children (geckodriver, Firefox) in the background."""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _sample(self):
+        root = psutil.Process()
+        total = 0
+        for process in [root] + root.children(recursive=True):
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if psutil is not None:
+            self._thread.join()
+            self._sample()
+
+    @property
+    def peak_mb(self):
+        return round(self.peak_bytes / (1024 * 1024), 1) if psutil is not None else None
+
+
+def phase_report(contracts, seconds, stages, peak_mb):
+    return {
+        "contracts": contracts,
+        "seconds": round(seconds, 2),
+        "contracts_per_second": round(contracts / seconds, 2) if seconds else None,
+        "peak_rss_mb": peak_mb,
+        "stages": {stage: METRICS.stage_summary(stage) for stage in stages},
+    }
+
+
+def run_benchmark(pages, results_per_page, attachments, workers, render_delay_ms):
+    with tempfile.TemporaryDirectory(prefix="samgov-synthetic-") as root:
+        notice_ids = generate_site(root, pages, results_per_page, attachments, render_delay_ms)
+        server, base_url = start_stub_server(root)
+        main.TARGET_URL = f"{base_url}/search/?index=opp&page=1&pageSize={results_per_page}&sort=-modifiedDate"
+        main.NAICS_CODES = ["541512"]
+        report = {
+            "config": {
+                "pages": pages, "results_per_page": results_per_page, "attachments": attachments,
+                "workers": workers, "render_delay_ms": render_delay_ms, "browser_profile": main.BROWSER_PROFILE,
+            }
+        }
+        try:
+            with PeakRssSampler() as rss:
+                start = time.perf_counter()
+                driver = main.initialize_driver()
+                try:
+                    contracts_df = main.scrape_contracts(driver)
+                finally:
+                    driver.quit()
+                search_seconds = time.perf_counter() - start
+            if contracts_df is None:
+                sys.exit("scrape_contracts failed against the synthetic site; see the log above.")
+            report["search"] = phase_report(
+                len(contracts_df), search_seconds, ["search_page_load", "search_page_extract", "wait"], rss.peak_mb
+            )
+            report["search"]["complete"] = list(contracts_df["Notice ID"]) == notice_ids
+
+            links = list(contracts_df["Contract Link"])
+            with PeakRssSampler() as rss:
+                start = time.perf_counter()
+                details = list(main.scrape_all_attachments(links, max_workers=workers, requests_per_second=0))
+                details_seconds = time.perf_counter() - start
+            report["details"] = phase_report(
+                len(links), details_seconds, ["detail_page", "detail_page_load", "detail_extract"], rss.peak_mb
+            )
+            report["details"]["complete"] = all(len(detail[0]) == attachments for detail in details)
+        finally:
+            server.shutdown()
+    return report
+
+
+def print_report(report):
+    print()
+    for phase in ("search", "details"):
+        result = report[phase]
+        peak = f"{result['peak_rss_mb']}MiB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{phase:<8} {result['contracts']} contracts in {result['seconds']}s "
+              f"({result['contracts_per_second']} contracts/s), peak rss={peak}, complete={result['complete']}")
+        for stage, summary in result["stages"].items():
+            print(f"  {stage:<20} n={summary['count']:<5} p50={summary['p50_seconds']:.3f}s "
+                  f"p95={summary['p95_seconds']:.3f}s max={summary['max_seconds']:.3f}s")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=5, help="Synthetic search results pages")
+    parser.add_argument("--results-per-page", type=int, default=25)
+    parser.add_argument("--attachments", type=int, default=3, help="Attachments per synthetic detail page")
+    parser.add_argument("--workers", type=int, default=main.MAX_WORKERS, help="Concurrent detail-page drivers")
+    parser.add_argument("--render-delay-ms", type=int, default=50, help="Delay before synthetic pages render")
+    parser.add_argument("--output", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.pages, args.results_per_page, args.attachments, args.workers, args.render_delay_ms)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s")
+    main_benchmark()
@@ -0,0 +1,106 @@
+"""
+Local stand-in for SAM.gov that serves recorded fixture responses from a directory.
+
+A request for /some/path is answered with the first file that exists among
+<root>/some/path, <root>/some/path.json, <root>/some/path.html and <root>/some/path/index.html.
+Query strings are ignored. Single byte-range requests ("Range: bytes=N-" or "bytes=N-M")
+are answered with 206 Partial Content, so resumable downloads can be tested against it.
+Point SAM_API_BASE_URL (or TARGET_URL) at the printed address.
+
+Usage:
+    python benchmarks/stub_server.py [--root benchmarks/fixtures] [--port 8000]
+"""
+import argparse
+import mimetypes
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+RANGE_HEADER = re.compile(r"bytes=(\d+)-(\d*)$")
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def resolve_fixture(root, request_path):
+    """Map a request path to a fixture file under `root`, or None if there is none."""
+    relative = unquote(urlsplit(request_path).path).lstrip("/")
+    base = os.path.normpath(os.path.join(root, relative))
+    if not base.startswith(os.path.normpath(root)):
+        return None
+    for candidate in (base, base + ".json", base + ".html", os.path.join(base, "index.html")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def make_handler(root):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+        def do_GET(self):
+            path = resolve_fixture(root, self.path)
+            if path is None:
+                self.send_error(404)
+                return
+            size = os.path.getsize(path)
+            start, end = 0, size - 1
+            byte_range = RANGE_HEADER.match(self.headers.get("Range", ""))
+            if byte_range:
+                start = int(byte_range.group(1))
+                end = min(int(byte_range.group(2)), size - 1) if byte_range.group(2) else size - 1
+                if start >= size or start > end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.end_headers()
+            # Stream the file in chunks so large fixtures are not read into memory
+            with open(path, "rb") as file:
+                file.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = file.read(min(64 * 1024, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output readable
+
+    return FixtureHandler
+
+
+def start_stub_server(root=DEFAULT_ROOT, host="127.0.0.1", port=0):
+    """
+    Start the stub server on a background thread.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(root))
+    thread = threading.Thread(target=server.serve_forever, name="stub-server", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Directory of fixture files to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.root))
+    print(f"Serving {args.root} at http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,269 @@
+"""
+Generate a synthetic, offline copy of the SAM.gov pages the scraper reads.
+
+The snapshots reproduce the DOM structure and element IDs that main.py's selectors expect:
+  search/index.html          search page shell with a pop-up, the NAICS filter and pagination.
+                             Like the real Angular app, results are rendered by script after a
+                             short delay, from the fragment matching the `page` URL parameter.
+  search/pages/<n>.html      result list fragment for filtered page n
+  search/pages/unfiltered.html
+                             results shown before a NAICS code is entered
+  opp/<notice id>/view.html  contract detail page with the four date fields and attachment table
+  files/<notice id>/<n>.pdf  attachment files; attachment n has the same content on every notice,
+                             like an RFP attached to several notices
+
+Serve the generated directory with stub_server.py and point TARGET_URL at <base>/search/?page=1.
+
+Usage:
+    python benchmarks/synthetic_site.py <output dir> [--pages 5] [--results-per-page 25] [--attachments 3]
+"""
+import argparse
+import html
+import os
+from datetime import date, timedelta
+
+DEPARTMENTS = [
+    "DEPT OF DEFENSE",
+    "HOMELAND SECURITY, DEPARTMENT OF",
+    "VETERANS AFFAIRS, DEPARTMENT OF",
+    "HEALTH AND HUMAN SERVICES, DEPARTMENT OF",
+    "GENERAL SERVICES ADMINISTRATION",
+]
+BASE_DATE = date(2025, 3, 4)
+
+SEARCH_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Contract Opportunities | SAM.gov (synthetic)</title></head>
+<body>
+<div id="welcome-modal" style="position: fixed; top: 0; left: 0; z-index: 10; background: #fff; padding: 1em;">
+  Welcome to SAM.gov <button class="close" onclick="this.parentNode.remove()">Close</button>
+</div>
+<div id="main-container">
+  <app-frontend-search-home>
+    <div><div>
+      <div class="desktop:grid-col-4">
+        <button id="usa-accordion-item-7" onclick="document.getElementById('naics-filter').hidden = false">NAICS</button>
+        <div id="naics-filter" hidden>
+          <input id="naics" type="text" autocomplete="off">
+          <ul id="naics-options"></ul>
+          <ul id="naics-chips"></ul>
+        </div>
+      </div>
+      <div class="desktop:grid-col-8 tablet-lg:grid-col-12 mobile-lg:grid-col-12">
+        <search-list-layout>
+          <div>Search results</div>
+          <div><div><div><sds-search-result-list></sds-search-result-list></div></div></div>
+          <div>
+            <input id="bottomPagination-currentPage" type="number" min="1" value="1" max="1">
+            <button id="bottomPagination-nextPage" onclick="goToPage(currentPage() + 1)">Next</button>
+          </div>
+        </search-list-layout>
+      </div>
+    </div></div>
+  </app-frontend-search-home>
+</div>
+<script>
+var TOTAL_PAGES = __TOTAL_PAGES__;
+var UNFILTERED_PAGES = __UNFILTERED_PAGES__;
+var RENDER_DELAY_MS = __RENDER_DELAY_MS__;
+
+function params() { return new URLSearchParams(window.location.search); }
+function filtered() { return params().getAll("naics").length > 0; }
+function currentPage() { return parseInt(params().get("page") || "1", 10); }
+
+function render() {
+  var page = filtered() ? currentPage() : 1;
+  var source = filtered() ? "/search/pages/" + page + ".html" : "/search/pages/unfiltered.html";
+  fetch(source).then(function (response) { return response.text(); }).then(function (fragment) {
+    setTimeout(function () {
+      document.querySelector("sds-search-result-list").innerHTML = fragment;
+      var pager = document.getElementById("bottomPagination-currentPage");
+      pager.max = String(filtered() ? TOTAL_PAGES : UNFILTERED_PAGES);
+      pager.value = String(page);
+    }, RENDER_DELAY_MS);
+  });
+}
+
+function goToPage(page) {
+  var query = params();
+  query.set("page", String(page));
+  window.history.pushState(null, "", "?" + query.toString());
+  render();
+}
+
+var naicsInput = document.getElementById("naics");
+naicsInput.addEventListener("input", function () {
+  var code = naicsInput.value.trim();
+  document.getElementById("naics-options").innerHTML =
+    code ? '<li role="option">' + code + ' - Synthetic industry</li>' : "";
+});
+naicsInput.addEventListener("keydown", function (event) {
+  var code = naicsInput.value.trim();
+  if (event.key !== "Enter" || !code) {
+    return;
+  }
+  var chip = document.createElement("li");
+  chip.textContent = code;
+  document.getElementById("naics-chips").appendChild(chip);
+  document.getElementById("naics-options").innerHTML = "";
+  naicsInput.value = "";
+  var query = params();
+  query.append("naics", code);
+  query.set("page", "1");
+  window.history.replaceState(null, "", "?" + query.toString());
+  render();
+});
+
+render();
+</script>
+</body>
+</html>
+"""
+
+RESULT_TEMPLATE = """<div>
+  <app-opportunity-result>
+    <div>
+      <div class="grid-col-12 tablet:grid-col-9">
+        <div><h3><a href="/opp/{notice_id}/view">{name}</a></h3></div>
+        <div>Notice ID: {notice_id}</div>
+        <div class="grid-row grid-gap ng-star-inserted">
+          <div><div><strong>Department/Ind.Agency</strong> {department}</div></div>
+          <div><div>Office: Synthetic Contracting Office</div></div>
+        </div>
+      </div>
+      <div class="grid-col-12 tablet:grid-col-3">
+        <div>Updated Date: {modified}</div>
+        <div>Published Date: {published}</div>
+      </div>
+    </div>
+  </app-opportunity-result>
+</div>
+"""
+
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{name} | SAM.gov (synthetic)</title></head>
+<body>
+<div id="detail-modal" style="position: fixed; top: 0; left: 0; z-index: 10; background: #fff; padding: 1em;">
+  Notice
+  <usa-icon class="ng-tns-c1762404166-1" onclick="document.getElementById('detail-modal').remove()"><i-bs><svg
+    width="24" height="24" viewBox="0 0 24 24"><path d="M0 0h24v24H0z"></path></svg></i-bs></usa-icon>
+</div>
+<main id="opportunity"></main>
+<template id="opportunity-content">
+  <h1>{name}</h1>
+  <div id="general-published-date">Updated Published Date: {published} 03:01 pm CST</div>
+  <div id="general-original-published-date">Original Published Date: {published} 09:15 am CST</div>
+  <div id="general-response-date">Updated Date Offers Due: {due} 05:00 pm EST</div>
+  <div id="general-original-response-date">Original Date Offers Due: {due} 05:00 pm EST</div>
+  <button id="button-opp-view-attachments-accordion-section">Attachments/Links</button>
+  <table>
+{attachments}  </table>
+</template>
+<script>
+setTimeout(function () {{
+  document.getElementById("opportunity").appendChild(document.getElementById("opportunity-content").content);
+}}, {render_delay_ms});
+</script>
+</body>
+</html>
+"""
+
+ATTACHMENT_TEMPLATE = """    <tr>
+      <td><a id="opp-view-attachments-fileLinkId{index}" href="/files/{notice_id}/{index}.pdf">{file_name}</a></td>
+      <td><span id="opp-view-attachments-date{index}">{updated}</span></td>
+    </tr>
+"""
+
+NO_ATTACHMENTS_ROW = """    <tr><td>No attachments or links have been added to this opportunity.</td></tr>
+"""
+
+
+def notice_id_for(page, position):
+    """Deterministic 32 character hex Notice ID for a result."""
+    return f"{page:08x}{position:08x}".rjust(32, "0")
+
+
+def format_day(day):
+    return day.strftime("%b %d, %Y")
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def attachment_body(index, size_kb):
+    """Deterministic attachment content, identical for the same attachment index on every notice."""
+    line = f"%PDF-1.4 synthetic attachment {index}\n".encode("ascii")
+    return (line * (size_kb * 1024 // len(line) + 1))[:size_kb * 1024]
+
+
+def generate_site(root, pages=5, results_per_page=25, attachments=3, render_delay_ms=50, attachment_kb=16):
+    """
+    Write the synthetic site under `root`: `pages` filtered results pages of `results_per_page`
+    results, each with a detail page listing `attachments` attachments of `attachment_kb` KiB.
+    Pages render their content `render_delay_ms` after loading, like the real front end.
+    Returns the list of generated Notice IDs, in result order.
+    """
+    write_file(os.path.join(root, "search", "index.html"), SEARCH_TEMPLATE
+               .replace("__TOTAL_PAGES__", str(pages))
+               .replace("__UNFILTERED_PAGES__", str(pages * 10))
+               .replace("__RENDER_DELAY_MS__", str(render_delay_ms)))
+
+    notice_ids = []
+    for page in range(0, pages + 1):  # Page 0 holds the unfiltered results
+        rows = []
+        for position in range(results_per_page):
+            notice_id = notice_id_for(page, position)
+            index = page * results_per_page + position
+            published = BASE_DATE - timedelta(days=index % 90)
+            context = {
+                "notice_id": notice_id,
+                "name": html.escape(f"Synthetic Opportunity {page}-{position + 1}"),
+                "department": html.escape(DEPARTMENTS[index % len(DEPARTMENTS)]),
+                "modified": format_day(published),
+                "published": format_day(published),
+                "due": format_day(published + timedelta(days=30)),
+            }
+            rows.append(RESULT_TEMPLATE.format(**context))
+            if page == 0:
+                continue
+            notice_ids.append(notice_id)
+
+            attachment_rows = "".join(
+                ATTACHMENT_TEMPLATE.format(
+                    index=attachment, notice_id=notice_id,
+                    file_name=f"Attachment_{attachment + 1}.pdf", updated=context["published"]
+                )
+                for attachment in range(attachments)
+            ) or NO_ATTACHMENTS_ROW
+            for attachment in range(attachments):
+                path = os.path.join(root, "files", notice_id, f"{attachment}.pdf")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as file:
+                    file.write(attachment_body(attachment, attachment_kb))
+            write_file(
+                os.path.join(root, "opp", notice_id, "view.html"),
+                DETAIL_TEMPLATE.format(attachments=attachment_rows, render_delay_ms=render_delay_ms, **context)
+            )
+
+        fragment = "unfiltered.html" if page == 0 else f"{page}.html"
+        write_file(os.path.join(root, "search", "pages", fragment), "".join(rows))
+    return notice_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Directory to write the synthetic site to")
+    parser.add_argument("--pages", type=int, default=5, help="Number of filtered search results pages")
+    parser.add_argument("--results-per-page", type=int, default=25)
+    parser.add_argument("--attachments", type=int, default=3, help="Attachments listed on every detail page")
+    parser.add_argument("--render-delay-ms", type=int, default=50, help="Delay before pages render their content")
+    parser.add_argument("--attachment-kb", type=int, default=16, help="Size of each attachment file")
+    args = parser.parse_args()
+
+    ids = generate_site(args.root, args.pages, args.results_per_page, args.attachments, args.render_delay_ms,
+                        args.attachment_kb)
+    print(f"Wrote {args.pages} search pages and {len(ids)} detail pages to {args.root}")
@@ -0,0 +1,99 @@
+"""
+On-disk checkpoints for long scraping runs.
+
+Progress is appended to a JSON-lines file as work completes: one entry per search
+results page, one when a search (or search shard) finishes and one per scraped contract,
+keyed by Notice ID so it still matches if a resumed search returns pages in another shape.
+A run started with --resume replays the file and continues from the last completed
+page and contract instead of starting over. Only that replay keeps page and contract data
+in memory; recording writes the line and remembers just the completed page keys.
+"""
+import json
+import logging
+import os
+import threading
+
+
+class Checkpoint:
+    """Append-only progress log for one scraping run. Safe to record from worker threads."""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        # Loaded from the file on resume only; pages and contracts recorded by this run are not kept
+        self.pages = {}  # (shard, page number) -> contracts scraped from that page
+        self.contracts = {}  # Notice ID -> scrape_attachments tuple
+        self.completed_pages = set()  # (shard, page number) of every page loaded or recorded
+        self.completed_searches = set()  # shard keys whose search finished; None is the whole search phase
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            self._load()
+            logging.info(f"Resuming from checkpoint {path}: {len(self.pages)} pages and "
+                         f"{len(self.contracts)} contracts already completed.")
+        else:
+            if resume:
+                logging.warning(f"No checkpoint found at {path}; starting a fresh run.")
+            if os.path.exists(path):
+                os.remove(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partially written last line from a crash
+                if entry["type"] == "page":
+                    self.pages[(entry.get("shard"), entry["page"])] = entry["contracts"]
+                    self.completed_pages.add((entry.get("shard"), entry["page"]))
+                elif entry["type"] == "search_complete":
+                    self.completed_searches.add(entry.get("shard"))
+                elif entry["type"] == "contract" and "notice_id" in entry:
+                    self.contracts[entry["notice_id"]] = tuple(entry["details"])
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    @property
+    def search_complete(self):
+        """True once the whole search phase (all shards) has finished."""
+        return None in self.completed_searches
+
+    def search_contracts(self, shard=None, all_shards=False):
+        """
+        Contracts from the loaded search pages of one shard, in page order.
+        With `all_shards`, contracts from every shard ordered by shard key, then page.
+        """
+        keys = sorted(
+            (key for key in self.pages if all_shards or key[0] == shard),
+            key=lambda key: (key[0] or "", key[1])
+        )
+        return [contract for key in keys for contract in self.pages[key]]
+
+    def record_page(self, page, contracts, shard=None):
+        with self._lock:
+            self.completed_pages.add((shard, page))
+        self._write({"type": "page", "shard": shard, "page": page, "contracts": contracts})
+
+    def record_search_complete(self, shard=None):
+        with self._lock:
+            self.completed_searches.add(shard)
+        self._write({"type": "search_complete", "shard": shard})
+
+    def record_contract(self, notice_id, details):
+        self._write({"type": "contract", "notice_id": notice_id, "details": list(details)})
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def clear(self):
+        """Remove the checkpoint once the run's output has been written."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
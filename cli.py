@@ -0,0 +1,222 @@
+"""
+Command line interface of the scraper.
+
+  python cli.py search                         run the search and save its results to a CSV
+  python cli.py details <search results CSV>   scrape the detail pages into a combined CSV
+  python cli.py details --worker               scrape detail jobs from the Postgres work queue
+  python cli.py load-db <combined CSV>         load a combined CSV into RDS
+  python cli.py email <combined CSV>           email a combined CSV
+  python cli.py alerts <combined CSV>          write the alert report of a combined CSV
+  python cli.py diff <combined CSV> [--previous <combined CSV>]
+                                               write the change report against the previous run
+  python cli.py run [--resume] [--coordinator | --worker]
+                                               the whole workflow (same as python main.py)
+
+Each command imports only the modules it uses: main.py (Selenium and the scraping code) is
+only loaded by the commands that scrape, and load-db and email load psycopg2 or boto3
+alone. Likewise each command only checks the settings it needs, so a database reload does
+not require the AWS credentials and an email resend does not require the geckodriver.
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from file_numbers import next_file_number, run_timestamp_from_path
+
+# Settings each command needs (see .env)
+SCRAPER_CONFIG = ["GECKO_DRIVER_PATH", "FINAL_OUTPUT_DIRECTORY", "LOGS"]
+SEARCH_CONFIG = SCRAPER_CONFIG + ["TARGET_URL", "NAICS_CODES"]
+RDS_CONFIG = ["RDS_HOST", "RDS_DBNAME", "RDS_USERNAME", "RDS_PASSWORD", "RDS_PORT"]
+EMAIL_CONFIG = ["AWS_REGION", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "EMAIL_RECIPIENTS"]
+ALERTS_CONFIG = ["ALERT_RULES_PATH"]
+
+
+def required_config(args):
+    """Names of the settings the parsed command needs."""
+    if args.command == "search":
+        return SEARCH_CONFIG
+    if args.command == "details":
+        return SCRAPER_CONFIG + RDS_CONFIG if args.worker else SCRAPER_CONFIG
+    if args.command == "load-db":
+        return RDS_CONFIG
+    if args.command == "email":
+        return EMAIL_CONFIG
+    if args.command == "alerts":
+        return ALERTS_CONFIG
+    if args.command == "diff":
+        return []
+    if args.worker:
+        return SCRAPER_CONFIG + RDS_CONFIG
+    return SEARCH_CONFIG + EMAIL_CONFIG + (RDS_CONFIG if args.coordinator else [])
+
+
+def validate_config(command, names):
+    """Raise ValueError naming every setting in `names` that is unset or empty."""
+    # Lists such as NAICS_CODES and EMAIL_RECIPIENTS count as empty when they hold only commas
+    missing = [name for name in names if not os.getenv(name, "").replace(",", "").strip()]
+    if missing:
+        raise ValueError(f"Missing environment variables for `{command}`: {', '.join(missing)}. "
+                         f"Check your .env file.")
+
+
+def configure_logging(run_timestamp):
+    """Log to the console and, when LOGS is set, to a new numbered log file in that directory."""
+    handlers = [logging.StreamHandler()]
+    logs_directory = os.getenv("LOGS")
+    if logs_directory:
+        log_file_number = next_file_number(logs_directory, "log_")
+        log_file_path = os.path.join(logs_directory, f"log_{log_file_number}_{run_timestamp}.txt")
+        handlers.insert(0, logging.FileHandler(log_file_path))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s',
+        handlers=handlers
+    )
+
+
+def search_command(args, run_timestamp):
+    import main
+    os.makedirs(main.FINAL_OUTPUT_DIRECTORY, exist_ok=True)
+    output_path = args.output or main.search_results_path(run_timestamp)
+    try:
+        main.write_search_results(output_path)
+    except Exception as e:
+        logging.error(f"Error during contract scraping: {e}")
+        return 1
+    return 0
+
+
+def details_command(args, run_timestamp):
+    import main
+    if args.worker:
+        main.run_queue_worker()
+        return 0
+    os.makedirs(main.FINAL_OUTPUT_DIRECTORY, exist_ok=True)
+    output_path = args.output or main.combined_output_path(run_timestamp)
+    main.scrape_details_to_csv(main.read_search_results(args.search_results), output_path)
+    return 0
+
+
+def load_db_command(args, run_timestamp):
+    import rds_store
+    run_id = rds_store.save_to_rds(args.csv_path, args.run_timestamp or run_timestamp_from_path(args.csv_path))
+    return 0 if run_id is not None else 1
+
+
+def email_command(args, run_timestamp):
+    import emailer
+    sent = emailer.send_email_with_attachment(args.csv_path, args.run_timestamp or run_timestamp_from_path(args.csv_path))
+    return 0 if sent else 1
+
+
+def alerts_command(args, run_timestamp):
+    import alerts
+    run_timestamp = args.run_timestamp or run_timestamp_from_path(args.csv_path)
+    report_path = args.output or alerts.alert_report_path(os.path.dirname(os.path.abspath(args.csv_path)), run_timestamp)
+    alerts.run_alerts(args.csv_path, os.getenv("ALERT_RULES_PATH"),
+                      os.getenv("ALERT_INDEX_PATH", "alert_index.sqlite3"), report_path, run_timestamp)
+    return 0
+
+
+def diff_command(args, run_timestamp):
+    import run_diff
+    run_timestamp = args.run_timestamp or run_timestamp_from_path(args.csv_path)
+    if args.output:
+        previous_path = args.previous or run_diff.previous_output_path(
+            os.path.dirname(os.path.abspath(args.csv_path)), args.csv_path)
+        if previous_path is None:
+            logging.error("No previous run to compare with; pass --previous.")
+            return 1
+        run_diff.diff_runs(previous_path, args.csv_path).to_csv(args.output, index=False)
+        logging.info(f"Change report saved to {args.output}")
+        return 0
+    report_path, _ = run_diff.write_change_report(args.csv_path, run_timestamp, args.previous)
+    return 0 if report_path else 1
+
+
+def run_command(args, run_timestamp):
+    import main
+    os.makedirs(main.FINAL_OUTPUT_DIRECTORY, exist_ok=True)
+    main.timestamp = run_timestamp  # The run's output files share the log file's timestamp
+    if args.worker:
+        main.run_queue_worker()
+    elif args.coordinator:
+        main.process_queued_output(resume=args.resume)
+    else:
+        main.process_combined_output(resume=args.resume)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape SAM.gov contracts into a combined CSV.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Run the search and save the results to a CSV.")
+    search.add_argument("--output", help="CSV to write (default: a numbered search_results CSV "
+                                         "in FINAL_OUTPUT_DIRECTORY).")
+    search.set_defaults(handler=search_command)
+
+    details = commands.add_parser("details", help="Scrape the detail pages of saved search results.")
+    details.add_argument("search_results", nargs="?", help="CSV written by the search command.")
+    details.add_argument("--worker", action="store_true",
+                         help="Scrape contract detail jobs from the Postgres work queue instead.")
+    details.add_argument("--output", help="Combined CSV to write (default: a numbered final_combined_data "
+                                          "CSV in FINAL_OUTPUT_DIRECTORY).")
+    details.set_defaults(handler=details_command)
+
+    load_db = commands.add_parser("load-db", help="Load a combined CSV into the RDS database.")
+    load_db.add_argument("csv_path", help="final_combined_data CSV")
+    load_db.add_argument("--run-timestamp", help="Run to load it as (default: taken from the file name).")
+    load_db.set_defaults(handler=load_db_command)
+
+    email = commands.add_parser("email", help="Email a combined CSV to EMAIL_RECIPIENTS.")
+    email.add_argument("csv_path", help="final_combined_data CSV")
+    email.add_argument("--run-timestamp", help="Run timestamp for the subject (default: taken from the file name).")
+    email.set_defaults(handler=email_command)
+
+    alerts = commands.add_parser("alerts", help="Match the ALERT_RULES_PATH rules against a combined CSV.")
+    alerts.add_argument("csv_path", help="final_combined_data CSV")
+    alerts.add_argument("--run-timestamp", help="Run to index it as (default: taken from the file name).")
+    alerts.add_argument("--output", help="Alert report CSV to write (default: a numbered alerts CSV next to the input).")
+    alerts.set_defaults(handler=alerts_command)
+
+    diff = commands.add_parser("diff", help="Report what changed in a combined CSV since the previous run.")
+    diff.add_argument("csv_path", help="final_combined_data CSV")
+    diff.add_argument("--previous", help="Combined CSV to compare with (default: the last run diffed in its "
+                                         "directory, or the highest-numbered one before it).")
+    diff.add_argument("--run-timestamp", help="Run timestamp for the report name (default: taken from the file name).")
+    diff.add_argument("--output", help="Change report CSV to write (default: a numbered changes CSV next to the input).")
+    diff.set_defaults(handler=diff_command)
+
+    run = commands.add_parser("run", help="Run the whole workflow: search, details, CSV, database load and email.")
+    run.add_argument("--resume", action="store_true",
+                     help="Continue an interrupted run from its last checkpointed page and contract.")
+    mode = run.add_mutually_exclusive_group()
+    mode.add_argument("--coordinator", action="store_true",
+                      help="Enqueue the search results in the Postgres work queue, wait for the workers "
+                           "to drain it, then build, load and email the combined CSV.")
+    mode.add_argument("--worker", action="store_true",
+                      help="Scrape contract detail jobs from the Postgres work queue.")
+    run.set_defaults(handler=run_command)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "details" and not args.worker and not args.search_results:
+        parser.error("details needs a search results CSV, or --worker")
+
+    load_dotenv()
+    validate_config(args.command, required_config(args))
+    run_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    configure_logging(run_timestamp)
+    return args.handler(args, run_timestamp)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Optional download stage for contract attachments.
+
+Files are fetched by a bounded pool of worker threads and streamed to disk in chunks,
+never held in memory whole. Interrupted downloads are resumed with HTTP range requests
+from their partial file. Finished files go into a content-addressed store keyed by
+their SHA-256, so an RFP attached to several notices is stored once:
+
+  <root>/objects/<first two hex digits>/<sha256>   file contents
+  <root>/partial/<hash of the URL>.part            downloads in progress
+  <root>/index.sqlite3                             (notice, URL) -> sha256, file name, size
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from metrics import METRICS
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # Optional dependency; the download stage is unavailable without it
+    requests = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    url TEXT NOT NULL,
+    notice_id TEXT NOT NULL DEFAULT '',
+    file_name TEXT,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    downloaded_at TEXT NOT NULL,
+    PRIMARY KEY (url, notice_id)
+)
+"""
+
+CHUNK_SIZE = 256 * 1024
+CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+FILENAME = re.compile(r"filename\*?=(?:UTF-8'')?\"?([^\";]+)\"?", re.IGNORECASE)
+
+
+class DownloadError(Exception):
+    """A download could not be completed (bad status or a truncated response)."""
+
+
+class AttachmentStore:
+    """
+    Content-addressed attachment store with resumable, deduplicated downloads.
+    Safe to share between download threads.
+    """
+
+    def __init__(self, root, timeout=60, retries=3, pool_size=4):
+        if requests is None:
+            raise ImportError("Downloading attachments requires the 'requests' package.")
+        self.root = root
+        self.timeout = timeout
+        self.retries = max(1, retries)
+        self.pool_size = pool_size
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "partial"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = []
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def object_path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def partial_path(self, url):
+        return os.path.join(self.root, "partial", hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part")
+
+    def lookup(self, url):
+        """sha256 of an already stored download of `url` (for any notice), or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT sha256 FROM files WHERE url = ? LIMIT 1", (url,)).fetchone()
+        if row and os.path.exists(self.object_path(row[0])):
+            return row[0]
+        return None
+
+    def index_file(self, url, notice_id, file_name, sha256, size):
+        """Record that `url`, attached to `notice_id`, is stored as `sha256`."""
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO files (url, notice_id, file_name, sha256, size, downloaded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url, notice_id) DO UPDATE SET
+                    file_name = excluded.file_name, sha256 = excluded.sha256,
+                    size = excluded.size, downloaded_at = excluded.downloaded_at
+                """,
+                (url, notice_id or "", file_name, sha256, size, datetime.now().isoformat(timespec="seconds"))
+            )
+            self.conn.commit()
+
+    def _fetch_to_partial(self, url, partial):
+        """
+        Stream `url` into `partial`, continuing from its current size with a range request.
+        Returns the file name from Content-Disposition, if any.
+        """
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self._session().get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416 and offset:
+                # Nothing left to send: the partial file already holds the whole body
+                match = re.search(r"\*/(\d+)", response.headers.get("Content-Range", ""))
+                if match and int(match.group(1)) == offset:
+                    return None
+                os.remove(partial)
+                return self._fetch_to_partial(url, partial)
+            if response.status_code not in (200, 206):
+                raise DownloadError(f"HTTP {response.status_code} for {url}")
+
+            mode = "wb"
+            total = response.headers.get("Content-Length")
+            total = int(total) if total and total.isdigit() else None
+            if response.status_code == 206:
+                match = CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if not match or int(match.group(1)) != offset:
+                    raise DownloadError(f"Unexpected Content-Range for {url}: {response.headers.get('Content-Range')}")
+                mode = "ab"
+                METRICS.increment("downloads_resumed")
+                logging.info(f"Resuming download of {url} at byte {offset}.")
+            elif offset:
+                logging.info(f"Server ignored the range request for {url}; downloading it from the start.")
+
+            written = 0
+            with open(partial, mode) as file:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    file.write(chunk)
+                    written += len(chunk)
+            METRICS.increment("download_bytes", written)
+            if total is not None and written < total:
+                raise DownloadError(f"Download of {url} ended after {written} of {total} bytes.")
+
+            match = FILENAME.search(response.headers.get("Content-Disposition", ""))
+            return match.group(1) if match else None
+
+    def download(self, url, notice_id="", file_name=""):
+        """
+        Download one attachment into the store, retrying (and resuming) up to `retries` times.
+        Returns a dict with the url, notice_id, sha256, path and status:
+        "cached" (already stored), "deduplicated" (same content stored from another URL),
+        "downloaded" or "failed".
+        """
+        result = {"url": url, "notice_id": notice_id, "sha256": None, "path": None, "status": "failed"}
+        sha256 = self.lookup(url)
+        if sha256:
+            self.index_file(url, notice_id, file_name, sha256, os.path.getsize(self.object_path(sha256)))
+            METRICS.increment("downloads_cached")
+            return {**result, "sha256": sha256, "path": self.object_path(sha256), "status": "cached"}
+
+        partial = self.partial_path(url)
+        for attempt in range(1, self.retries + 1):
+            try:
+                with METRICS.timer("attachment_download"):
+                    served_name = self._fetch_to_partial(url, partial)
+                break
+            except Exception as e:
+                logging.warning(f"Attempt {attempt}/{self.retries} to download {url} failed: {e}")
+        else:
+            METRICS.increment("downloads_failed")
+            logging.error(f"Giving up on downloading {url}; the partial file is kept for the next run.")
+            return result
+
+        sha256 = file_sha256(partial)
+        size = os.path.getsize(partial)
+        path = self.object_path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            duplicate = os.path.exists(path)
+            if duplicate:
+                os.remove(partial)
+            else:
+                os.replace(partial, path)
+        self.index_file(url, notice_id, file_name or served_name, sha256, size)
+
+        status = "deduplicated" if duplicate else "downloaded"
+        METRICS.increment(f"downloads_{status}")
+        return {**result, "sha256": sha256, "path": path, "status": status}
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+            self.conn.close()
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_attachments(store, attachments, max_workers=4):
+    """
+    Download `attachments` ((url, notice_id, file_name) tuples) into `store` with up to
+    `max_workers` concurrent downloads. Each URL is fetched at most once per call.
+    Returns the download results in input order.
+    """
+    unique = {}
+    for url, notice_id, file_name in attachments:
+        unique.setdefault(url, []).append((notice_id, file_name))
+    logging.info(f"Downloading {len(unique)} unique attachments with {max_workers} worker(s).")
+
+    def fetch(url):
+        notice_id, file_name = unique[url][0]
+        result = store.download(url, notice_id, file_name)
+        # Attachments shared by several notices are indexed under each of them
+        if result["sha256"]:
+            for other_notice_id, other_name in unique[url][1:]:
+                store.index_file(url, other_notice_id, other_name, result["sha256"],
+                                 os.path.getsize(result["path"]))
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="download") as executor:
+        results = dict(zip(unique, executor.map(fetch, unique)))
+    return [results[url] for url, _, _ in attachments]
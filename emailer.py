@@ -0,0 +1,295 @@
+"""
+Emails a run's combined CSV through AWS SES.
+
+The CSV is compressed (gzip or zip) before it is sent. If the compressed file is within
+EMAIL_ATTACHMENT_LIMIT_MB it is attached to the email; a larger one would push the message
+past the SES raw message size limit, so it is uploaded to S3_BUCKET instead and the email
+carries a presigned download link. Either way the email body has an HTML digest of the new
+contracts and of those closing soon.
+
+The CSV is only ever streamed: compression copies it in chunks, the digest reads it row by
+row keeping the top EMAIL_DIGEST_LIMIT contracts of each list, and S3 uploads are multipart.
+Only an attachment below the limit is held in memory.
+
+boto3 is imported when an email is sent rather than at import time, so commands that
+never send email do not pay for loading it. The AWS, EMAIL_* and S3_* settings are read
+from the environment (.env) on each call.
+"""
+import csv
+import functools
+import gzip
+import heapq
+import html
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timedelta, timezone
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from metrics import METRICS
+from sam_dates import parse_sam_datetime
+
+DEFAULT_SENDER = "Abhishek.nandakumar@aditillc.com"
+CHUNK_SIZE = 1024 * 1024
+
+# Compression -> (file extension, MIME subtype)
+COMPRESSIONS = {
+    "gzip": (".gz", "gzip"),
+    "zip": (".zip", "zip"),
+    "none": ("", "octet-stream"),
+}
+
+
+def email_recipients():
+    return [address.strip() for address in os.getenv("EMAIL_RECIPIENTS", "").split(",") if address.strip()]
+
+
+def email_settings():
+    """Delivery settings from the environment, with their defaults."""
+    return {
+        "sender": os.getenv("EMAIL_SENDER", DEFAULT_SENDER),
+        "recipients": email_recipients(),
+        "compression": os.getenv("EMAIL_COMPRESSION", "gzip").lower(),
+        "attachment_limit": float(os.getenv("EMAIL_ATTACHMENT_LIMIT_MB", "7")) * 1024 * 1024,
+        "bucket": os.getenv("S3_BUCKET"),
+        "prefix": os.getenv("S3_PREFIX", "scraping-results/"),
+        "link_expiry": int(float(os.getenv("EMAIL_LINK_EXPIRY_HOURS", "168")) * 3600),
+        "new_days": float(os.getenv("EMAIL_DIGEST_NEW_DAYS", "1")),
+        "due_days": float(os.getenv("EMAIL_DIGEST_DUE_DAYS", "7")),
+        "digest_limit": int(os.getenv("EMAIL_DIGEST_LIMIT", "25")),
+    }
+
+
+def compress_file(path, compression="gzip"):
+    """
+    Stream `path` into a compressed temporary file.
+    Returns (compressed path, attachment file name); the caller removes the temporary file.
+    """
+    extension, _ = COMPRESSIONS[compression]
+    name = os.path.basename(path) + extension
+    handle, compressed_path = tempfile.mkstemp(suffix=extension)
+    os.close(handle)
+    with open(path, "rb") as source:
+        if compression == "gzip":
+            with gzip.open(compressed_path, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+        elif compression == "zip":
+            with zipfile.ZipFile(compressed_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                with archive.open(os.path.basename(path), "w") as target:
+                    shutil.copyfileobj(source, target, CHUNK_SIZE)
+        else:
+            with open(compressed_path, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+    return compressed_path, name
+
+
+def read_digest(csv_path, now=None, new_days=1, due_days=7, limit=25):
+    """
+    Stream the combined CSV and collect the contracts for the email digest:
+      new           originally published within the last `new_days` days, newest first
+      closing_soon  offers due within the next `due_days` days, soonest first
+    Each list keeps at most `limit` contracts. Returns (new, closing_soon, total counts per list).
+    """
+    parse = functools.lru_cache(maxsize=4096)(parse_sam_datetime)  # Many notices share their dates
+    now = now or datetime.now(timezone.utc)
+    new_since = now - timedelta(days=new_days)
+    due_by = now + timedelta(days=due_days)
+    new, closing, counts = [], [], {"new": 0, "closing_soon": 0}
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        for index, row in enumerate(csv.DictReader(csv_file)):
+            # Only the first row of a contract carries its Notice ID; the summary row has none either
+            if not row.get("Notice ID") or row.get("Contract Number") == "Summary":
+                continue
+            entry = {
+                "name": row.get("Contract Name") or "",
+                "notice_id": row["Notice ID"],
+                "department": row.get("Department") or "",
+                "link": row.get("Contract Link") or "",
+                "published": row.get("Original Published Date") or row.get("General Published Date") or "",
+                "due": row.get("Updated Date Offers Due") or row.get("Original Date Offers Due") or "",
+            }
+            published = parse(entry["published"])
+            if published and new_since <= published <= now:
+                counts["new"] += 1
+                item = (published.timestamp(), -index, entry)  # Min-heap keeps the newest `limit`
+                if len(new) < limit:
+                    heapq.heappush(new, item)
+                elif limit:
+                    heapq.heappushpop(new, item)
+            due = parse(entry["due"])
+            if due and now <= due <= due_by:
+                counts["closing_soon"] += 1
+                item = (-due.timestamp(), -index, entry)  # Min-heap keeps the soonest `limit`
+                if len(closing) < limit:
+                    heapq.heappush(closing, item)
+                elif limit:
+                    heapq.heappushpop(closing, item)
+    return (
+        [entry for _, _, entry in sorted(new, reverse=True)],
+        [entry for _, _, entry in sorted(closing, reverse=True)],
+        counts,
+    )
+
+
+def digest_table(title, contracts, total, date_label, date_key):
+    """HTML section of the digest listing `contracts` (the first of `total` matches)."""
+    if not contracts:
+        return f"<h3>{html.escape(title)}</h3><p>None.</p>"
+    rows = "".join(
+        f"<tr><td><a href=\"{html.escape(contract['link'], quote=True)}\">{html.escape(contract['name'])}</a></td>"
+        f"<td>{html.escape(contract['notice_id'])}</td><td>{html.escape(contract['department'])}</td>"
+        f"<td>{html.escape(contract[date_key])}</td></tr>"
+        for contract in contracts
+    )
+    shown = f" (showing {len(contracts)} of {total})" if total > len(contracts) else ""
+    return (
+        f"<h3>{html.escape(title)}{shown}</h3>"
+        f"<table border=\"1\" cellpadding=\"4\" cellspacing=\"0\">"
+        f"<tr><th>Contract</th><th>Notice ID</th><th>Department</th><th>{html.escape(date_label)}</th></tr>"
+        f"{rows}</table>"
+    )
+
+
+def upload_to_s3(s3_client, path, bucket, key, expires_in):
+    """Upload `path` to S3 (multipart for large files) and return a presigned download URL for it."""
+    with METRICS.timer("email_upload"):
+        s3_client.upload_file(path, bucket, key)
+    return s3_client.generate_presigned_url(
+        "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires_in
+    )
+
+
+@METRICS.timed("email")
+def send_email_with_attachment(output_path, run_timestamp):
+    """
+    Email the compressed output CSV using AWS SES, as an attachment when it is within
+    EMAIL_ATTACHMENT_LIMIT_MB or as a presigned S3 link when it is larger, with the digest inline.
+    Returns True if SES accepted the message.
+    """
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    settings = email_settings()
+    if settings["compression"] not in COMPRESSIONS:
+        logging.warning(f"Unknown EMAIL_COMPRESSION {settings['compression']!r}; using gzip.")
+        settings["compression"] = "gzip"
+    session = boto3.session.Session(
+        region_name=os.getenv("AWS_REGION"),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+    )
+
+    compressed_path = None
+    try:
+        with METRICS.timer("email_compress"):
+            compressed_path, attachment_name = compress_file(output_path, settings["compression"])
+        with METRICS.timer("email_digest"):
+            new, closing, counts = read_digest(
+                output_path, new_days=settings["new_days"], due_days=settings["due_days"],
+                limit=settings["digest_limit"]
+            )
+        size = os.path.getsize(compressed_path)
+        logging.info(f"Compressed {os.path.basename(output_path)} from {os.path.getsize(output_path)} "
+                     f"to {size} bytes ({settings['compression']}).")
+
+        link = None
+        if size > settings["attachment_limit"]:
+            if not settings["bucket"]:
+                METRICS.increment("email_failures")
+                logging.error(f"The compressed output ({size} bytes) is over EMAIL_ATTACHMENT_LIMIT_MB "
+                              f"and S3_BUCKET is not set, so it cannot be emailed.")
+                return False
+            key = f"{settings['prefix']}{attachment_name}"
+            link = upload_to_s3(session.client("s3"), compressed_path, settings["bucket"], key,
+                                settings["link_expiry"])
+            METRICS.increment("email_s3_uploads")
+            logging.info(f"Uploaded the output to s3://{settings['bucket']}/{key}.")
+
+        # Create a multipart/mixed parent container.
+        msg = MIMEMultipart('mixed')
+        msg['Subject'] = f"Scraping Results - {run_timestamp}"
+        msg['From'] = settings["sender"]
+        msg['To'] = ", ".join(settings["recipients"])
+
+        # Create a multipart/alternative child container.
+        msg_body = MIMEMultipart('alternative')
+
+        # Email body.
+        if link:
+            expiry_days = settings["link_expiry"] / 86400
+            delivery_text = (f"The scraping results generated on {run_timestamp} are too large to attach. "
+                             f"Download them here (the link expires in {expiry_days:g} days):\n{link}")
+            delivery_html = (f"The scraping results generated on {run_timestamp} are too large to attach.<br>"
+                             f"<a href=\"{html.escape(link, quote=True)}\">Download {html.escape(attachment_name)}</a> "
+                             f"(the link expires in {expiry_days:g} days).")
+        else:
+            delivery_text = f"Please find attached the scraping results generated on {run_timestamp}."
+            delivery_html = delivery_text
+
+        text_part = MIMEText(
+            f"Dear Recipient,\n\n{delivery_text}\n\n"
+            f"New contracts: {counts['new']}. Contracts closing within {settings['due_days']:g} days: "
+            f"{counts['closing_soon']}.\n\nBest regards,\nYour Automated Scraper",
+            'plain'
+        )
+
+        new_section = digest_table("New contracts", new, counts["new"], "Published", "published")
+        closing_section = digest_table(f"Closing within {settings['due_days']:g} days", closing,
+                                       counts["closing_soon"], "Offers Due", "due")
+        html_part = MIMEText(
+            f"""\
+        <html>
+            <body>
+                <p>Dear Recipient,<br><br>
+                {delivery_html}
+                </p>
+                {new_section}
+                {closing_section}
+                <p>Best regards,<br>
+                Your Automated Scraper
+                </p>
+            </body>
+        </html>
+        """,
+            'html'
+        )
+
+        # Attach the text and HTML parts to msg_body
+        msg_body.attach(text_part)
+        msg_body.attach(html_part)
+
+        # Attach the multipart/alternative child container to the multipart/mixed parent container.
+        msg.attach(msg_body)
+
+        # Attachment (bounded by EMAIL_ATTACHMENT_LIMIT_MB)
+        if not link:
+            _, subtype = COMPRESSIONS[settings["compression"]]
+            with open(compressed_path, 'rb') as file:
+                part = MIMEApplication(file.read(), _subtype=subtype, Name=attachment_name)
+            part['Content-Disposition'] = f'attachment; filename="{attachment_name}"'
+            msg.attach(part)
+    except (OSError, BotoCoreError, ClientError) as e:
+        METRICS.increment("email_failures")
+        logging.error(f"Failed to prepare the email: {e}")
+        return False
+    finally:
+        if compressed_path and os.path.exists(compressed_path):
+            os.remove(compressed_path)
+
+    # Send the email
+    try:
+        response = session.client('ses').send_raw_email(
+            Source=settings["sender"],
+            Destinations=settings["recipients"],
+            RawMessage={'Data': msg.as_string()}
+        )
+        logging.info("Email sent successfully.")
+        return True
+    except ClientError as e:
+        METRICS.increment("email_failures")
+        logging.error(f"Failed to send email: {e.response['Error']['Message']}")
+        return False
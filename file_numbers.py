@@ -0,0 +1,53 @@
+"""
+Sequential numbers for the log and output file names (log_<n>_<timestamp>.txt,
+final_combined_data_<n>_<timestamp>.csv, ...).
+
+The last number handed out for a prefix is kept in a small counter file in the same
+directory (.<prefix>counter), so the next number costs one file read and write however
+many files have accumulated. The directory is only scanned once, to seed a counter
+that does not exist yet from the files already there.
+"""
+import os
+import re
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; concurrent runs could then pick the same number
+    fcntl = None
+
+
+# Run timestamp at the end of an output file name, e.g. final_combined_data_3_2025-03-04_09-15-00.csv
+RUN_TIMESTAMP = re.compile(r"_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.[a-z]+$")
+
+
+def run_timestamp_from_path(path):
+    """Run timestamp in an output file name, or the file name without its extension if it has none."""
+    name = os.path.basename(path)
+    match = RUN_TIMESTAMP.search(name)
+    return match.group(1) if match else os.path.splitext(name)[0]
+
+
+def counter_path(directory, prefix):
+    return os.path.join(directory, f".{prefix}counter")
+
+
+def highest_existing_number(directory, prefix):
+    """Largest <n> among the files named <prefix><n>_... in `directory` (0 if there are none)."""
+    pattern = re.compile(rf"^{re.escape(prefix)}(\d+)_")
+    numbers = [int(match.group(1)) for match in map(pattern.match, os.listdir(directory)) if match]
+    return max(numbers, default=0)
+
+
+def next_file_number(directory, prefix):
+    """Reserve and return the next file number for `prefix` in `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    with open(counter_path(directory, prefix), "a+", encoding="utf-8") as counter:
+        if fcntl:
+            fcntl.flock(counter, fcntl.LOCK_EX)  # Released when the file is closed
+        counter.seek(0)
+        text = counter.read().strip()
+        number = (int(text) if text.isdigit() else highest_existing_number(directory, prefix)) + 1
+        counter.seek(0)
+        counter.truncate()
+        counter.write(str(number))
+    return number
@@ -1,14 +1,17 @@
 import os
+import re
+import csv
+import json
 import time
-import pandas as pd
+import socket
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote
 from datetime import datetime
 import logging
-import boto3
-import psycopg2
-from botocore.exceptions import ClientError
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
-from email.mime.text import MIMEText
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.service import Service
@@ -16,8 +19,18 @@ from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
 from dotenv import load_dotenv
-from psycopg2 import sql
+import sam_api
+from state_store import StateStore
+from checkpoint import Checkpoint
+from retry_policy import RetryPolicy, RetriesExhausted, AdaptiveRateLimiter, HostCircuitBreakers
+from file_numbers import next_file_number
+from metrics import METRICS
+
+# pandas (search DataFrames), pyarrow (Parquet output) and the storage and delivery backends (rds_store and
+# work_queue with psycopg2, emailer with boto3, downloads, alerts) are imported where they are used, so that
+# commands which never need them start quickly and scraping works on hosts without them (see cli.py)
 
 # Load environment variables
 load_dotenv()
@@ -27,53 +40,316 @@ GECKO_DRIVER_PATH = os.getenv("GECKO_DRIVER_PATH")
 TARGET_URL = os.getenv("TARGET_URL")
 NAICS_CODES = os.getenv("NAICS_CODES", "").split(",")
 FINAL_OUTPUT_DIRECTORY = os.getenv("FINAL_OUTPUT_DIRECTORY")
-LOGS_DIRECTORY = os.getenv("LOGS")
-
-# AWS SES configuration
-AWS_REGION = os.getenv("AWS_REGION")
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-EMAIL_SENDER = os.getenv("EMAIL_SENDER", "Abhishek.nandakumar@aditillc.com")
-EMAIL_RECIPIENTS = os.getenv("EMAIL_RECIPIENTS", "").split(",")
-
-# Basic validation of environment variables
-if not all([
-    GECKO_DRIVER_PATH, TARGET_URL, NAICS_CODES, FINAL_OUTPUT_DIRECTORY,
-    LOGS_DIRECTORY, AWS_REGION, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY,
-    EMAIL_SENDER, EMAIL_RECIPIENTS
-]):
-    raise ValueError("Missing environment variables. Check your .env file.")
-
-# Ensure logs directory exists
-os.makedirs(LOGS_DIRECTORY, exist_ok=True)
-os.makedirs(FINAL_OUTPUT_DIRECTORY, exist_ok=True)
-
-# Set up log file with timestamp and numbering
+
+# WebDriver pool configuration
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "50"))
+
+# Concurrency configuration for detail-page scraping
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "1"))
+REQUESTS_PER_SECOND = float(os.getenv("REQUESTS_PER_SECOND", "1"))
+
+# Optional HTTP fast path that reads detail data from the SAM.gov JSON API before falling back to Selenium
+API_FAST_PATH = os.getenv("API_FAST_PATH", "false").lower() == "true"
+SAM_API_BASE_URL = os.getenv("SAM_API_BASE_URL", "https://sam.gov")
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "10"))
+
+# Incremental runs: skip detail scrapes for notices unchanged since the last run
+INCREMENTAL_RUNS = os.getenv("INCREMENTAL_RUNS", "false").lower() == "true"
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "scrape_state.sqlite3")
+STOP_AT_SEEN_PAGE = os.getenv("STOP_AT_SEEN_PAGE", "false").lower() == "true"
+
+# Sharded search: run one search per group of NAICS_PER_SHARD codes (0 = one search with all codes)
+NAICS_PER_SHARD = int(os.getenv("NAICS_PER_SHARD", "0"))
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", str(MAX_WORKERS)))
+
+# Search results pages are loaded directly by URL; PAGE_WORKERS drivers fetch pages in parallel
+# and a page that fails to load is retried up to PAGE_RETRIES times before it is skipped
+PAGE_WORKERS = int(os.getenv("PAGE_WORKERS", "1"))
+PAGE_RETRIES = int(os.getenv("PAGE_RETRIES", "3"))
+
+# Retries back off exponentially with jitter (up to RETRY_BASE_DELAY * 2^n seconds, at most RETRY_MAX_DELAY).
+# A detail page gets DETAIL_RETRIES attempts; contracts and results pages that still fail are retried once more at the end
+DETAIL_RETRIES = int(os.getenv("DETAIL_RETRIES", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+
+# Adaptive rate limit: REQUESTS_PER_SECOND is halved (down to MIN_REQUESTS_PER_SECOND) when a detail page
+# fails or takes longer than TARGET_LATENCY seconds, and raised back gradually while pages load normally
+MIN_REQUESTS_PER_SECOND = float(os.getenv("MIN_REQUESTS_PER_SECOND", "0.1"))
+TARGET_LATENCY = float(os.getenv("TARGET_LATENCY", "15"))
+
+# Circuit breaker: when BREAKER_FAILURE_RATE of the last BREAKER_WINDOW requests to a host failed,
+# every worker pauses for BREAKER_COOLDOWN seconds (0 disables it)
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+# Pipeline: search, detail scraping, the CSV writer and the DB load run concurrently,
+# connected by queues holding at most PIPELINE_QUEUE_SIZE items
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "100"))
+
+# Multi-host runs through a Postgres work queue in the RDS database: `python main.py --coordinator` runs the
+# search and builds the output, and any number of `python main.py --worker` processes scrape the detail pages.
+# A job whose worker stops sending heartbeats for QUEUE_LEASE_SECONDS is handed to another worker, and a job
+# is marked failed after QUEUE_MAX_ATTEMPTS attempts. Idle workers exit after QUEUE_WORKER_IDLE_EXIT seconds (0 = never)
+QUEUE_LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "5"))
+QUEUE_WORKER_IDLE_EXIT = float(os.getenv("QUEUE_WORKER_IDLE_EXIT", "300"))
+
+# Checkpoint file used to resume interrupted runs (python main.py --resume)
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "scrape_checkpoint.jsonl")
+
+# Browser profile: "default" loads every resource; "lean" blocks images, fonts and the
+# analytics hosts in BLOCKED_HOSTS and returns from page loads once the DOM is ready
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "default").lower()
+BLOCKED_HOSTS = [host.strip() for host in os.getenv(
+    "BLOCKED_HOSTS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,dap.digitalgov.gov,"
+    "touchpoints.app.cloud.gov,foresee.com,foreseeresults.com,newrelic.com,nr-data.net"
+).split(",") if host.strip()]
+
+# Explicit wait timeouts (seconds)
+SEARCH_WAIT_TIMEOUT = float(os.getenv("SEARCH_WAIT_TIMEOUT", "30"))
+# Per NAICS code, for the autocomplete to suggest and accept it; a code it does not take fails the search
+NAICS_WAIT_TIMEOUT = float(os.getenv("NAICS_WAIT_TIMEOUT", "10"))
+POPUP_WAIT_TIMEOUT = float(os.getenv("POPUP_WAIT_TIMEOUT", "5"))
+DETAIL_WAIT_TIMEOUT = float(os.getenv("DETAIL_WAIT_TIMEOUT", "5"))
+FIELD_WAIT_TIMEOUT = float(os.getenv("FIELD_WAIT_TIMEOUT", "3"))
+
+# Optional attachment downloads into a content-addressed store (requires requests)
+DOWNLOAD_ATTACHMENTS = os.getenv("DOWNLOAD_ATTACHMENTS", "false").lower() == "true"
+ATTACHMENTS_DIRECTORY = os.getenv("ATTACHMENTS_DIRECTORY") or os.path.join(FINAL_OUTPUT_DIRECTORY or ".", "attachments")
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "4"))
+DOWNLOAD_TIMEOUT = float(os.getenv("DOWNLOAD_TIMEOUT", "60"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+
+# Optional Parquet copy of the output, partitioned by scrape date and department (requires pyarrow)
+PARQUET_OUTPUT = os.getenv("PARQUET_OUTPUT", "false").lower() == "true"
+PARQUET_DIRECTORY = os.getenv("PARQUET_DIRECTORY") or os.path.join(FINAL_OUTPUT_DIRECTORY or ".", "parquet")
+
+# Optional alerts: the JSON rules in ALERT_RULES_PATH are matched against each run through a persistent
+# word index at ALERT_INDEX_PATH, and matches are written to alerts_<n>_<timestamp>.csv next to the CSV
+ALERT_RULES_PATH = os.getenv("ALERT_RULES_PATH")
+ALERT_INDEX_PATH = os.getenv("ALERT_INDEX_PATH", "alert_index.sqlite3")
+
+# Change report: each run's CSV is compared with the previous run's and the new, removed and changed
+# notices and attachments are written to changes_<n>_<timestamp>.csv next to it (see run_diff)
+RUN_DIFF = os.getenv("RUN_DIFF", "true").lower() == "true"
+
+# Run metrics: a JSON report is always written next to the CSV; set METRICS_PORT to also
+# serve Prometheus-format metrics at http://<host>:<port>/metrics while the run is in progress
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Run timestamp, shared by the log file and the run's output files (cli.py sets it before a run)
 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-log_file_number = len(os.listdir(LOGS_DIRECTORY)) + 1
-log_file_path = os.path.join(LOGS_DIRECTORY, f"log_{log_file_number}_{timestamp}.txt")
-
-# Configure logging to output to both file and console
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler(log_file_path),
-        logging.StreamHandler()
-    ]
+
+# Search result selectors
+RESULT_LIST_SELECTOR = (
+    "#main-container > app-frontend-search-home > div > "
+    "div > div > div.desktop\\:grid-col-8.tablet-lg\\:grid-col-12.mobile-lg\\:grid-col-12 "
+    "> search-list-layout > div:nth-child(2) > div > div > sds-search-result-list > div"
 )
+CONTRACT_NAME_SELECTOR = "app-opportunity-result > div > div.grid-col-12.tablet\\:grid-col-9 > div:nth-child(1)"
+NOTICE_ID_SELECTOR = "app-opportunity-result > div > div.grid-col-12.tablet\\:grid-col-9 > div:nth-child(2)"
+DEPARTMENT_SELECTOR = "div.grid-row.grid-gap.ng-star-inserted > div:nth-child(1) > div"
+# Last-modified day shown on a result card, preferring "Updated Date" over "Published Date"
+MODIFIED_DATE_PATTERNS = [
+    r"Updated Date\s*:?\s*([A-Z][a-z]{2} \d{1,2}, \d{4})",
+    r"Published Date\s*:?\s*([A-Z][a-z]{2} \d{1,2}, \d{4})",
+]
+
+def wait_until(driver, condition, timeout):
+    """
+    Wait up to `timeout` seconds for `condition`, recording the time spent as the "wait" stage.
+    Returns the condition's result or raises TimeoutException.
+    """
+    with METRICS.timer("wait"):
+        try:
+            return WebDriverWait(driver, timeout).until(condition)
+        except TimeoutException:
+            METRICS.increment("wait_timeouts")
+            raise
+
+def wait_summary():
+    """Time spent in explicit waits, for the run summary."""
+    waits = METRICS.stage_summary("wait")
+    return (f"{waits['total_seconds']:.1f}s spent waiting across {waits['count']} waits "
+            f"({METRICS.counters.get('wait_timeouts', 0)} timed out)")
+
+def result_notice_ids(driver):
+    """Return the raw Notice ID text of every result currently rendered in the search list."""
+    return driver.execute_script(
+        """
+        var noticeIdSelector = arguments[1];
+        return Array.from(document.querySelectorAll(arguments[0])).map(function (row) {
+            var elem = row.querySelector(noticeIdSelector);
+            return elem ? elem.textContent.trim() : "";
+        });
+        """,
+        RESULT_LIST_SELECTOR,
+        NOTICE_ID_SELECTOR
+    )
+
+def extract_result_rows(driver):
+    """
+    Extract every search result on the current page with one execute_script round-trip.
+    Returns a list with a dict (name, notice_id, department, link, modified_date) per result,
+    or None in place of any result that could not be parsed.
+    """
+    return driver.execute_script(
+        """
+        var nameSelector = arguments[1], noticeIdSelector = arguments[2], departmentSelector = arguments[3];
+        var modifiedPatterns = arguments[4].map(function (pattern) { return new RegExp(pattern); });
+        function text(row, selector) {
+            var elem = row.querySelector(selector);
+            return elem ? elem.innerText.trim() : null;
+        }
+        return Array.from(document.querySelectorAll(arguments[0])).map(function (row) {
+            var link = row.querySelector("a[href]");
+            var parsed = {
+                name: text(row, nameSelector),
+                notice_id: text(row, noticeIdSelector),
+                department: text(row, departmentSelector),
+                link: link ? link.href : null
+            };
+            for (var key in parsed) {
+                if (parsed[key] === null) {
+                    return null;
+                }
+            }
+            parsed.modified_date = "";
+            for (var i = 0; i < modifiedPatterns.length && !parsed.modified_date; i++) {
+                var match = modifiedPatterns[i].exec(row.innerText);
+                parsed.modified_date = match ? match[1] : "";
+            }
+            return parsed;
+        });
+        """,
+        RESULT_LIST_SELECTOR,
+        CONTRACT_NAME_SELECTOR,
+        NOTICE_ID_SELECTOR,
+        DEPARTMENT_SELECTOR,
+        MODIFIED_DATE_PATTERNS
+    ) or []
+
+def extract_result_row_elements(result):
+    """
+    Per-element fallback for a single search result WebElement.
+    Returns the same dict as extract_result_rows, raising if an element is missing.
+    """
+    return {
+        "name": result.find_element(By.CSS_SELECTOR, CONTRACT_NAME_SELECTOR).text.strip(),
+        "notice_id": result.find_element(By.CSS_SELECTOR, NOTICE_ID_SELECTOR).text.strip(),
+        "department": result.find_element(By.CSS_SELECTOR, DEPARTMENT_SELECTOR).text.strip(),
+        "link": result.find_element(By.CSS_SELECTOR, "a[href]").get_attribute("href"),
+        "modified_date": parse_modified_date(result.text),
+    }
+
+def parse_modified_date(card_text):
+    """Return the last-modified day (e.g. "Mar 04, 2025") from a result card's text, or ""."""
+    for pattern in MODIFIED_DATE_PATTERNS:
+        match = re.search(pattern, card_text or "")
+        if match:
+            return match.group(1)
+    return ""
+
+def results_rerendered(previous_ids):
+    """
+    Expected condition: the search result list is rendered and its Notice IDs
+    differ from `previous_ids` (i.e. a new page or filter has been applied).
+    """
+    def _predicate(driver):
+        notice_ids = result_notice_ids(driver)
+        return notice_ids if notice_ids and notice_ids != previous_ids else False
+    return _predicate
+
+def pagination_at_page(page_number):
+    """Expected condition: the pagination input shows `page_number`."""
+    def _predicate(driver):
+        current = driver.find_element(By.ID, "bottomPagination-currentPage").get_attribute("value")
+        return (current or "").strip() == str(page_number)
+    return _predicate
+
+def results_page_url(search_url, page_number):
+    """Return `search_url` with its `page` query parameter set to `page_number`, keeping every other filter."""
+    parts = urlsplit(search_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "page"]
+    query.append(("page", str(page_number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def naics_code_accepted(search_box, code):
+    """Expected condition: the NAICS autocomplete has consumed `code` and cleared its input."""
+    def _predicate(driver):
+        return (search_box.get_attribute("value") or "").strip() != code
+    return _predicate
+
+# Firefox preferences applied by the lean profile
+LEAN_FIREFOX_PREFS = {
+    "permissions.default.image": 2,  # Never load images
+    "gfx.downloadable_fonts.enabled": False,  # No web fonts
+    "browser.display.use_document_fonts": 0,
+    "media.autoplay.default": 5,  # Block all media autoplay
+    "browser.cache.disk.enable": False,  # Keep the HTTP cache in memory only
+    "browser.cache.memory.enable": True,
+    "browser.cache.offline.enable": False,
+    "network.http.use-cache": True,
+    "network.prefetch-next": False,  # No speculative prefetching or preconnects
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.sessionhistory.max_entries": 2,  # Drivers only ever go forward
+    "browser.sessionstore.resume_from_crash": False,
+    "dom.ipc.processCount": 1,  # One content process per browser
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "app.update.auto": False,
+}
+
+def blocklist_pac_url(blocked_hosts):
+    """
+    Proxy auto-config script (as a data: URL) that sends requests for `blocked_hosts`
+    and their subdomains to a closed local port, so they fail immediately.
+    """
+    pac = (
+        "function FindProxyForURL(url, host) {"
+        f"  var blocked = {json.dumps(blocked_hosts)};"
+        "  for (var i = 0; i < blocked.length; i++) {"
+        "    if (host == blocked[i] || dnsDomainIs(host, '.' + blocked[i])) { return 'PROXY 127.0.0.1:9'; }"
+        "  }"
+        "  return 'DIRECT';"
+        "}"
+    )
+    return "data:application/x-ns-proxy-autoconfig," + quote(pac)
 
-def initialize_driver():
-    """Initialize a new Selenium WebDriver, with window size adjustments."""
-    logging.info("Initializing the Selenium WebDriver.")
+def browser_options(profile=BROWSER_PROFILE):
+    """Firefox options for the "default" or "lean" browser profile."""
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-extensions")
     options.add_argument("--no-sandbox")
 
+    if profile == "lean":
+        options.page_load_strategy = "eager"
+        for name, value in LEAN_FIREFOX_PREFS.items():
+            options.set_preference(name, value)
+        if BLOCKED_HOSTS:
+            options.set_preference("network.proxy.type", 2)
+            options.set_preference("network.proxy.autoconfig_url", blocklist_pac_url(BLOCKED_HOSTS))
+    elif profile != "default":
+        logging.warning(f"Unknown BROWSER_PROFILE '{profile}'; using the default profile.")
+    return options
+
+def initialize_driver(profile=BROWSER_PROFILE):
+    """Initialize a new Selenium WebDriver with the given browser profile, with window size adjustments."""
+    logging.info(f"Initializing the Selenium WebDriver ({profile} profile).")
+    options = browser_options(profile)
+
     service = Service(GECKO_DRIVER_PATH)
-    driver = webdriver.Firefox(service=service, options=options)
+    with METRICS.timer("driver_start"):
+        driver = webdriver.Firefox(service=service, options=options)
 
     # Optional: Maximize or set a larger window size so elements are less likely out-of-bounds
     driver.set_window_size(1920, 1080)
@@ -81,6 +357,119 @@ def initialize_driver():
     logging.info("WebDriver initialized successfully.")
     return driver
 
+class DriverPool:
+    """
+    A bounded pool of reusable Selenium WebDrivers.
+    Drivers are checked out for one contract at a time, health-checked before reuse,
+    have their cookies and storage cleared when returned, and are recycled after
+    `max_uses` checkouts or after an error.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self):
+        """Check out a healthy driver, starting a new one if none are idle."""
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if self._is_healthy(driver):
+                    return driver
+                logging.warning("Discarding unhealthy WebDriver from the pool.")
+                self._discard(driver)
+
+            driver = initialize_driver()
+            with self._lock:
+                self._uses[driver] = 0
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, failed=False):
+        """Return a driver to the pool, recycling it if it failed or reached its use limit."""
+        try:
+            with self._lock:
+                self._uses[driver] = self._uses.get(driver, 0) + 1
+                uses = self._uses[driver]
+
+            if failed or self._closed:
+                self._discard(driver)
+            elif uses >= self.max_uses:
+                logging.info(f"Recycling WebDriver after {uses} uses.")
+                self._discard(driver)
+            elif not self._reset(driver):
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """Context manager that checks a driver out and returns it, recycling it on error."""
+        driver = self.acquire()
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, failed=failed)
+
+    def close(self):
+        """Quit every idle driver. Drivers still checked out are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        """Clear cookies and web storage so the next contract starts from a clean session."""
+        try:
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass  # Storage is not accessible on some pages (e.g. about:blank)
+            driver.delete_all_cookies()
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to reset WebDriver session: {e}")
+            return False
+
+    def _discard(self, driver):
+        METRICS.increment("driver_recycles")
+        with self._lock:
+            self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+# Shared by every search and detail worker, so a failing host pauses all of them
+CIRCUIT_BREAKERS = HostCircuitBreakers(BREAKER_WINDOW, BREAKER_FAILURE_RATE, BREAKER_COOLDOWN)
+
 def close_main_page_popups(driver):
     """
     Attempt to close any pop-ups on the main page.
@@ -89,8 +478,8 @@ def close_main_page_popups(driver):
     try:
         logging.info("Attempting to close main page pop-ups (if any).")
         # Example: wait for a generic close button and click it
-        popup_close = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, ".close"))
+        popup_close = wait_until(
+            driver, EC.element_to_be_clickable((By.CSS_SELECTOR, ".close")), POPUP_WAIT_TIMEOUT
         )
         driver.execute_script("arguments[0].click();", popup_close)
         logging.info("Main page popup closed.")
@@ -105,28 +494,42 @@ def safely_enter_naics_codes(driver, naics_list):
       2) Scroll the element into view (centered)
       3) Attempt normal clear + send_keys
       4) If that fails, fallback to JS .value assignment
+      5) Wait for the autocomplete to accept each code before entering the next
+    Raises RuntimeError if any code gets no suggestion or is not accepted within NAICS_WAIT_TIMEOUT,
+    so the search fails instead of running with fewer filters (or none) than requested.
     """
-    wait = WebDriverWait(driver, 30)
-    naics_search_box = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "#naics")))
+    naics_search_box = wait_until(
+        driver, EC.visibility_of_element_located((By.CSS_SELECTOR, "#naics")), SEARCH_WAIT_TIMEOUT
+    )
 
     # Scroll the #naics box into the middle of the screen
     driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", naics_search_box)
-    time.sleep(1)
 
     # Press ESC to possibly close any overlay
     driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-    time.sleep(1)
 
     # Enter each code
+    rejected = []
     for code in naics_list:
         try:
             # Attempt normal approach
             naics_search_box.clear()
-            time.sleep(0.5)
             naics_search_box.send_keys(code.strip())
-            time.sleep(1)
+            # Wait for the autocomplete suggestion for this code before selecting it
+            try:
+                wait_until(
+                    driver,
+                    EC.visibility_of_element_located(
+                        (By.XPATH, f"//*[@role='option' and contains(normalize-space(.), '{code.strip()}')]")
+                    ),
+                    NAICS_WAIT_TIMEOUT
+                )
+            except TimeoutException:
+                logging.error(f"No autocomplete suggestion appeared for NAICS {code}.")
+                naics_search_box.clear()
+                rejected.append(code.strip())
+                continue
             naics_search_box.send_keys(Keys.RETURN)
-            time.sleep(2)
         except Exception as e:
             logging.warning(f"Normal send_keys failed on NAICS {code}. Trying JS fallback. Error: {e}")
 
@@ -137,124 +540,327 @@ def safely_enter_naics_codes(driver, naics_list):
             driver.execute_script("arguments[0].dispatchEvent(new Event('change'));", naics_search_box)
             # Press ENTER
             naics_search_box.send_keys(Keys.RETURN)
-            time.sleep(2)
 
-def scrape_contracts(driver):
+        try:
+            wait_until(driver, naics_code_accepted(naics_search_box, code.strip()), NAICS_WAIT_TIMEOUT)
+        except TimeoutException:
+            logging.error(f"NAICS {code} was not confirmed by the search form.")
+            driver.execute_script("arguments[0].value='';", naics_search_box)
+            rejected.append(code.strip())
+
+    if rejected:
+        applied = len(naics_list) - len(rejected)
+        raise RuntimeError(
+            f"NAICS codes could not be applied: {', '.join(rejected)} "
+            f"({'none' if applied == 0 else applied} of {len(naics_list)} applied); not running the search."
+        )
+
+def extract_page_contracts(driver, page_number):
     """
-    Scrape contracts from the target URL.
-    Returns a pandas DataFrame of all contracts scraped or None on failure.
+    Extract the contracts from the results page currently loaded in `driver`.
+    Results the bulk script cannot parse fall back to per-element lookups, and results
+    that still fail become failed rows so they are counted in the summary.
     """
-    try:
-        logging.info("Navigating to the target URL.")
-        driver.get(TARGET_URL)
-        logging.info("Opened target URL.")
+    # Every result in the list, extracted with a single script call
+    result_rows = extract_result_rows(driver)
+    result_list = None  # WebElements, only fetched if a row needs the per-element fallback
 
-        # Attempt to close any pop-ups on the main page
-        close_main_page_popups(driver)
+    page_contracts = []
+    for idx, result_row in enumerate(result_rows, start=1):
+        try:
+            if result_row is None:
+                logging.warning(f"Bulk extraction failed for result {idx} on page {page_number}; "
+                                f"falling back to per-element lookup.")
+                if result_list is None:
+                    result_list = driver.find_elements(By.CSS_SELECTOR, RESULT_LIST_SELECTOR)
+                result_row = extract_result_row_elements(result_list[idx - 1])
+
+            notice_id = result_row["notice_id"].replace("Notice ID:", "").strip()
+            department = result_row["department"].replace("Department/Ind.Agency", "").strip()
+
+            page_contracts.append({
+                "Contract Name": result_row["name"],
+                "Notice ID": notice_id,
+                "Department": department,
+                "Contract Link": result_row["link"],
+                "Last Modified Date": result_row["modified_date"],
+                "Failed Row": False,
+                "Incomplete Data": False,
+                "Total Attachments": 0,
+                "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+        except Exception as e:
+            logging.error(f"Error extracting data for result {idx} on page {page_number}: {e}")
+            page_contracts.append(failed_search_row("Error extracting"))
+
+    logging.info(f"Scraped {sum(not c['Failed Row'] for c in page_contracts)} contracts from page {page_number}.")
+    return page_contracts
+
+def failed_search_row(contract_name):
+    """Placeholder row for a search result (or whole results page) that could not be scraped."""
+    return {
+        "Contract Name": contract_name,
+        "Notice ID": "",
+        "Department": "",
+        "Contract Link": "",
+        "Last Modified Date": "",
+        "Failed Row": True,
+        "Incomplete Data": True,
+        "Total Attachments": 0,
+        "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
 
-        wait = WebDriverWait(driver, 30)
-        logging.info("Looking for the accordion container (#usa-accordion-item-7).")
+def scrape_result_page(driver, search_url, page_number):
+    """Load one results page directly by its URL and return its contracts. Raises if the page does not render."""
+    with METRICS.timer("search_page_load"):
+        driver.get(results_page_url(search_url, page_number))
+        wait_until(driver, pagination_at_page(page_number), SEARCH_WAIT_TIMEOUT)
+        wait_until(driver, results_rerendered([]), SEARCH_WAIT_TIMEOUT)
+    with METRICS.timer("search_page_extract"):
+        return extract_page_contracts(driver, page_number)
 
-        # Expand the accordion that contains #naics
+def scrape_result_page_with_retries(checkout, search_url, page_number, retries=PAGE_RETRIES):
+    """
+    Scrape one results page, retrying it on its own up to `retries` times with exponential backoff.
+    `checkout` is a context manager factory yielding the driver to use for each attempt,
+    so a pooled driver that failed is recycled before the retry.
+    Returns the page's contracts, or None if every attempt failed.
+    """
+    policy = RetryPolicy(retries, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+    breaker = CIRCUIT_BREAKERS.for_url(search_url)
+    for attempt in range(1, policy.attempts + 1):
+        breaker.wait()
         try:
-            accordion_container = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "#usa-accordion-item-7"))
-            )
-            driver.execute_script("arguments[0].click();", accordion_container)
-            time.sleep(3)  # wait a bit for the accordion to fully expand
-            logging.info("#usa-accordion-item-7 clicked (expanded).")
+            with checkout() as driver:
+                logging.info(f"Processing page {page_number} (attempt {attempt}/{policy.attempts})...")
+                contracts = scrape_result_page(driver, search_url, page_number)
+            breaker.record(True)
+            return contracts
         except Exception as e:
-            logging.warning(f"Could not find or click #usa-accordion-item-7: {e}")
+            breaker.record(False)
+            logging.warning(f"Attempt {attempt}/{policy.attempts} to load page {page_number} failed: {e}")
+            if attempt < policy.attempts:
+                METRICS.increment("page_retries")
+                policy.sleep(attempt)
+    METRICS.increment("page_failures")
+    logging.error(f"Giving up on page {page_number} after {policy.attempts} attempts.")
+    return None
+
+def scrape_result_pages(driver, search_url, page_numbers, page_workers=PAGE_WORKERS):
+    """
+    Yield (page number, contracts or None) for each of `page_numbers`, in order.
+    With one worker every page is loaded in `driver`; otherwise the pages are spread
+    across a pool of `page_workers` drivers and fetched in parallel.
+    """
+    if page_workers <= 1 or len(page_numbers) <= 1:
+        for page_number in page_numbers:
+            yield page_number, scrape_result_page_with_retries(lambda: nullcontext(driver), search_url, page_number)
+        return
+
+    pool = DriverPool(size=page_workers)
+    executor = ThreadPoolExecutor(max_workers=page_workers, thread_name_prefix="page")
+    try:
+        results = executor.map(
+            lambda page_number: scrape_result_page_with_retries(pool.driver, search_url, page_number),
+            page_numbers
+        )
+        yield from zip(page_numbers, results)
+    finally:
+        # Stopping early (or an error) cancels the pages that have not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+        pool.close()
+
+def iter_contract_pages(driver, state_store=None, checkpoint=None, naics_codes=None, shard=None):
+    """
+    Search the target URL, filtered by `naics_codes` (all NAICS_CODES by default), and yield the
+    contracts of each results page as a list, in page order, as soon as the page is available.
+    After the NAICS filter is applied in `driver`, every results page is loaded directly through
+    the `page` URL parameter (by PAGE_WORKERS drivers), and a page that fails is retried on its own.
+    Pages that still fail are retried once more at the end and then yielded out of order.
+    With a state store and STOP_AT_SEEN_PAGE, pagination stops after the first page whose
+    notices are all unchanged since the last run (results are sorted by -modifiedDate).
+    With a checkpoint, every completed page is recorded (under the `shard` key for sharded
+    searches) and a resumed run only fetches the pages that are missing.
+    Raises if the search itself cannot be set up.
+    """
+    logging.info("Navigating to the target URL.")
+    driver.get(TARGET_URL)
+    logging.info("Opened target URL.")
 
-        logging.info("Locating NAICS search box (#naics).")
-        safely_enter_naics_codes(driver, NAICS_CODES)
-        logging.info("NAICS codes entered.")
+    # Attempt to close any pop-ups on the main page
+    close_main_page_popups(driver)
 
-        # Now wait for pagination or results to appear
-        total_pages_elem = wait.until(
-            EC.presence_of_element_located((By.ID, "bottomPagination-currentPage"))
+    logging.info("Looking for the accordion container (#usa-accordion-item-7).")
+
+    # Expand the accordion that contains #naics (safely_enter_naics_codes waits for it to be visible)
+    try:
+        accordion_container = wait_until(
+            driver, EC.element_to_be_clickable((By.CSS_SELECTOR, "#usa-accordion-item-7")), SEARCH_WAIT_TIMEOUT
         )
-        total_pages = int(total_pages_elem.get_attribute("max"))
-        logging.info(f"Total pages to process: {total_pages}")
-
-        all_contracts = []
-        current_page = 1
-
-        while current_page <= total_pages:
-            logging.info(f"Processing page {current_page}...")
-            time.sleep(5)
-
-            # Each result in the list
-            result_list = driver.find_elements(
-                By.CSS_SELECTOR,
-                "#main-container > app-frontend-search-home > div > "
-                "div > div > div.desktop\\:grid-col-8.tablet-lg\\:grid-col-12.mobile-lg\\:grid-col-12 "
-                "> search-list-layout > div:nth-child(2) > div > div > sds-search-result-list > div"
-            )
+        driver.execute_script("arguments[0].click();", accordion_container)
+        logging.info("#usa-accordion-item-7 clicked (expanded).")
+    except Exception as e:
+        logging.warning(f"Could not find or click #usa-accordion-item-7: {e}")
 
-            contracts_in_page = 0
-            for idx, result in enumerate(result_list, start=1):
-                try:
-                    notice_id_raw = result.find_element(
-                        By.CSS_SELECTOR,
-                        "app-opportunity-result > div > div.grid-col-12.tablet\\:grid-col-9 > div:nth-child(2)"
-                    ).text.strip()
-                    notice_id = notice_id_raw.replace("Notice ID:", "").strip()
-
-                    department_raw = result.find_element(
-                        By.CSS_SELECTOR,
-                        "div.grid-row.grid-gap.ng-star-inserted > div:nth-child(1) > div"
-                    ).text.strip()
-                    department = department_raw.replace("Department/Ind.Agency", "").strip()
-
-                    contract_data = {
-                        "Contract Name": result.find_element(
-                            By.CSS_SELECTOR,
-                            "app-opportunity-result > div > div.grid-col-12.tablet\\:grid-col-9 > div:nth-child(1)"
-                        ).text.strip(),
-                        "Notice ID": notice_id,
-                        "Department": department,
-                        "Contract Link": result.find_element(By.CSS_SELECTOR, "a[href]").get_attribute("href"),
-                        "Failed Row": False,
-                        "Incomplete Data": False,
-                        "Total Attachments": 0,
-                        "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    all_contracts.append(contract_data)
-                    contracts_in_page += 1
-                except Exception as e:
-                    logging.error(f"Error extracting data for result {idx} on page {current_page}: {e}")
-                    all_contracts.append({
-                        "Contract Name": "Error extracting",
-                        "Notice ID": "",
-                        "Department": "",
-                        "Contract Link": "",
-                        "Failed Row": True,
-                        "Incomplete Data": True,
-                        "Total Attachments": 0,
-                        "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-
-            logging.info(f"Scraped {contracts_in_page} contracts from page {current_page}.")
-
-            # Go to the next page if any
-            if current_page < total_pages:
-                next_button = wait.until(
-                    EC.element_to_be_clickable((By.ID, "bottomPagination-nextPage"))
-                )
-                driver.execute_script("arguments[0].click();", next_button)
-                time.sleep(5)
-                current_page += 1
-            else:
-                break
+    # Remember the unfiltered results so we can tell when the NAICS filter has been applied
+    unfiltered_ids = result_notice_ids(driver)
+
+    logging.info("Locating NAICS search box (#naics).")
+    safely_enter_naics_codes(driver, naics_codes or NAICS_CODES)
+    logging.info("NAICS codes entered.")
 
+    try:
+        wait_until(driver, results_rerendered(unfiltered_ids), SEARCH_WAIT_TIMEOUT)
+    except TimeoutException:
+        logging.warning("Results did not change after entering the NAICS codes.")
+
+    # Now wait for pagination or results to appear
+    total_pages_elem = wait_until(
+        driver, EC.presence_of_element_located((By.ID, "bottomPagination-currentPage")), SEARCH_WAIT_TIMEOUT
+    )
+    total_pages = int(total_pages_elem.get_attribute("max"))
+    logging.info(f"Total pages to process: {total_pages}")
+
+    # The filtered search is reflected in the URL, so every page can be loaded from it directly
+    search_url = driver.current_url
+    if "naics" not in search_url.lower():
+        raise RuntimeError(f"The NAICS filter does not appear in the search URL: {search_url}")
+
+    completed_pages = {}
+    if checkpoint:
+        completed_pages = {
+            page: contracts for (page_shard, page), contracts in checkpoint.pages.items()
+            if page_shard == shard and page <= total_pages
+        }
+        if completed_pages:
+            logging.info(f"Resuming search with {len(completed_pages)} of {total_pages} pages already completed.")
+    pending_pages = [page for page in range(1, total_pages + 1) if page not in completed_pages]
+
+    fetched_pages = scrape_result_pages(driver, search_url, pending_pages)
+    failed_pages = []
+    try:
+        for page_number in range(1, total_pages + 1):
+            if page_number in completed_pages:
+                yield completed_pages[page_number]
+                continue
+
+            _, page_contracts = next(fetched_pages)
+            if page_contracts is None:
+                failed_pages.append(page_number)  # Retried once more after the other pages
+                continue
+
+            if checkpoint:
+                checkpoint.record_page(page_number, page_contracts, shard)
+            yield page_contracts
+
+            # Everything after a fully unchanged page was modified even earlier, so it has been seen too
+            if state_store and STOP_AT_SEEN_PAGE and page_contracts and all(
+                state_store.is_unchanged(contract["Notice ID"], contract["Last Modified Date"])
+                for contract in page_contracts
+            ):
+                logging.info(f"Page {page_number} contains only unchanged notices; stopping pagination.")
+                break
+    finally:
+        fetched_pages.close()
+
+    # Give the pages that failed another round now that the site has had time to recover
+    if failed_pages:
+        logging.info(f"Retrying pages {failed_pages} after the rest of the search.")
+        METRICS.increment("pages_requeued", len(failed_pages))
+    still_failed = []
+    for page_number in failed_pages:
+        page_contracts = scrape_result_page_with_retries(lambda: nullcontext(driver), search_url, page_number)
+        if page_contracts is None:
+            still_failed.append(page_number)
+            yield [failed_search_row(f"Failed to load page {page_number}")]
+            continue
+        METRICS.increment("requeued_pages_recovered")
+        if checkpoint:
+            checkpoint.record_page(page_number, page_contracts, shard)
+        yield page_contracts
+
+    if still_failed:
+        logging.error(f"Pages {still_failed} could not be loaded and were recorded as failed rows.")
+    if checkpoint:
+        checkpoint.record_search_complete(shard)
+
+@METRICS.timed("search")
+def scrape_contracts(driver, state_store=None, checkpoint=None, naics_codes=None, shard=None):
+    """
+    Scrape every results page of the search (see iter_contract_pages).
+    Returns a pandas DataFrame of all contracts scraped or None on failure.
+    """
+    import pandas as pd
+    try:
+        all_contracts = [
+            contract
+            for page_contracts in iter_contract_pages(driver, state_store, checkpoint, naics_codes, shard)
+            for contract in page_contracts
+        ]
         logging.info(f"Scraped a total of {len(all_contracts)} contracts.")
         return pd.DataFrame(all_contracts)
 
     except Exception as e:
+        METRICS.increment("search_failures")
         logging.error(f"Error during contract scraping: {e}")
         return None  # Return None so we can handle it gracefully
 
+def deduplicate_contracts(contracts):
+    """Drop repeated Notice IDs, keeping the first occurrence (rows without a Notice ID are all kept)."""
+    seen = set()
+    unique = []
+    for contract in contracts:
+        notice_id = contract["Notice ID"]
+        if notice_id and notice_id in seen:
+            continue
+        seen.add(notice_id)
+        unique.append(contract)
+    return unique
+
+def naics_shards(naics_codes=NAICS_CODES, codes_per_shard=NAICS_PER_SHARD):
+    """Split the NAICS codes into groups of `codes_per_shard`, ordered by their shard key."""
+    codes = [code.strip() for code in naics_codes if code.strip()]
+    shards = [codes[i:i + codes_per_shard] for i in range(0, len(codes), codes_per_shard)]
+    return sorted(shards, key=",".join)
+
+def scrape_contracts_sharded(state_store=None, checkpoint=None, max_workers=SEARCH_WORKERS):
+    """
+    Run one search per NAICS shard, each with its own driver, up to `max_workers` at a time.
+    Shard results are merged in shard key order and de-duplicated by Notice ID.
+    Returns a pandas DataFrame, or None if any shard failed (completed shards stay checkpointed).
+    """
+    import pandas as pd
+    shards = naics_shards()
+    logging.info(f"Running {len(shards)} search shards with {max(1, max_workers)} worker(s).")
+
+    def run_shard(codes):
+        shard = ",".join(codes)
+        if checkpoint and shard in checkpoint.completed_searches:
+            logging.info(f"Search shard {shard} already completed in the checkpoint.")
+            return pd.DataFrame(checkpoint.search_contracts(shard))
+        driver = initialize_driver()
+        try:
+            return scrape_contracts(driver, state_store, checkpoint, naics_codes=codes, shard=shard)
+        finally:
+            driver.quit()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="search") as executor:
+        results = list(executor.map(run_shard, shards))
+
+    failed = [",".join(codes) for codes, result in zip(shards, results) if result is None]
+    if failed:
+        logging.error(f"Search shards failed: {'; '.join(failed)}")
+        return None
+
+    contracts = deduplicate_contracts(
+        contract for result in results for contract in result.to_dict("records")
+    )
+    logging.info(f"Merged {sum(len(result) for result in results)} shard results into "
+                 f"{len(contracts)} unique contracts.")
+    if checkpoint:
+        checkpoint.record_search_complete()
+    return pd.DataFrame(contracts)
+
 def clean_date_field(text_value, prefix):
     """
     Given the full text with a prefix, remove the prefix and return just the date/time part.
@@ -264,12 +870,197 @@ def clean_date_field(text_value, prefix):
         return text_value.replace(prefix, "").strip()
     return text_value.strip() if text_value else ""
 
-def scrape_attachments(contract_link):
+# Detail page date fields: (element id, label prefix removed by clean_date_field)
+DETAIL_DATE_FIELDS = [
+    ("general-published-date", "Updated Published Date:"),
+    ("general-original-published-date", "Original Published Date:"),
+    ("general-response-date", "Updated Date Offers Due:"),
+    ("general-original-response-date", "Original Date Offers Due:"),
+]
+
+DETAIL_SNAPSHOT_SCRIPT = """
+var dateIds = arguments[0];
+function text(elem) {
+    return elem ? elem.innerText.trim() : null;
+}
+var dates = dateIds.map(function (id) { return text(document.getElementById(id)); });
+var attachments = [];
+for (var index = 0; ; index++) {
+    var link = document.getElementById("opp-view-attachments-fileLinkId" + index);
+    var date = document.getElementById("opp-view-attachments-date" + index);
+    if (!link || !date) {
+        break;
+    }
+    attachments.push({name: text(link), link: link.href || link.getAttribute("href"), date: text(date)});
+}
+// The accordion button points at its content; an empty section says so in its text
+var section = document.getElementById("button-opp-view-attachments-accordion-section");
+var content = section && (document.getElementById(section.getAttribute("aria-controls")) || section.parentElement);
+return {
+    dates: dates,
+    attachments: attachments,
+    has_attachments_section: !!section,
+    attachments_empty_state: !!content && /\\bno (attachments|documents|files)\\b/i.test(content.innerText)
+};
+"""
+
+def detail_snapshot_settled():
+    """
+    Expected condition: the detail page has rendered its dates or attachments section,
+    and two consecutive DOM snapshots are identical. An attachments section without rows only
+    counts once it shows its "no attachments" empty state, since the rows render after the section.
+    Returns the settled snapshot.
+    """
+    previous = [None]
+
+    def _predicate(driver):
+        snapshot = driver.execute_script(DETAIL_SNAPSHOT_SCRIPT, [field_id for field_id, _ in DETAIL_DATE_FIELDS])
+        rendered = snapshot["has_attachments_section"] or any(snapshot["dates"])
+        if snapshot["has_attachments_section"] and not snapshot["attachments"]:
+            rendered = snapshot["attachments_empty_state"]
+        settled = rendered and snapshot == previous[0]
+        previous[0] = snapshot
+        return snapshot if settled else False
+    return _predicate
+
+def extract_detail_snapshot(driver):
+    """
+    Read all four date fields and the full attachment table of a loaded detail page
+    with one script call per poll instead of one wait per element.
+    Returns the same tuple as scrape_attachments, or None if the snapshot could not be taken.
+    """
+    try:
+        snapshot = wait_until(driver, detail_snapshot_settled(), DETAIL_WAIT_TIMEOUT)
+    except TimeoutException:
+        # Take whatever is on the page now; missing fields come back empty
+        try:
+            snapshot = driver.execute_script(DETAIL_SNAPSHOT_SCRIPT, [field_id for field_id, _ in DETAIL_DATE_FIELDS])
+        except Exception as e:
+            logging.warning(f"Detail snapshot script failed: {e}")
+            return None
+        if snapshot["has_attachments_section"] and not snapshot["attachments"]:
+            logging.warning(f"Attachments section still had no rows after {DETAIL_WAIT_TIMEOUT}s; "
+                            "recording no attachments.")
+    except Exception as e:
+        logging.warning(f"Detail snapshot script failed: {e}")
+        return None
+
+    dates = [
+        clean_date_field(raw_text, prefix)
+        for raw_text, (_, prefix) in zip(snapshot["dates"], DETAIL_DATE_FIELDS)
+    ]
+    if not snapshot["has_attachments_section"]:
+        logging.warning("Attachments section not found.")
+    documents = [
+        {
+            "File Name": attachment["name"] or "",
+            "File Link": attachment["link"],
+            "Updated Date": attachment["date"] or ""
+        }
+        for attachment in snapshot["attachments"]
+    ]
+    return (documents, *dates)
+
+def extract_details_per_element(driver, contract_link):
+    """
+    Per-element fallback for a loaded contract detail page.
+    Looks up each date field and attachment row with its own explicit wait.
+    Returns the same tuple as scrape_attachments.
+    """
+    documents = []
+    general_published_date = ""
+    original_published_date = ""
+    updated_offers_due_date = ""
+    original_offers_due_date = ""
+
+    # General Published Date
+    try:
+        gen_pub_date_elem = wait_until(
+            driver, EC.presence_of_element_located((By.XPATH, '//*[@id="general-published-date"]')), DETAIL_WAIT_TIMEOUT
+        )
+        general_published_date = clean_date_field(gen_pub_date_elem.text, "Updated Published Date:")
+    except Exception as e:
+        logging.warning(f"Could not find the general published date for {contract_link}: {e}")
+
+    # Original Published Date
+    try:
+        orig_pub_date_elem = wait_until(
+            driver, EC.presence_of_element_located((By.XPATH, '//*[@id="general-original-published-date"]')), FIELD_WAIT_TIMEOUT
+        )
+        original_published_date = clean_date_field(orig_pub_date_elem.text, "Original Published Date:")
+    except Exception as e:
+        logging.warning(f"Could not find the original published date for {contract_link}: {e}")
+
+    # Updated Date Offers Due
+    try:
+        upd_offers_date_elem = wait_until(
+            driver, EC.presence_of_element_located((By.XPATH, '//*[@id="general-response-date"]')), FIELD_WAIT_TIMEOUT
+        )
+        updated_offers_due_date = clean_date_field(upd_offers_date_elem.text, "Updated Date Offers Due:")
+    except Exception as e:
+        logging.warning(f"Could not find the updated offers due date for {contract_link}: {e}")
+
+    # Original Date Offers Due
+    try:
+        orig_offers_date_elem = wait_until(
+            driver, EC.presence_of_element_located((By.XPATH, '//*[@id="general-original-response-date"]')), FIELD_WAIT_TIMEOUT
+        )
+        original_offers_due_date = clean_date_field(orig_offers_date_elem.text, "Original Date Offers Due:")
+    except Exception as e:
+        logging.warning(f"Could not find the original offers due date for {contract_link}: {e}")
+
+    # Wait for the attachments accordion (it is in the DOM without scrolling)
+    attachments_section = None
+    try:
+        attachments_section = wait_until(
+            driver,
+            EC.presence_of_element_located((By.ID, "button-opp-view-attachments-accordion-section")),
+            DETAIL_WAIT_TIMEOUT
+        )
+    except TimeoutException:
+        logging.warning("Attachments section not found.")
+
+    # If found, gather attachments
+    if attachments_section:
+        index = 0
+        while True:
+            try:
+                name_xpath = f'//*[@id="opp-view-attachments-fileLinkId{index}"]'
+                date_xpath = f'//*[@id="opp-view-attachments-date{index}"]'
+                attachment = wait_until(
+                    driver, EC.presence_of_element_located((By.XPATH, name_xpath)), FIELD_WAIT_TIMEOUT
+                )
+                updated_date = wait_until(
+                    driver, EC.presence_of_element_located((By.XPATH, date_xpath)), FIELD_WAIT_TIMEOUT
+                )
+                documents.append({
+                    "File Name": attachment.text.strip(),
+                    "File Link": attachment.get_attribute("href"),
+                    "Updated Date": updated_date.text.strip()
+                })
+                index += 1
+            except Exception:
+                break
+
+    return (
+        documents,
+        general_published_date,
+        original_published_date,
+        updated_offers_due_date,
+        original_offers_due_date
+    )
+
+@METRICS.timed("detail_page")
+def scrape_attachments(contract_link, driver=None):
     """
-    Scrape attachment details and required date fields from a contract link using a new Selenium session.
+    Scrape attachment details and required date fields from a contract link.
+    Uses the given driver (e.g. one checked out of a DriverPool) or a new Selenium session if none is given.
+    Errors are re-raised when the driver is borrowed so the pool can recycle it.
     Returns a tuple: (documents, general_published_date, original_published_date, updated_offers_due_date, original_offers_due_date)
     """
-    driver = initialize_driver()
+    owns_driver = driver is None
+    if owns_driver:
+        driver = initialize_driver()
     documents = []
     general_published_date = ""
     original_published_date = ""
@@ -277,108 +1068,47 @@ def scrape_attachments(contract_link):
     original_offers_due_date = ""
 
     try:
-        driver.get(contract_link)
+        with METRICS.timer("detail_page_load"):
+            driver.get(contract_link)
         logging.info(f"Processing contract link: {contract_link}")
 
         # Handle potential pop-up in detail page
         try:
-            pop_up_close_button = WebDriverWait(driver, 10).until(
+            pop_up_close_button = wait_until(
+                driver,
                 EC.element_to_be_clickable(
                     (By.CSS_SELECTOR, "usa-icon.ng-tns-c1762404166-1 > i-bs:nth-child(1) > svg:nth-child(1) > path:nth-child(1)")
-                )
+                ),
+                POPUP_WAIT_TIMEOUT
             )
             pop_up_close_button.click()
         except Exception:
             pass  # No pop-up detected or different selector
 
-        # General Published Date
-        try:
-            gen_pub_date_elem = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="general-published-date"]'))
-            )
-            general_published_date = clean_date_field(gen_pub_date_elem.text, "Updated Published Date:")
-        except Exception as e:
-            logging.warning(f"Could not find the general published date for {contract_link}: {e}")
-
-        # Original Published Date
-        try:
-            orig_pub_date_elem = WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="general-original-published-date"]'))
-            )
-            original_published_date = clean_date_field(orig_pub_date_elem.text, "Original Published Date:")
-        except Exception as e:
-            logging.warning(f"Could not find the original published date for {contract_link}: {e}")
-
-        # Updated Date Offers Due
-        try:
-            upd_offers_date_elem = WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="general-response-date"]'))
-            )
-            updated_offers_due_date = clean_date_field(upd_offers_date_elem.text, "Updated Date Offers Due:")
-        except Exception as e:
-            logging.warning(f"Could not find the updated offers due date for {contract_link}: {e}")
-
-        # Original Date Offers Due
-        try:
-            orig_offers_date_elem = WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="general-original-response-date"]'))
-            )
-            original_offers_due_date = clean_date_field(orig_offers_date_elem.text, "Original Date Offers Due:")
-        except Exception as e:
-            logging.warning(f"Could not find the original offers due date for {contract_link}: {e}")
-
-        # Scroll to attachments
-        attachments_section = None
-        scroll_pause_time = 1
-        scroll_height = 300
-        current_position = 0
-
-        while not attachments_section:
-            driver.execute_script(f"window.scrollTo(0, {current_position});")
-            time.sleep(scroll_pause_time)
-            current_position += scroll_height
-
-            try:
-                attachments_section = driver.find_element(
-                    By.XPATH, '//*[@id="button-opp-view-attachments-accordion-section"]'
-                )
-            except Exception:
-                pass
-
-            # If we've scrolled to the bottom and can't find attachments, break
-            if current_position > driver.execute_script("return document.body.scrollHeight"):
-                logging.warning("Attachments section not found.")
-                break
-
-        # If found, gather attachments
-        if attachments_section:
-            index = 0
-            attachments_found = 0
-            while True:
-                try:
-                    name_xpath = f'//*[@id="opp-view-attachments-fileLinkId{index}"]'
-                    date_xpath = f'//*[@id="opp-view-attachments-date{index}"]'
-                    attachment = WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.XPATH, name_xpath))
-                    )
-                    updated_date = WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.XPATH, date_xpath))
-                    )
-                    documents.append({
-                        "File Name": attachment.text.strip(),
-                        "File Link": attachment.get_attribute("href"),
-                        "Updated Date": updated_date.text.strip()
-                    })
-                    index += 1
-                    attachments_found += 1
-                except Exception:
-                    break
-            logging.info(f"Found {attachments_found} attachments for the contract.")
+        # Dates and attachments in one DOM snapshot, falling back to per-element lookups
+        with METRICS.timer("detail_extract"):
+            details = extract_detail_snapshot(driver)
+            if details is None:
+                METRICS.increment("detail_snapshot_fallbacks")
+                logging.warning(f"Detail snapshot unavailable for {contract_link}; using per-element lookups.")
+                details = extract_details_per_element(driver, contract_link)
+        (
+            documents,
+            general_published_date,
+            original_published_date,
+            updated_offers_due_date,
+            original_offers_due_date
+        ) = details
+        logging.info(f"Found {len(documents)} attachments for the contract.")
 
     except Exception as e:
+        METRICS.increment("detail_failures")
         logging.error(f"Error processing {contract_link}: {e}")
+        if not owns_driver:
+            raise
     finally:
-        driver.quit()
+        if owns_driver:
+            driver.quit()
 
     return (
         documents,
@@ -388,287 +1118,907 @@ def scrape_attachments(contract_link):
         original_offers_due_date
     )
 
-def send_email_with_attachment(output_path):
+class DetailScraper:
     """
-    Send an email with the output CSV file attached using AWS SES.
+    Scrapes contract detail pages on behalf of many worker threads, sharing a DriverPool of
+    `max_workers` drivers, one AdaptiveRateLimiter and the per-host circuit breakers between them.
+    When API_FAST_PATH is enabled, the JSON API is tried first and Selenium is only used if it fails.
     """
-    ses_client = boto3.client(
-        'ses',
-        region_name=AWS_REGION,
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-    )
 
-    # Create a multipart/mixed parent container.
-    msg = MIMEMultipart('mixed')
-    msg['Subject'] = f"Scraping Results - {timestamp}"
-    msg['From'] = EMAIL_SENDER
-    msg['To'] = ", ".join(EMAIL_RECIPIENTS)
+    def __init__(self, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND):
+        self.workers = max(1, max_workers)
+        self.driver_pool = DriverPool(size=self.workers)
+        self.rate_limiter = AdaptiveRateLimiter(requests_per_second, MIN_REQUESTS_PER_SECOND, TARGET_LATENCY)
+        self.retry_policy = RetryPolicy(DETAIL_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+        self.api_client = None
+        if API_FAST_PATH:
+            try:
+                self.api_client = sam_api.SamApiClient(SAM_API_BASE_URL, timeout=API_TIMEOUT, pool_size=self.workers)
+            except ImportError as e:
+                logging.warning(f"API fast path disabled: {e}")
 
-    # Create a multipart/alternative child container.
-    msg_body = MIMEMultipart('alternative')
+    def scrape(self, contract_number, contract_link):
+        """Return the scrape_attachments tuple for one contract (empty fields if it failed)."""
+        try:
+            return self.scrape_with_retries(contract_number, contract_link)
+        except RetriesExhausted:
+            return ([], "", "", "", "")
+
+    def scrape_with_retries(self, contract_number, contract_link):
+        """
+        Return the scrape_attachments tuple for one contract, retrying the detail page with
+        exponential backoff. Raises RetriesExhausted if every attempt failed.
+        """
+        logging.info(f"Processing contract number {contract_number}.")
+        if not contract_link:
+            return ([], "", "", "", "")
+        self.rate_limiter.wait()
+        if self.api_client:
+            with METRICS.timer("api_fetch"):
+                details = self.api_client.fetch_details(contract_link)
+            if details is not None:
+                METRICS.increment("api_hits")
+                return details
+            METRICS.increment("api_fallbacks")
+            self.rate_limiter.wait()
+
+        breaker = CIRCUIT_BREAKERS.for_url(contract_link)
+        attempts = self.retry_policy.attempts
+        for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                self.rate_limiter.wait()
+            breaker.wait()
+            start = time.monotonic()
+            try:
+                with self.driver_pool.driver() as driver:
+                    details = scrape_attachments(contract_link, driver)
+            except Exception:
+                self.rate_limiter.record(time.monotonic() - start, ok=False)
+                breaker.record(False)
+                if attempt < attempts:
+                    METRICS.increment("detail_retries")
+                    logging.warning(f"Attempt {attempt}/{attempts} for contract {contract_number} failed; retrying.")
+                    self.retry_policy.sleep(attempt)
+                continue
+            self.rate_limiter.record(time.monotonic() - start)
+            breaker.record(True)
+            return details
+        raise RetriesExhausted(f"Contract {contract_number} failed after {attempts} attempts: {contract_link}")
+
+    def close(self):
+        self.driver_pool.close()
+        if self.api_client:
+            self.api_client.close()
+
+def ordered_results(futures, window):
+    """
+    Yield the results of `futures` in order. `futures` is consumed lazily (submitting work as it
+    is consumed) and at most `window` futures are kept in flight, so a slow consumer pauses
+    submission instead of letting finished results pile up in memory.
+    """
+    in_flight = deque()
+    for future in futures:
+        in_flight.append(future)
+        while in_flight and (len(in_flight) >= window or in_flight[0].done()):
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+def scrape_all_attachments(contract_links, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND):
+    """
+    Scrape attachments and date fields for every contract link with up to `max_workers` concurrent drivers.
+    Page loads across all workers are throttled to `requests_per_second`.
+    `contract_links` may be any iterable, including one that is still being produced.
+    Yields scrape_attachments tuples in the same order as `contract_links`, each as soon as it is available.
+    """
+    scraper = DetailScraper(max_workers, requests_per_second)
+    logging.info(f"Scraping contract pages with {scraper.workers} worker(s).")
+    executor = ThreadPoolExecutor(max_workers=scraper.workers, thread_name_prefix="details")
+    try:
+        # Results come back in submission order, keeping contract numbering deterministic
+        yield from ordered_results(
+            (executor.submit(scraper.scrape, contract_number, contract_link)
+             for contract_number, contract_link in enumerate(contract_links, start=1)),
+            window=PIPELINE_QUEUE_SIZE
+        )
+    finally:
+        # If the consumer stops early, don't scrape the contracts it will never read
+        executor.shutdown(wait=True, cancel_futures=True)
+        scraper.close()
 
-    # Email body.
-    text_part = MIMEText(
-        f"Dear Recipient,\n\nPlease find attached the scraping results generated on {timestamp}.\n\nBest regards,\nYour Automated Scraper",
-        'plain'
-    )
+def details_have_data(details):
+    """True if a scrape_attachments tuple contains any scraped data."""
+    return bool(details[0]) or any(details[1:])
 
-    html_part = MIMEText(
-        f"""\
-        <html>
-            <body>
-                <p>Dear Recipient,<br><br>
-                Please find attached the scraping results generated on {timestamp}.<br><br>
-                Best regards,<br>
-                Your Automated Scraper
-                </p>
-            </body>
-        </html>
-        """,
-        'html'
-    )
+def scrape_contract_details(contracts, state_store=None, checkpoint=None, max_workers=MAX_WORKERS):
+    """
+    Yield (contract, scrape_attachments tuple) for every contract in `contracts`, in order.
+    `contracts` is an iterable of search result dicts that is consumed lazily, so details can be
+    scraped while the search is still producing contracts.
+    A contract whose detail page still fails after DETAIL_RETRIES attempts is re-queued behind the
+    contracts already submitted and retried once more; its place in the output waits for the retry,
+    so the order (and Contract Number) does not depend on which scrapes failed.
+    With a state store, notices unchanged since the last run are served from its cache,
+    only new or changed notices are scraped, and fresh results are written back.
+    With a checkpoint, contracts finished by an interrupted run are reused and each
+    newly scraped contract is recorded as soon as it finishes.
+    """
+    scraper = DetailScraper(max_workers)
+    executor = ThreadPoolExecutor(max_workers=scraper.workers, thread_name_prefix="details")
+    sources = Counter()  # Where the details came from: "checkpoint", "cache" or "scrape"
 
-    # Attach the text and HTML parts to msg_body
-    msg_body.attach(text_part)
-    msg_body.attach(html_part)
+    def scrape(contract_number, contract, slot, requeued=False):
+        """Scrape one contract and resolve its output `slot` with (contract, details, scraped)."""
+        try:
+            details = scraper.scrape_with_retries(contract_number, contract["Contract Link"])
+        except RetriesExhausted as e:
+            logging.warning(str(e))
+            if not requeued:
+                METRICS.increment("contracts_requeued")
+                logging.info(f"Re-queued contract {contract_number} behind the contracts already submitted.")
+                executor.submit(scrape, contract_number, contract, slot, True)
+                return
+            contract["Failed Row"] = True  # Counted as failed in the run summary
+            slot.set_result((contract, ([], "", "", "", ""), False))
+            return
+        except Exception as e:
+            slot.set_exception(e)
+            return
+        if requeued:
+            METRICS.increment("requeued_contracts_recovered")
+        # Only checkpoint pages that yielded data, so a failed scrape is retried on resume
+        if checkpoint and contract["Notice ID"] and details_have_data(details):
+            checkpoint.record_contract(contract["Notice ID"], details)
+        slot.set_result((contract, details, True))
+
+    def submit_all():
+        for contract_number, contract in enumerate(contracts, start=1):
+            notice_id = contract["Notice ID"]
+            if checkpoint and notice_id and notice_id in checkpoint.contracts:
+                source, details = "checkpoint", checkpoint.contracts[notice_id]
+            elif state_store and state_store.is_unchanged(notice_id, contract["Last Modified Date"]):
+                source, details = "cache", state_store.cached_details(notice_id)
+            else:
+                source, details = "scrape", None
+            sources[source] += 1
+            METRICS.increment(f"details_from_{source}")
+
+            # One future per output position, resolved once the contract (or its retry) is done
+            slot = Future()
+            if details is None:
+                executor.submit(scrape, contract_number, contract, slot)
+            else:
+                slot.set_result((contract, details, False))
+            yield slot
 
-    # Attach the multipart/alternative child container to the multipart/mixed parent container.
-    msg.attach(msg_body)
+    try:
+        for contract, details, scraped in ordered_results(submit_all(), window=PIPELINE_QUEUE_SIZE):
+            # Only cache pages that yielded data, so a failed scrape is retried next run
+            if scraped and state_store and details_have_data(details):
+                state_store.record(contract["Notice ID"], contract["Last Modified Date"], details)
+            yield contract, details
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        scraper.close()
+
+    logging.info(f"Details for {sources['scrape']} contracts scraped, {sources['cache']} merged from the "
+                 f"state cache and {sources['checkpoint']} reused from the checkpoint.")
+
+def retry_counts():
+    """Retry, re-queue and throttling counters of the run so far."""
+    return {
+        name: METRICS.counters.get(name, 0)
+        for name in (
+            "page_retries", "pages_requeued", "requeued_pages_recovered",
+            "detail_retries", "contracts_requeued", "requeued_contracts_recovered",
+            "rate_limit_decreases", "circuit_breaker_opens",
+        )
+    }
 
-    # Attachment
+def retry_summary():
+    """One-line summary of retries, re-queued work and throttling for the run summary."""
+    counts = retry_counts()
+    return (
+        f"{counts['page_retries']} page retries, {counts['detail_retries']} detail retries, "
+        f"{counts['requeued_pages_recovered']}/{counts['pages_requeued']} re-queued pages and "
+        f"{counts['requeued_contracts_recovered']}/{counts['contracts_requeued']} re-queued contracts recovered, "
+        f"{counts['rate_limit_decreases']} rate limit decreases, {counts['circuit_breaker_opens']} circuit breaker pauses"
+    )
+
+def download_run_attachments(csv_path):
+    """
+    Download every attachment listed in the combined CSV into the attachment store
+    at ATTACHMENTS_DIRECTORY (see downloads). Files already in the store are skipped.
+    """
+    attachments = []
+    notice_ids = {}  # Contract Number -> Notice ID, for attachment rows that leave the Notice ID blank
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            if row.get("Notice ID"):
+                notice_ids[row.get("Contract Number")] = row["Notice ID"]
+            file_link = row.get("File Link") or ""
+            if file_link.startswith(("http://", "https://")):
+                attachments.append((file_link, notice_ids.get(row.get("Contract Number"), ""), row.get("File Name")))
+
+    import downloads
     try:
-        with open(output_path, 'rb') as file:
-            part = MIMEApplication(file.read(), Name=os.path.basename(output_path))
-        part['Content-Disposition'] = f'attachment; filename="{os.path.basename(output_path)}"'
-        msg.attach(part)
-    except Exception as e:
-        logging.error(f"Failed to attach file: {e}")
+        store = downloads.AttachmentStore(
+            ATTACHMENTS_DIRECTORY, timeout=DOWNLOAD_TIMEOUT, retries=DOWNLOAD_RETRIES, pool_size=DOWNLOAD_WORKERS
+        )
+    except ImportError as e:
+        logging.warning(f"Attachment downloads disabled: {e}")
         return
 
-    # Send the email
     try:
-        response = ses_client.send_raw_email(
-            Source=EMAIL_SENDER,
-            Destinations=EMAIL_RECIPIENTS,
-            RawMessage={'Data': msg.as_string()}
+        results = downloads.download_attachments(store, attachments, max_workers=DOWNLOAD_WORKERS)
+    finally:
+        store.close()
+    failed = sum(result["status"] == "failed" for result in results)
+    stored = len({result["sha256"] for result in results if result["sha256"]})
+    logging.info(f"Attachment downloads finished: {len(results)} attachments, {stored} unique files in "
+                 f"{ATTACHMENTS_DIRECTORY}, {failed} failed.")
+
+def write_alert_report(output_path, run_timestamp):
+    """Match the alert rules in ALERT_RULES_PATH against the run and write its alert report (see alerts)."""
+    import alerts
+    try:
+        with METRICS.timer("alerts"):
+            alerts.run_alerts(output_path, ALERT_RULES_PATH, ALERT_INDEX_PATH,
+                              alerts.alert_report_path(FINAL_OUTPUT_DIRECTORY, run_timestamp), run_timestamp)
+    except Exception as e:
+        logging.error(f"Failed to evaluate the alert rules: {e}")
+
+def write_change_report(output_path, run_timestamp):
+    """Compare the run's CSV with the previous run's and write its change report. Returns the change counts."""
+    try:
+        import run_diff
+        with METRICS.timer("run_diff"):
+            _, counts = run_diff.write_change_report(output_path, run_timestamp)
+        return counts
+    except Exception as e:
+        logging.error(f"Failed to compare the run with the previous one: {e}")
+        return None
+
+# Column order of the combined CSV
+OUTPUT_COLUMNS = [
+    "Contract Name", "Notice ID", "Department", "Contract Link",
+    "Failed Row", "Incomplete Data", "Total Attachments", "Date Scraped", "Contract Number",
+    "General Published Date", "Original Published Date", "Updated Date Offers Due", "Original Date Offers Due",
+    "File Name", "File Link", "Updated Date",
+    "Last Modified Date",  # Appended so the columns before it keep their original positions
+]
+
+def contract_output_rows(contract_data, details):
+    """
+    Build the combined CSV rows for one contract from its search row and scrape_attachments tuple:
+    one row per attachment (only the first carries the full contract info), or a single row if there are none.
+    """
+    (
+        attachments,
+        general_published_date,
+        original_published_date,
+        updated_offers_due_date,
+        original_offers_due_date
+    ) = details
+
+    # Add the scraped dates to the contract data
+    contract_data["General Published Date"] = general_published_date
+    contract_data["Original Published Date"] = original_published_date
+    contract_data["Updated Date Offers Due"] = updated_offers_due_date
+    contract_data["Original Date Offers Due"] = original_offers_due_date
+
+    # If no attachments found
+    if not attachments:
+        # Check if the Notice ID is missing => incomplete
+        if not contract_data["Notice ID"]:
+            contract_data["Incomplete Data"] = True
+        return [contract_data]
+
+    # We have attachments
+    contract_data["Total Attachments"] = len(attachments)
+    rows = [{**contract_data, **attachments[0]}]  # First attachment row includes full contract info
+    for attachment in attachments[1:]:
+        # Additional attachment rows replicate minimal data + the attachment
+        rows.append({
+            "Contract Number": contract_data["Contract Number"],
+            "Contract Name": "",
+            "Notice ID": "",
+            "Department": "",
+            "Contract Link": "",
+            "Total Attachments": len(attachments),
+            "Failed Row": False,
+            "Incomplete Data": False,
+            "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "General Published Date": general_published_date,
+            "Original Published Date": original_published_date,
+            "Updated Date Offers Due": updated_offers_due_date,
+            "Original Date Offers Due": original_offers_due_date,
+            **attachment
+        })
+    return rows
+
+class RunTotals:
+    """Running counts for the summary row, updated as each contract's rows are written."""
+
+    def __init__(self):
+        self.total_contracts = 0
+        self.total_attachments = 0
+        self.failed_contracts = 0
+        self.contracts_with_missing_data = 0
+
+    def add(self, contract_data, details):
+        """Count one written contract."""
+        contract_number = contract_data["Contract Number"]
+        self.total_contracts += 1
+        attachments = details[0]
+        if attachments:
+            self.total_attachments += len(attachments)
+            logging.info(f"Contract {contract_number} processed with {len(attachments)} attachments.")
+        elif contract_data["Incomplete Data"]:
+            self.contracts_with_missing_data += 1
+            logging.warning(f"Contract {contract_number} has incomplete data.")
+
+        # Check if this row was flagged as failed
+        if contract_data["Failed Row"]:
+            self.failed_contracts += 1
+            logging.warning(f"Contract {contract_number} failed to scrape properly.")
+
+    def summary_row(self):
+        return {
+            "Contract Number": "Summary",
+            "Contract Name": f"Total Contracts: {self.total_contracts}",
+            "Notice ID": f"Failed Contracts: {self.failed_contracts}",
+            "Department": f"Contracts with Missing Data: {self.contracts_with_missing_data}",
+            "Total Attachments": f"Total Attachments: {self.total_attachments}",
+            "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "General Published Date": "",
+            "Original Published Date": "",
+            "Updated Date Offers Due": "",
+            "Original Date Offers Due": ""
+        }
+
+    def as_dict(self):
+        return {
+            "total_contracts": self.total_contracts,
+            "failed_contracts": self.failed_contracts,
+            "contracts_with_missing_data": self.contracts_with_missing_data,
+            "total_attachments": self.total_attachments,
+        }
+
+    def log_summary(self):
+        logging.info(
+            f"Run summary: {self.total_contracts} contracts, {self.failed_contracts} failed, "
+            f"{self.contracts_with_missing_data} with missing data, {self.total_attachments} attachments; "
+            f"{wait_summary()}; {retry_summary()}."
         )
-        logging.info("Email sent successfully.")
-    except ClientError as e:
-        logging.error(f"Failed to send email: {e.response['Error']['Message']}")
 
-def test_rds_connection():
+def combined_output_path(run_timestamp):
+    """Path of the combined CSV for a run, numbered by the final_combined_data_ counter in FINAL_OUTPUT_DIRECTORY."""
+    csv_file_number = next_file_number(FINAL_OUTPUT_DIRECTORY, "final_combined_data_")
+    return os.path.join(FINAL_OUTPUT_DIRECTORY, f"final_combined_data_{csv_file_number}_{run_timestamp}.csv")
+
+def open_parquet_writer(run_timestamp):
+    """RunParquetWriter for the run when PARQUET_OUTPUT is enabled and pyarrow is available, else None."""
+    if not PARQUET_OUTPUT:
+        return None
+    import parquet_store
+    try:
+        return parquet_store.RunParquetWriter(PARQUET_DIRECTORY, run_timestamp)
+    except ImportError as e:
+        logging.warning(f"Parquet output disabled: {e}")
+        return None
+
+def deliver_run_output(output_path, run_timestamp, totals, parquet_writer=None, load_db=True):
     """
-    Test the connection to the AWS RDS PostgreSQL database.
-    Returns True if the connection is successful, False otherwise.
+    Finish a run whose combined CSV has been written: write the Parquet dataset, download
+    attachments, write the change and alert reports, load the CSV into RDS (unless `load_db`
+    is False because it was streamed already), email it and write the run metrics next to it.
     """
-    RDS_HOST = os.getenv("RDS_HOST")
-    RDS_DBNAME = os.getenv("RDS_DBNAME")
-    RDS_USERNAME = os.getenv("RDS_USERNAME")
-    RDS_PASSWORD = os.getenv("RDS_PASSWORD")
-    RDS_PORT = os.getenv("RDS_PORT")
+    from emailer import send_email_with_attachment
+    from rds_store import save_to_rds
 
-    if not all([RDS_HOST, RDS_DBNAME, RDS_USERNAME, RDS_PASSWORD, RDS_PORT]):
-        logging.error("Missing RDS credentials in .env file.")
-        return False
+    if parquet_writer:
+        try:
+            with METRICS.timer("parquet_write"):
+                parquet_writer.close()
+        except Exception as e:
+            logging.error(f"Failed to write the Parquet dataset: {e}")
+
+    if DOWNLOAD_ATTACHMENTS:
+        download_run_attachments(output_path)
+
+    changes = write_change_report(output_path, run_timestamp) if RUN_DIFF else None
 
+    if ALERT_RULES_PATH:
+        write_alert_report(output_path, run_timestamp)
+
+    if load_db:
+        save_to_rds(output_path, run_timestamp)
+
+    # Send email with attachment
+    send_email_with_attachment(output_path, run_timestamp)
+
+    # Per-stage timings and counters for the whole run, next to the CSV
+    METRICS.write_json(os.path.splitext(output_path)[0] + "_metrics.json", extra={
+        "output_file": output_path,
+        "summary": {**totals.as_dict(), "retries": retry_counts()},
+        "changes": changes,
+    })
+
+# Marks the end of a pipeline queue
+END_OF_STREAM = object()
+
+def put_unless_stopped(stage_queue, item, stop):
+    """Put `item` on a bounded pipeline queue, blocking while it is full unless the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def iter_queue(stage_queue, stop):
+    """Yield items from a pipeline queue until END_OF_STREAM, or until the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            item = stage_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        if item is END_OF_STREAM:
+            return
+        yield item
+
+def iter_search_contracts(state_store=None, checkpoint=None):
+    """
+    Yield every contract of the search phase in order: from the checkpoint if a previous run
+    completed it, from the merged shards with NAICS_PER_SHARD, or page by page from a single search.
+    """
+    if checkpoint and checkpoint.search_complete:
+        logging.info("Search phase already completed in the checkpoint; skipping it.")
+        if NAICS_PER_SHARD > 0:
+            yield from deduplicate_contracts(checkpoint.search_contracts(all_shards=True))
+        else:
+            yield from checkpoint.search_contracts()
+    elif NAICS_PER_SHARD > 0:
+        contracts_df = scrape_contracts_sharded(state_store, checkpoint)
+        if contracts_df is None:
+            raise RuntimeError("Sharded search failed.")
+        yield from contracts_df.to_dict("records")
+    else:
+        driver = initialize_driver()
+        try:
+            for page_contracts in iter_contract_pages(driver, state_store, checkpoint):
+                yield from page_contracts
+        finally:
+            driver.quit()
+
+def search_stage(contracts_queue, stop, state_store, checkpoint, errors):
+    """Pipeline stage: put every search result on `contracts_queue` as soon as its page is scraped."""
+    found = 0
     try:
-        # Attempt to connect to the database
-        conn = psycopg2.connect(
-            host=RDS_HOST,
-            database=RDS_DBNAME,
-            user=RDS_USERNAME,
-            password=RDS_PASSWORD,
-            port=RDS_PORT,
-        )
-        conn.close()
-        logging.info("Successfully connected to the RDS PostgreSQL database.")
-        return True
+        with METRICS.timer("search"):
+            for contract in iter_search_contracts(state_store, checkpoint):
+                if not put_unless_stopped(contracts_queue, contract, stop):
+                    return
+                found += 1
+        logging.info(f"Scraped a total of {found} contracts.")
     except Exception as e:
-        logging.error(f"Failed to connect to RDS: {e}")
-        return False
+        METRICS.increment("search_failures")
+        logging.error(f"Error during contract scraping after {found} contracts: {e}")
+        errors.append(e)
+    finally:
+        put_unless_stopped(contracts_queue, END_OF_STREAM, stop)
 
-def save_to_rds(dataframe, timestamp):
+def db_load_stage(rows_queue, stop, output_path, result):
     """
-    Save the provided dataframe to an AWS RDS PostgreSQL database.
-    A new table is created with a unique name for each run based on the timestamp.
+    Pipeline stage: stream combined CSV rows into RDS while the run is in progress (see rds_store.RunLoader).
+    Rows are staged as they arrive, merged once the summary row has arrived and dropped if the pipeline stops.
+    `result` receives "connected" and, once committed, "run_id".
     """
-    # Test the database connection first
-    if not test_rds_connection():
-        logging.error("Aborting save operation due to failed database connection.")
-        return
+    import rds_store
+    conn = rds_store.connect_to_rds()
+    result["connected"] = conn is not None
+    loader = None
+    if conn is not None:
+        try:
+            loader = rds_store.RunLoader(conn, timestamp, output_path)
+        except Exception as e:
+            logging.error(f"Could not start the streaming RDS load: {e}")
 
-    # Database credentials from environment variables
-    RDS_HOST = os.getenv("RDS_HOST")
-    RDS_DBNAME = os.getenv("RDS_DBNAME")
-    RDS_USERNAME = os.getenv("RDS_USERNAME")
-    RDS_PASSWORD = os.getenv("RDS_PASSWORD")
-    RDS_PORT = os.getenv("RDS_PORT")
+    with METRICS.timer("db_load"):
+        for rows in iter_queue(rows_queue, stop):
+            if loader is None:
+                continue  # Keep draining so the CSV writer is never blocked
+            try:
+                loader.add_rows(rows)
+            except Exception as e:
+                logging.error(f"Streaming RDS load failed; the CSV will be loaded after the run instead: {e}")
+                loader.abort()
+                loader = None
+
+        if loader is not None:
+            if stop.is_set():
+                loader.abort()
+                logging.info("Streaming RDS load discarded.")
+            else:
+                try:
+                    result["run_id"] = loader.finish()
+                    logging.info(f"Data successfully upserted into RDS as run {result['run_id']}.")
+                except Exception as e:
+                    logging.error(f"Failed to commit the streaming RDS load: {e}")
+    if conn is not None:
+        conn.close()
 
-    try:
-        conn = psycopg2.connect(
-            host=RDS_HOST,
-            database=RDS_DBNAME,
-            user=RDS_USERNAME,
-            password=RDS_PASSWORD,
-            port=RDS_PORT,
-        )
-        cursor = conn.cursor()
-        logging.info("Successfully connected to the RDS PostgreSQL database.")
-
-        # Generate a unique table name
-        table_name = f"scraped_data_{timestamp.replace('-', '_').replace(':', '_').replace(' ', '_')}"
-
-        # Create the table dynamically based on the dataframe columns
-        columns = dataframe.columns
-        create_table_query = sql.SQL(
-            "CREATE TABLE {table} ({fields});"
-        ).format(
-            table=sql.Identifier(table_name),
-            fields=sql.SQL(", ").join(
-                sql.Identifier(col) + sql.SQL(" TEXT") for col in columns
-            ),
-        )
-        cursor.execute(create_table_query)
-        conn.commit()
-        logging.info(f"Table {table_name} created successfully.")
-
-        # Insert the data into the table
-        insert_query = sql.SQL(
-            "INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-        ).format(
-            table=sql.Identifier(table_name),
-            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
-            placeholders=sql.SQL(", ").join(sql.Placeholder() * len(columns)),
-        )
+# Columns of the search results CSV written by `cli.py search`
+SEARCH_COLUMNS = OUTPUT_COLUMNS[:8] + ["Last Modified Date"]
+SEARCH_FLAG_COLUMNS = ["Failed Row", "Incomplete Data"]
 
-        for row in dataframe.itertuples(index=False, name=None):
-            cursor.execute(insert_query, row)
+def search_results_path(run_timestamp):
+    """Path of a search results CSV, numbered by the search_results_ counter in FINAL_OUTPUT_DIRECTORY."""
+    file_number = next_file_number(FINAL_OUTPUT_DIRECTORY, "search_results_")
+    return os.path.join(FINAL_OUTPUT_DIRECTORY, f"search_results_{file_number}_{run_timestamp}.csv")
 
-        conn.commit()
-        logging.info(f"Data successfully inserted into {table_name}.")
-    except Exception as e:
-        logging.error(f"Failed to save data to RDS: {e}")
+def write_search_results(output_path):
+    """
+    Run the search only and stream every result to `output_path`, for a later
+    `cli.py details` run. Returns the number of contracts written.
+    """
+    state_store = StateStore(STATE_DB_PATH) if INCREMENTAL_RUNS else None
+    found = 0
+    try:
+        with open(output_path, "w", newline="", encoding="utf-8") as csv_file, METRICS.timer("search"):
+            writer = csv.DictWriter(csv_file, fieldnames=SEARCH_COLUMNS, restval="", extrasaction="ignore")
+            writer.writeheader()
+            for contract in iter_search_contracts(state_store):
+                writer.writerow(contract)
+                found += 1
+    finally:
+        if state_store:
+            state_store.close()
+    logging.info(f"Saved {found} search results to {output_path}")
+    return found
+
+def read_search_results(csv_path):
+    """Yield the contracts of a search results CSV with their flags and counts typed again."""
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            for column in SEARCH_FLAG_COLUMNS:
+                row[column] = row.get(column) == "True"
+            row["Total Attachments"] = int(row.get("Total Attachments") or 0)
+            yield row
+
+def scrape_details_to_csv(contracts, output_path):
+    """
+    Scrape the detail pages of `contracts` (e.g. from read_search_results) and write the
+    combined CSV with its summary row and the run metrics, without loading or emailing it.
+    Returns the RunTotals.
+    """
+    state_store = StateStore(STATE_DB_PATH) if INCREMENTAL_RUNS else None
+    totals = RunTotals()
+    try:
+        with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=OUTPUT_COLUMNS, restval="", extrasaction="ignore")
+            writer.writeheader()
+            for contract_number, (contract_data, details) in enumerate(
+                    scrape_contract_details(contracts, state_store), start=1):
+                contract_data["Contract Number"] = contract_number
+                writer.writerows(contract_output_rows(contract_data, details))
+                csv_file.flush()
+                totals.add(contract_data, details)
+            writer.writerow(totals.summary_row())
     finally:
-        if conn:
-            cursor.close()
-            conn.close()
-            logging.info("Database connection closed.")
+        if state_store:
+            state_store.close()
+    totals.log_summary()
+    logging.info(f"Final combined data saved to {output_path}")
+    METRICS.write_json(os.path.splitext(output_path)[0] + "_metrics.json", extra={
+        "output_file": output_path,
+        "summary": {**totals.as_dict(), "retries": retry_counts()},
+    })
+    return totals
 
-def process_combined_output():
+def process_combined_output(resume=False):
     """
-    Combine contracts and their attachments into a single cleaned CSV.
+    Combine contracts and their attachments into a single cleaned CSV and load it into RDS.
+    The stages run as a pipeline connected by bounded queues: the search feeds contracts to the
+    detail scrapers as each results page completes, and every finished contract is written to
+    the CSV and streamed to the database loader at the same time.
+    Progress is checkpointed as it goes; with `resume`, an interrupted run continues
+    from its last completed search page and contract.
     """
     logging.info("Starting the data processing workflow.")
-    driver = initialize_driver()
-    contracts_df = scrape_contracts(driver)
-    driver.quit()
+    if METRICS_PORT:
+        METRICS.serve_prometheus(METRICS_PORT)
+    state_store = StateStore(STATE_DB_PATH) if INCREMENTAL_RUNS else None
+    checkpoint = Checkpoint(CHECKPOINT_PATH, resume=resume)
+
+    totals = RunTotals()
+    output_path = combined_output_path(timestamp)
+    parquet_writer = open_parquet_writer(timestamp)
+
+    contracts_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    rows_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    search_errors = []
+    db_result = {}
+    search_thread = threading.Thread(
+        target=search_stage, args=(contracts_queue, stop, state_store, checkpoint, search_errors),
+        name="search", daemon=True
+    )
+    db_thread = threading.Thread(
+        target=db_load_stage, args=(rows_queue, stop, output_path, db_result), name="db-load", daemon=True
+    )
+    search_thread.start()
+    db_thread.start()
 
-    # If scraping failed or returned None, stop
-    if contracts_df is None:
-        logging.error("No contract data found (None returned). Exiting.")
+    try:
+        # Rows are streamed to the CSV as each contract finishes, so memory stays flat
+        # and everything written so far survives a crash
+        with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=OUTPUT_COLUMNS, restval="", extrasaction="ignore")
+            writer.writeheader()
+
+            # Scrape attachments & date fields for new or changed contracts as the search finds them
+            all_details = scrape_contract_details(iter_queue(contracts_queue, stop), state_store, checkpoint)
+            for contract_number, (contract_data, details) in enumerate(all_details, start=1):
+                contract_data["Contract Number"] = contract_number
+                rows = contract_output_rows(contract_data, details)
+                writer.writerows(rows)
+                csv_file.flush()
+                if parquet_writer:
+                    parquet_writer.add_rows(rows)
+                put_unless_stopped(rows_queue, rows, stop)
+                totals.add(contract_data, details)
+
+            search_failed = bool(search_errors)
+            if search_failed and totals.total_contracts == 0:
+                stop.set()  # Nothing to report; roll back the database load
+            else:
+                # Summary row, from the running counters
+                summary_row = totals.summary_row()
+                writer.writerow(summary_row)
+                put_unless_stopped(rows_queue, [summary_row], stop)
+                put_unless_stopped(rows_queue, END_OF_STREAM, stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        search_thread.join()
+        db_thread.join()
+        if state_store:
+            state_store.close()
+
+    # If scraping failed before finding anything, stop
+    if search_failed and totals.total_contracts == 0:
+        logging.error("No contract data found. Exiting.")
+        os.remove(output_path)
+        if checkpoint.completed_pages:
+            logging.info(f"Progress for {len(checkpoint.completed_pages)} search pages was checkpointed; "
+                         f"rerun with --resume to continue.")
+        checkpoint.close()
+        METRICS.write_json(os.path.join(FINAL_OUTPUT_DIRECTORY, f"metrics_{timestamp}.json"),
+                           extra={"output_file": None})
         return
 
-    combined_data = []
-    total_attachments = 0
-    failed_contracts = 0
-    contracts_with_missing_data = 0
-    contract_number = 1  # Start contract numbering
+    logging.info("Data processing completed.")
+    totals.log_summary()
+    logging.info(f"Final combined data saved to {output_path}")
+    if search_failed:
+        logging.error("The search did not finish, so this output is partial; rerun with --resume to complete it.")
+        checkpoint.close()
+    else:
+        checkpoint.clear()
 
-    for idx, row in contracts_df.iterrows():
-        logging.info(f"Processing contract number {contract_number}.")
-        contract_data = row.to_dict()
-        contract_data["Contract Number"] = contract_number
-        contract_link = contract_data["Contract Link"]
+    # If the streaming load failed after connecting, retry from the finished CSV
+    streaming_failed = db_result.get("connected") and "run_id" not in db_result
+    deliver_run_output(output_path, timestamp, totals, parquet_writer, load_db=streaming_failed)
 
-        # Scrape attachments & date fields
-        (
-            attachments,
-            general_published_date,
-            original_published_date,
-            updated_offers_due_date,
-            original_offers_due_date
-        ) = scrape_attachments(contract_link)
-
-        # Add the scraped dates to the contract data
-        contract_data["General Published Date"] = general_published_date
-        contract_data["Original Published Date"] = original_published_date
-        contract_data["Updated Date Offers Due"] = updated_offers_due_date
-        contract_data["Original Date Offers Due"] = original_offers_due_date
-
-        # If no attachments found
-        if not attachments:
-            # Check if the Notice ID is missing => incomplete
-            if not contract_data["Notice ID"]:
-                contract_data["Incomplete Data"] = True
-                contracts_with_missing_data += 1
-                logging.warning(f"Contract {contract_number} has incomplete data.")
-            combined_data.append(contract_data)
-        else:
-            # We have attachments
-            contract_data["Total Attachments"] = len(attachments)
-            for i, attachment in enumerate(attachments):
-                if i == 0:
-                    # First attachment row includes full contract info
-                    combined_data.append({**contract_data, **attachment})
-                else:
-                    # Additional attachment rows replicate minimal data + the attachment
-                    combined_data.append({
-                        "Contract Number": contract_number,
-                        "Contract Name": "",
-                        "Notice ID": "",
-                        "Department": "",
-                        "Contract Link": "",
-                        "Total Attachments": len(attachments),
-                        "Failed Row": False,
-                        "Incomplete Data": False,
-                        "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "General Published Date": general_published_date,
-                        "Original Published Date": original_published_date,
-                        "Updated Date Offers Due": updated_offers_due_date,
-                        "Original Date Offers Due": original_offers_due_date,
-                        **attachment
-                    })
-            total_attachments += len(attachments)
-            logging.info(f"Contract {contract_number} processed with {len(attachments)} attachments.")
+def enqueue_search_results(work_queue, run_timestamp, state_store=None, batch_size=100):
+    """
+    Run the search and add every result to the work queue as it is found, in batches, so
+    workers can start on the first pages while the search continues. With a state store,
+    notices unchanged since the last run are enqueued as done with their cached details.
+    Notices the run already has are skipped, so a resumed run only appends the new ones.
+    Returns the number of contracts enqueued.
+    """
+    batch = []
+    found = enqueued = 0
+    with METRICS.timer("search"):
+        for found, contract in enumerate(iter_search_contracts(state_store), start=1):
+            details = None
+            if state_store and state_store.is_unchanged(contract["Notice ID"], contract["Last Modified Date"]):
+                details = state_store.cached_details(contract["Notice ID"])
+                METRICS.increment("details_from_cache")
+            batch.append((contract, details))
+            if len(batch) >= batch_size:
+                enqueued += work_queue.enqueue(run_timestamp, batch)
+                batch = []
+        enqueued += work_queue.enqueue(run_timestamp, batch)
+    logging.info(f"Enqueued {enqueued} of the {found} contracts found for run {run_timestamp}.")
+    return enqueued
+
+def wait_for_queue(work_queue, run_timestamp):
+    """Block until no job of the run is pending or running. Returns the final status counts."""
+    last_counts = None
+    with METRICS.timer("queue_drain"):
+        while True:
+            work_queue.reclaim_expired(run_timestamp)
+            counts = work_queue.status_counts(run_timestamp)
+            if counts != last_counts:
+                logging.info(f"Work queue: {counts['done']} done, {counts['failed']} failed, "
+                             f"{counts['running']} running, {counts['pending']} pending.")
+                last_counts = counts
+            if not counts["pending"] and not counts["running"]:
+                return counts
+            time.sleep(QUEUE_POLL_INTERVAL)
+
+def process_queued_output(resume=False):
+    """
+    Coordinator of a multi-host run: enqueue the search results in the Postgres work queue, wait
+    for the workers (python main.py --worker, on any host) to scrape them all, then build the
+    combined CSV in result order, load it into RDS and email it like process_combined_output.
+    With `resume`, the latest run that did not complete is picked up where it stopped.
+    """
+    logging.info("Starting the data processing workflow with the Postgres work queue.")
+    if METRICS_PORT:
+        METRICS.serve_prometheus(METRICS_PORT)
+    from rds_store import connect_to_rds
+    from work_queue import WorkQueue
+    conn = connect_to_rds()
+    if conn is None:
+        logging.error("The work queue needs the RDS database. Exiting.")
+        return
+    work_queue = WorkQueue(conn, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS)
+    state_store = StateStore(STATE_DB_PATH) if INCREMENTAL_RUNS else None
+
+    run_timestamp, search_complete = timestamp, False
+    open_run = work_queue.latest_open_run() if resume else None
+    if open_run:
+        run_timestamp, search_complete = open_run
+        logging.info(f"Resuming queued run {run_timestamp}.")
+    work_queue.create_run(run_timestamp)
+
+    search_failed = False
+    if not search_complete:
+        try:
+            enqueue_search_results(work_queue, run_timestamp, state_store)
+            work_queue.mark_search_complete(run_timestamp)
+        except Exception as e:
+            search_failed = True
+            METRICS.increment("search_failures")
+            logging.error(f"Error during contract scraping: {e}")
 
-        # Check if this row was flagged as failed
-        if contract_data["Failed Row"]:
-            failed_contracts += 1
-            logging.warning(f"Contract {contract_number} failed to scrape properly.")
+    counts = wait_for_queue(work_queue, run_timestamp)
+    if not any(counts.values()):
+        logging.error("No contract data found. Exiting.")
+        conn.close()
+        if state_store:
+            state_store.close()
+        METRICS.write_json(os.path.join(FINAL_OUTPUT_DIRECTORY, f"metrics_{run_timestamp}.json"),
+                           extra={"output_file": None})
+        return
 
-        contract_number += 1
-
-    # Summary row
-    summary = {
-        "Contract Number": "Summary",
-        "Contract Name": f"Total Contracts: {len(contracts_df)}",
-        "Notice ID": f"Failed Contracts: {failed_contracts}",
-        "Department": f"Contracts with Missing Data: {contracts_with_missing_data}",
-        "Total Attachments": f"Total Attachments: {total_attachments}",
-        "Date Scraped": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "General Published Date": "",
-        "Original Published Date": "",
-        "Updated Date Offers Due": "",
-        "Original Date Offers Due": ""
-    }
-    combined_data.append(summary)
-    logging.info("Data processing completed.")
+    totals = RunTotals()
+    output_path = combined_output_path(run_timestamp)
+    parquet_writer = open_parquet_writer(run_timestamp)
+    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=OUTPUT_COLUMNS, restval="", extrasaction="ignore")
+        writer.writeheader()
+        for position, contract_data, details, scraped in work_queue.iter_results(run_timestamp):
+            if details is None:
+                contract_data["Failed Row"] = True  # Used up its attempts on the workers
+                details = ([], "", "", "", "")
+            elif scraped and state_store and details_have_data(details):
+                state_store.record(contract_data["Notice ID"], contract_data["Last Modified Date"], details)
+            contract_data["Contract Number"] = position
+            rows = contract_output_rows(contract_data, details)
+            writer.writerows(rows)
+            if parquet_writer:
+                parquet_writer.add_rows(rows)
+            totals.add(contract_data, details)
+        writer.writerow(totals.summary_row())
+    if state_store:
+        state_store.close()
 
-    # Save the final combined data with timestamp and unique numbering
-    csv_file_number = len(os.listdir(FINAL_OUTPUT_DIRECTORY)) + 1
-    output_path = os.path.join(
-        FINAL_OUTPUT_DIRECTORY,
-        f"final_combined_data_{csv_file_number}_{timestamp}.csv"
-    )
-    pd.DataFrame(combined_data).to_csv(output_path, index=False)
+    logging.info("Data processing completed.")
+    totals.log_summary()
     logging.info(f"Final combined data saved to {output_path}")
+    if search_failed:
+        logging.error("The search did not finish, so this output is partial.")
+    deliver_run_output(output_path, run_timestamp, totals, parquet_writer)
+    work_queue.complete_run(run_timestamp)
+    conn.close()
 
-    # Save to AWS RDS PostgreSQL
-    save_to_rds(pd.DataFrame(combined_data), timestamp)
-
-    # Send email with attachment
-    send_email_with_attachment(output_path)
+def run_queue_worker(max_workers=MAX_WORKERS):
+    """
+    Worker of a multi-host run: claim contract detail jobs from the Postgres work queue and
+    scrape them with `max_workers` concurrent drivers until the queue has been empty for
+    QUEUE_WORKER_IDLE_EXIT seconds. Jobs are only claimed from the latest open run. A heartbeat
+    thread keeps extending the leases of the jobs in progress and returns jobs abandoned by
+    crashed workers to the queue.
+    """
+    from rds_store import connect_to_rds
+    from work_queue import WorkQueue
+    conn = connect_to_rds()
+    if conn is None:
+        logging.error("The work queue needs the RDS database. Exiting.")
+        return
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    work_queue = WorkQueue(conn, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS)
+    scraper = DetailScraper(max_workers)
+    in_progress = set()
+    in_progress_lock = threading.Lock()
+    stop = threading.Event()
+    logging.info(f"Worker {worker_id} started with {scraper.workers} scraper(s).")
+
+    def send_heartbeats():
+        while not stop.wait(max(1.0, QUEUE_LEASE_SECONDS / 3)):
+            with in_progress_lock:
+                job_ids = list(in_progress)
+            try:
+                work_queue.heartbeat(worker_id, job_ids)
+                open_run = work_queue.latest_open_run()
+                if open_run:
+                    work_queue.reclaim_expired(open_run[0])
+            except Exception as e:
+                logging.warning(f"Heartbeat failed: {e}")
+
+    def run_job(job_id, position, contract):
+        try:
+            details = scraper.scrape_with_retries(position, contract["Contract Link"])
+        except RetriesExhausted as e:
+            status = work_queue.fail(job_id, worker_id, e, retry_delay=RETRY_MAX_DELAY)
+            METRICS.increment("queue_jobs_failed" if status == "failed" else "queue_jobs_requeued")
+            logging.warning(f"{e} (job {job_id} is now {status}).")
+            return
+        if work_queue.complete(job_id, worker_id, details):
+            METRICS.increment("queue_jobs_done")
+        else:
+            logging.warning(f"Lost the lease on job {job_id}; its result was discarded.")
+
+    def work_loop():
+        idle_since = time.monotonic()
+        current_run = None
+        while not stop.is_set():
+            jobs = work_queue.claim(worker_id, current_run) if current_run else []
+            if not jobs:
+                # Follow the coordinator onto a newer run
+                open_run = work_queue.latest_open_run()
+                if open_run and open_run[0] != current_run:
+                    current_run = open_run[0]
+                    continue
+                if QUEUE_WORKER_IDLE_EXIT and time.monotonic() - idle_since >= QUEUE_WORKER_IDLE_EXIT:
+                    return
+                stop.wait(QUEUE_POLL_INTERVAL)
+                continue
+            job_id, run_timestamp, position, contract = jobs[0]
+            with in_progress_lock:
+                in_progress.add(job_id)
+            try:
+                run_job(job_id, position, contract)
+            finally:
+                with in_progress_lock:
+                    in_progress.discard(job_id)
+            idle_since = time.monotonic()
+
+    heartbeat_thread = threading.Thread(target=send_heartbeats, name="heartbeat", daemon=True)
+    heartbeat_thread.start()
+    executor = ThreadPoolExecutor(max_workers=scraper.workers, thread_name_prefix="queue-worker")
+    try:
+        for future in [executor.submit(work_loop) for _ in range(scraper.workers)]:
+            future.result()
+    finally:
+        # Jobs still running are returned to the queue by the lease expiry
+        stop.set()
+        executor.shutdown(wait=True)
+        heartbeat_thread.join()
+        scraper.close()
+        conn.close()
+    logging.info(f"Worker {worker_id} finished: {METRICS.counters.get('queue_jobs_done', 0)} jobs done.")
 
 if __name__ == "__main__":
-    process_combined_output()
+    # `python main.py [--resume] [--coordinator | --worker]` is the `run` command of the CLI
+    import sys
+    import cli
+    sys.exit(cli.main(["run"] + sys.argv[1:]))
@@ -0,0 +1,162 @@
+"""
+Lightweight run instrumentation: per-stage durations and event counters.
+
+Stages (driver start, page loads, waits, extraction, DB load, email...) are timed with
+`METRICS.timer(stage)`, and events such as retries and timeouts are counted with
+`METRICS.increment(name)`. At the end of a run the collected metrics are written to a
+JSON file next to the CSV, and can also be served in the Prometheus text format.
+"""
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMETHEUS_PREFIX = "samgov_scraper"
+QUANTILES = [0.5, 0.95]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+class Metrics:
+    """Thread-safe registry of stage durations, stage errors and event counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}  # stage -> list of seconds
+        self.errors = {}  # stage -> number of timed calls that raised
+        self.counters = {}  # event -> count
+        self.started_at = time.time()
+
+    def observe(self, stage, seconds, failed=False):
+        with self._lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            if failed:
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the enclosed block as one `stage` observation, counting it as an error if it raises."""
+        start = time.monotonic()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.observe(stage, time.monotonic() - start, failed)
+
+    def timed(self, stage):
+        """Decorator timing every call of a function as one `stage` observation."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stage_summary(self, stage):
+        """count, total, mean, p50, p95 and max seconds of one stage."""
+        with self._lock:
+            values = sorted(self.durations.get(stage, []))
+            errors = self.errors.get(stage, 0)
+        total = sum(values)
+        return {
+            "count": len(values),
+            "errors": errors,
+            "total_seconds": round(total, 4),
+            "mean_seconds": round(total / len(values), 4) if values else 0.0,
+            "p50_seconds": round(percentile(values, 0.5), 4),
+            "p95_seconds": round(percentile(values, 0.95), 4),
+            "max_seconds": round(values[-1], 4) if values else 0.0,
+        }
+
+    def snapshot(self):
+        with self._lock:
+            stages = sorted(self.durations)
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "elapsed_seconds": round(time.time() - self.started_at, 2),
+            "stages": {stage: self.stage_summary(stage) for stage in stages},
+            "counters": counters,
+        }
+
+    def write_json(self, path, extra=None):
+        """Write the metrics snapshot (plus any `extra` run information) to `path`."""
+        report = self.snapshot()
+        if extra:
+            report.update(extra)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        logging.info(f"Run metrics written to {path}")
+        return path
+
+    def prometheus_text(self):
+        """The current metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self.durations.items()}
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_stage_duration_seconds Time spent per scraping stage.",
+            f"# TYPE {PROMETHEUS_PREFIX}_stage_duration_seconds summary",
+        ]
+        for stage, summary in snapshot["stages"].items():
+            for quantile in QUANTILES:
+                lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                             f'{percentile(durations.get(stage, []), quantile)}')
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds_sum{{stage="{stage}"}} '
+                         f'{sum(durations.get(stage, []))}')
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds_count{{stage="{stage}"}} {summary["count"]}')
+
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_stage_errors_total Timed stage calls that raised.")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_stage_errors_total counter")
+        for stage, summary in snapshot["stages"].items():
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_errors_total{{stage="{stage}"}} {summary["errors"]}')
+
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_events_total Retries, timeouts and other run events.")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_events_total counter")
+        for name, count in snapshot["counters"].items():
+            lines.append(f'{PROMETHEUS_PREFIX}_events_total{{event="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port, host="0.0.0.0"):
+        """Serve the metrics at http://host:port/metrics from a daemon thread. Returns the server."""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes of /metrics out of the run log
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        logging.info(f"Serving Prometheus metrics on port {server.server_address[1]}.")
+        return server
+
+
+# Shared registry for the whole run
+METRICS = Metrics()
@@ -0,0 +1,220 @@
+"""
+Optional columnar copy of each run's output: a Parquet dataset partitioned by scrape date and department.
+
+  <root>/scrape_date=2025-03-04/department=DEPT%20OF%20DEFENSE/run-<run timestamp>-<batch>-0.parquet
+
+Rows are typed once, as they are written: the four SAM.gov date fields become UTC timestamps,
+Last Modified Date and the attachment Updated Date become dates, and the flags and counts get
+boolean and integer types. Rows are written a batch at a time, so memory does not grow with
+the size of the run. Attachment rows carry their contract's Notice ID, name, department and scrape
+date (the CSV leaves them blank), so every row lands in its contract's partition. The summary row is
+not part of the dataset. Reporting jobs read only the partitions and columns they need with
+read_history().
+"""
+import argparse
+import csv
+import logging
+from datetime import datetime, timezone
+
+from file_numbers import run_timestamp_from_path
+from sam_dates import parse_sam_date, parse_sam_datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # Optional dependency; Parquet output is unavailable without it
+    pa = None
+
+COMPRESSION = "zstd"
+PARTITION_COLUMNS = ["scrape_date", "department"]
+
+# SAM.gov date/time fields of the combined CSV -> their UTC timestamp columns
+TIMESTAMP_COLUMNS = {
+    "General Published Date": "general_published_date",
+    "Original Published Date": "original_published_date",
+    "Updated Date Offers Due": "updated_offers_due_date",
+    "Original Date Offers Due": "original_offers_due_date",
+}
+
+
+def _schema():
+    utc = pa.timestamp("s", tz="UTC")
+    return pa.schema([
+        ("run_timestamp", pa.string()),
+        ("contract_number", pa.int32()),
+        ("notice_id", pa.string()),
+        ("contract_name", pa.string()),
+        ("contract_link", pa.string()),
+        ("last_modified_date", pa.date32()),
+        ("general_published_date", utc),
+        ("original_published_date", utc),
+        ("updated_offers_due_date", utc),
+        ("original_offers_due_date", utc),
+        ("total_attachments", pa.int32()),
+        ("failed_row", pa.bool_()),
+        ("incomplete_data", pa.bool_()),
+        ("date_scraped", pa.timestamp("s")),
+        ("file_name", pa.string()),
+        ("file_link", pa.string()),
+        ("attachment_updated_date", pa.date32()),
+        ("scrape_date", pa.date32()),
+        ("department", pa.string()),
+    ])
+
+
+def _partitioning():
+    schema = _schema()
+    return ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor="hive")
+
+
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value)
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _utc(value):
+    parsed = parse_sam_datetime(value)
+    return parsed.astimezone(timezone.utc) if parsed else None
+
+
+def _date_scraped(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+class RunParquetWriter:
+    """
+    Writes one run's output rows as typed columns into the partitioned dataset under `root`,
+    `batch_size` rows at a time; close() writes the last partial batch. Rows are added a contract
+    at a time, as produced by main.contract_output_rows (the first row carries the contract fields).
+    """
+
+    def __init__(self, root, run_timestamp, batch_size=10000):
+        if pa is None:
+            raise ImportError("Parquet output requires the 'pyarrow' package.")
+        self.root = root
+        self.run_timestamp = run_timestamp
+        self.batch_size = batch_size
+        self.schema = _schema()
+        self._columns = {name: [] for name in self.schema.names}
+        self._batch_number = 0
+        self.rows_written = 0
+
+    def add_rows(self, rows):
+        """Add the combined output rows of one contract; the summary row is skipped."""
+        rows = [row for row in rows if _text(row, "Contract Number") != "Summary"]
+        if not rows:
+            return
+        contract = rows[0]
+        contract_scraped = _date_scraped(_text(contract, "Date Scraped"))
+        scrape_date = contract_scraped.date() if contract_scraped else None
+        for row in rows:
+            date_scraped = _date_scraped(_text(row, "Date Scraped"))
+            values = {
+                "run_timestamp": self.run_timestamp,
+                "contract_number": _int(_text(row, "Contract Number")),
+                "notice_id": _text(contract, "Notice ID") or None,
+                "contract_name": _text(contract, "Contract Name") or None,
+                "contract_link": _text(contract, "Contract Link") or None,
+                "last_modified_date": parse_sam_date(_text(contract, "Last Modified Date")),
+                "total_attachments": _int(_text(row, "Total Attachments")) or 0,
+                "failed_row": _text(row, "Failed Row") == "True",
+                "incomplete_data": _text(row, "Incomplete Data") == "True",
+                "date_scraped": date_scraped,
+                "file_name": _text(row, "File Name") or None,
+                "file_link": _text(row, "File Link") or None,
+                "attachment_updated_date": parse_sam_date(_text(row, "Updated Date")),
+                "scrape_date": scrape_date,
+                "department": _text(contract, "Department") or None,
+            }
+            for csv_column, column in TIMESTAMP_COLUMNS.items():
+                values[column] = _utc(_text(row, csv_column))
+            for name, value in values.items():
+                self._columns[name].append(value)
+        if len(self._columns["run_timestamp"]) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        """Write the buffered rows into the dataset as one record batch, with file names unique to the batch."""
+        if not self._columns["run_timestamp"]:
+            return
+        batch = pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        self._columns = {name: [] for name in self.schema.names}
+        ds.write_dataset(
+            pa.Table.from_batches([batch], schema=self.schema),
+            self.root,
+            format="parquet",
+            partitioning=_partitioning(),
+            basename_template=f"run-{self.run_timestamp}-{self._batch_number}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION),
+        )
+        self._batch_number += 1
+        self.rows_written += batch.num_rows
+
+    def close(self):
+        """Write the remaining rows into the dataset. Returns the number of rows written."""
+        self._flush()
+        if not self.rows_written:
+            return 0
+        logging.info(f"Wrote {self.rows_written} rows to the Parquet dataset at {self.root}")
+        return self.rows_written
+
+
+def read_history(root, start_date=None, end_date=None, columns=None, departments=None):
+    """
+    Read rows scraped between `start_date` and `end_date` (inclusive dates) from the dataset
+    under `root` as a pandas DataFrame. Only the matching partitions and the requested
+    `columns` are read from disk.
+    """
+    if pa is None:
+        raise ImportError("Reading the Parquet dataset requires the 'pyarrow' package.")
+    dataset = ds.dataset(root, format="parquet", partitioning=_partitioning(), schema=_schema())
+    condition = None
+    for clause in (
+        ds.field("scrape_date") >= pa.scalar(start_date, pa.date32()) if start_date else None,
+        ds.field("scrape_date") <= pa.scalar(end_date, pa.date32()) if end_date else None,
+        ds.field("department").isin(departments) if departments else None,
+    ):
+        if clause is not None:
+            condition = clause if condition is None else condition & clause
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def import_csv(csv_path, root, run_timestamp=None):
+    """
+    Add an existing combined CSV to the dataset (e.g. to backfill earlier runs).
+    The run timestamp is taken from the file name unless given. Returns the number of rows written.
+    """
+    if run_timestamp is None:
+        run_timestamp = run_timestamp_from_path(csv_path)
+    writer = RunParquetWriter(root, run_timestamp)
+    with open(csv_path, newline="", encoding="utf-8") as file:
+        contract_rows = []
+        for row in csv.DictReader(file):
+            # A row with a Notice ID (or a failed row) starts the next contract
+            if contract_rows and (row.get("Notice ID") or row.get("Contract Name")):
+                writer.add_rows(contract_rows)
+                contract_rows = []
+            contract_rows.append(row)
+        writer.add_rows(contract_rows)
+    return writer.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Add combined CSV files of earlier runs to the Parquet dataset.")
+    parser.add_argument("root", help="Parquet dataset directory (PARQUET_DIRECTORY)")
+    parser.add_argument("csv_files", nargs="+", help="final_combined_data CSV files")
+    args = parser.parse_args()
+    for path in args.csv_files:
+        import_csv(path, args.root)
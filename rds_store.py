@@ -0,0 +1,437 @@
+"""
+Normalized PostgreSQL schema for scraped contracts, and the loader that upserts a run into it.
+
+Tables:
+  runs         one row per scraping run, with its summary counts
+  contracts    one row per Notice ID, updated in place as notices change
+  attachments  one row per (notice_id, file_link)
+
+A run's combined CSV rows are parsed into typed rows, bulk loaded into session temporary
+staging tables with COPY (or execute_values) in short batch transactions, and merged with
+INSERT ... ON CONFLICT in one transaction at the end. RunLoader accepts rows while the run is still scraping, so the database
+load can run alongside it. connect_to_rds() and save_to_rds() open the connection from the
+RDS_* settings in .env and load a finished CSV.
+"""
+import csv
+import io
+import itertools
+import logging
+import os
+import re
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from metrics import METRICS
+from sam_dates import parse_sam_date, parse_sam_datetime
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    run_timestamp TEXT NOT NULL UNIQUE,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    output_file TEXT,
+    total_contracts INTEGER,
+    failed_contracts INTEGER,
+    contracts_with_missing_data INTEGER,
+    total_attachments INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS contracts (
+    notice_id TEXT PRIMARY KEY,
+    contract_name TEXT,
+    department TEXT,
+    contract_link TEXT,
+    last_modified_date DATE,
+    general_published_date TIMESTAMPTZ,
+    original_published_date TIMESTAMPTZ,
+    updated_offers_due_date TIMESTAMPTZ,
+    original_offers_due_date TIMESTAMPTZ,
+    total_attachments INTEGER NOT NULL DEFAULT 0,
+    incomplete_data BOOLEAN NOT NULL DEFAULT FALSE,
+    date_scraped TIMESTAMP,
+    first_seen_run_id BIGINT REFERENCES runs (run_id),
+    last_seen_run_id BIGINT REFERENCES runs (run_id)
+);
+
+CREATE INDEX IF NOT EXISTS contracts_department_idx ON contracts (department);
+CREATE INDEX IF NOT EXISTS contracts_updated_offers_due_idx ON contracts (updated_offers_due_date);
+CREATE INDEX IF NOT EXISTS contracts_original_offers_due_idx ON contracts (original_offers_due_date);
+CREATE INDEX IF NOT EXISTS contracts_last_seen_run_idx ON contracts (last_seen_run_id);
+
+CREATE TABLE IF NOT EXISTS attachments (
+    notice_id TEXT NOT NULL REFERENCES contracts (notice_id) ON DELETE CASCADE,
+    file_link TEXT NOT NULL,
+    file_name TEXT,
+    updated_date DATE,
+    first_seen_run_id BIGINT REFERENCES runs (run_id),
+    last_seen_run_id BIGINT REFERENCES runs (run_id),
+    PRIMARY KEY (notice_id, file_link)
+);
+"""
+
+CONTRACT_COLUMNS = [
+    "notice_id", "contract_name", "department", "contract_link", "last_modified_date",
+    "general_published_date", "original_published_date", "updated_offers_due_date", "original_offers_due_date",
+    "total_attachments", "incomplete_data", "date_scraped",
+]
+ATTACHMENT_COLUMNS = ["notice_id", "file_link", "file_name", "updated_date"]
+
+# Session temp tables, so staged batches can be committed as they arrive
+DROP_STAGING_SQL = "DROP TABLE IF EXISTS pg_temp.stage_contracts, pg_temp.stage_attachments;"
+STAGING_SQL = DROP_STAGING_SQL + """
+CREATE TEMP TABLE stage_contracts (LIKE contracts INCLUDING DEFAULTS);
+CREATE TEMP TABLE stage_attachments (LIKE attachments INCLUDING DEFAULTS);
+"""
+
+# Registers the run without touching the summary of an earlier load of it
+REGISTER_RUN_SQL = """
+INSERT INTO runs (run_timestamp, output_file)
+VALUES (%(run_timestamp)s, %(output_file)s)
+ON CONFLICT (run_timestamp) DO UPDATE SET output_file = EXCLUDED.output_file
+RETURNING run_id
+"""
+
+UPSERT_RUN_SQL = """
+INSERT INTO runs (run_timestamp, output_file, total_contracts, failed_contracts,
+                  contracts_with_missing_data, total_attachments)
+VALUES (%(run_timestamp)s, %(output_file)s, %(total_contracts)s, %(failed_contracts)s,
+        %(contracts_with_missing_data)s, %(total_attachments)s)
+ON CONFLICT (run_timestamp) DO UPDATE SET
+    loaded_at = now(),
+    output_file = EXCLUDED.output_file,
+    total_contracts = EXCLUDED.total_contracts,
+    failed_contracts = EXCLUDED.failed_contracts,
+    contracts_with_missing_data = EXCLUDED.contracts_with_missing_data,
+    total_attachments = EXCLUDED.total_attachments
+RETURNING run_id
+"""
+
+UPSERT_CONTRACTS_SQL = """
+INSERT INTO contracts ({columns}, first_seen_run_id, last_seen_run_id)
+SELECT DISTINCT ON (notice_id) {columns}, %(run_id)s, %(run_id)s
+FROM stage_contracts
+ORDER BY notice_id, date_scraped DESC
+ON CONFLICT (notice_id) DO UPDATE SET
+    {updates},
+    total_attachments = CASE WHEN EXCLUDED.incomplete_data THEN contracts.total_attachments
+                             ELSE EXCLUDED.total_attachments END,
+    incomplete_data = EXCLUDED.incomplete_data AND contracts.incomplete_data,
+    last_seen_run_id = EXCLUDED.last_seen_run_id
+"""
+
+UPSERT_ATTACHMENTS_SQL = """
+INSERT INTO attachments ({columns}, first_seen_run_id, last_seen_run_id)
+SELECT DISTINCT ON (notice_id, file_link) {columns}, %(run_id)s, %(run_id)s
+FROM stage_attachments
+WHERE notice_id IN (SELECT notice_id FROM contracts)
+ORDER BY notice_id, file_link
+ON CONFLICT (notice_id, file_link) DO UPDATE SET
+    {updates},
+    last_seen_run_id = EXCLUDED.last_seen_run_id
+"""
+
+SUMMARY_COUNT = re.compile(r"(\d+)\s*$")
+
+
+def _upsert_sql(template, table, columns, skip_columns):
+    """
+    Fill in an upsert template. Stored values are only replaced by non-NULL ones, so a failed or
+    empty detail scrape cannot erase data an earlier run stored; `skip_columns` (the key and
+    columns the template updates itself) are left out of the generated updates.
+    """
+    return sql.SQL(template).format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        updates=sql.SQL(", ").join(
+            sql.SQL("{col} = COALESCE(EXCLUDED.{col}, {table}.{col})").format(
+                col=sql.Identifier(col), table=sql.Identifier(table)
+            )
+            for col in columns if col not in skip_columns
+        ),
+    )
+
+
+def _summary_count(value):
+    match = SUMMARY_COUNT.search(value or "")
+    return int(match.group(1)) if match else None
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _date_scraped(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(row, key):
+    """A row value as the text the CSV would hold (rows may come from the CSV or straight from the scraper)."""
+    value = row.get(key)
+    return "" if value is None else str(value)
+
+
+def stage_row(row, notice_ids):
+    """
+    Parse one combined CSV row into typed staging values.
+    `notice_ids` maps Contract Number -> Notice ID across calls, for attachment rows that leave the Notice ID blank.
+    Returns (contract values or None, attachment values or None, summary counts or None).
+    """
+    if _text(row, "Contract Number") == "Summary":
+        return None, None, {
+            "total_contracts": _summary_count(_text(row, "Contract Name")),
+            "failed_contracts": _summary_count(_text(row, "Notice ID")),
+            "contracts_with_missing_data": _summary_count(_text(row, "Department")),
+            "total_attachments": _summary_count(_text(row, "Total Attachments")),
+        }
+
+    contract_number = _text(row, "Contract Number")
+    notice_id = _text(row, "Notice ID") or notice_ids.get(contract_number)
+    if not notice_id:
+        return None, None, None  # Failed search rows cannot be keyed
+
+    contract = None
+    if _text(row, "Notice ID"):
+        notice_ids[contract_number] = notice_id
+        contract = [
+            notice_id,
+            _text(row, "Contract Name") or None,
+            _text(row, "Department") or None,
+            _text(row, "Contract Link") or None,
+            _isoformat(parse_sam_date(_text(row, "Last Modified Date"))),
+            _isoformat(parse_sam_datetime(_text(row, "General Published Date"))),
+            _isoformat(parse_sam_datetime(_text(row, "Original Published Date"))),
+            _isoformat(parse_sam_datetime(_text(row, "Updated Date Offers Due"))),
+            _isoformat(parse_sam_datetime(_text(row, "Original Date Offers Due"))),
+            _text(row, "Total Attachments") or 0,
+            _text(row, "Incomplete Data") == "True",
+            _date_scraped(_text(row, "Date Scraped")),
+        ]
+
+    attachment = None
+    if _text(row, "File Link"):
+        attachment = [
+            notice_id,
+            _text(row, "File Link"),
+            _text(row, "File Name"),
+            _isoformat(parse_sam_date(_text(row, "Updated Date"))),
+        ]
+    return contract, attachment, None
+
+
+def _load_staging(cursor, table, columns, rows, use_copy):
+    if not rows:
+        return
+    if use_copy:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        copy_query = sql.SQL("COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)").format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        )
+        cursor.copy_expert(copy_query.as_string(cursor.connection), buffer)
+    else:
+        insert_query = sql.SQL("INSERT INTO {table} ({columns}) VALUES %s").format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        )
+        execute_values(cursor, insert_query.as_string(cursor.connection), rows, page_size=1000)
+
+
+class RunLoader:
+    """
+    Loads one run into the normalized schema.
+    The schema and the run's row are set up in their own short transaction. Rows (combined CSV
+    rows, as dicts) can then be added while the run is still in progress: each batch of
+    `batch_size` is bulk loaded into session temporary staging tables with COPY (or
+    execute_values) and committed. They are merged with INSERT ... ON CONFLICT in one transaction
+    when the run is finished, so no transaction stays open for the length of the scrape.
+    """
+
+    def __init__(self, conn, run_timestamp, output_file, use_copy=True, batch_size=1000):
+        self.conn = conn
+        self.run_timestamp = run_timestamp
+        self.output_file = output_file
+        self.use_copy = use_copy
+        self.batch_size = batch_size
+        self.summary = {}
+        self._notice_ids = {}
+        self._contracts = []
+        self._attachments = []
+        self.cursor = conn.cursor()
+        try:
+            self.cursor.execute(SCHEMA_SQL)
+            self.cursor.execute(REGISTER_RUN_SQL, {"run_timestamp": run_timestamp, "output_file": output_file})
+            self.run_id = self.cursor.fetchone()[0]
+            self.cursor.execute(STAGING_SQL)
+            self.conn.commit()
+        except Exception:
+            self.abort()
+            raise
+
+    def _upsert_run(self):
+        self.cursor.execute(UPSERT_RUN_SQL, {
+            "run_timestamp": self.run_timestamp,
+            "output_file": self.output_file,
+            "total_contracts": self.summary.get("total_contracts"),
+            "failed_contracts": self.summary.get("failed_contracts"),
+            "contracts_with_missing_data": self.summary.get("contracts_with_missing_data"),
+            "total_attachments": self.summary.get("total_attachments"),
+        })
+        return self.cursor.fetchone()[0]
+
+    def add_rows(self, rows):
+        for row in rows:
+            contract, attachment, summary = stage_row(row, self._notice_ids)
+            if contract:
+                self._contracts.append(contract)
+            if attachment:
+                self._attachments.append(attachment)
+            if summary:
+                self.summary = summary
+        if len(self._contracts) + len(self._attachments) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Bulk load the buffered rows into the staging tables and commit them."""
+        _load_staging(self.cursor, "stage_contracts", CONTRACT_COLUMNS, self._contracts, self.use_copy)
+        _load_staging(self.cursor, "stage_attachments", ATTACHMENT_COLUMNS, self._attachments, self.use_copy)
+        self.conn.commit()
+        self._contracts = []
+        self._attachments = []
+
+    def finish(self):
+        """Merge the staged rows into the schema, record the run's summary and commit. Returns the run_id."""
+        try:
+            self.flush()
+            self._upsert_run()
+            self.cursor.execute(
+                _upsert_sql(UPSERT_CONTRACTS_SQL, "contracts", CONTRACT_COLUMNS,
+                            ["notice_id", "total_attachments", "incomplete_data"]), {"run_id": self.run_id}
+            )
+            logging.info(f"Upserted {self.cursor.rowcount} contracts for run {self.run_timestamp}.")
+            self.cursor.execute(
+                _upsert_sql(UPSERT_ATTACHMENTS_SQL, "attachments", ATTACHMENT_COLUMNS, ["notice_id", "file_link"]),
+                {"run_id": self.run_id}
+            )
+            logging.info(f"Upserted {self.cursor.rowcount} attachments for run {self.run_timestamp}.")
+            self.cursor.execute(DROP_STAGING_SQL)
+            self.conn.commit()
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self.cursor.close()
+        return self.run_id
+
+    def abort(self):
+        """Roll back the open transaction and drop the staged rows; nothing is merged into the schema."""
+        try:
+            self.conn.rollback()
+            self.cursor.execute(DROP_STAGING_SQL)
+            self.conn.commit()
+        except psycopg2.Error as e:
+            logging.warning(f"Could not drop the staging tables: {e}")
+        finally:
+            self.cursor.close()
+
+
+def load_run(conn, csv_path, run_timestamp, use_copy=True):
+    """
+    Upsert one run's combined CSV into the normalized schema (see RunLoader).
+    Returns the run_id.
+    """
+    loader = RunLoader(conn, run_timestamp, csv_path, use_copy=use_copy)
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.DictReader(csv_file)
+        while True:
+            batch = list(itertools.islice(reader, loader.batch_size))
+            if not batch:
+                break
+            try:
+                loader.add_rows(batch)
+            except Exception:
+                loader.abort()
+                raise
+    return loader.finish()
+
+
+def connect_to_rds():
+    """
+    Open a connection to the AWS RDS PostgreSQL database using the credentials in .env.
+    Returns the connection, or None if credentials are missing or the connection fails.
+    """
+    RDS_HOST = os.getenv("RDS_HOST")
+    RDS_DBNAME = os.getenv("RDS_DBNAME")
+    RDS_USERNAME = os.getenv("RDS_USERNAME")
+    RDS_PASSWORD = os.getenv("RDS_PASSWORD")
+    RDS_PORT = os.getenv("RDS_PORT")
+
+    if not all([RDS_HOST, RDS_DBNAME, RDS_USERNAME, RDS_PASSWORD, RDS_PORT]):
+        logging.error("Missing RDS credentials in .env file.")
+        return None
+
+    try:
+        conn = psycopg2.connect(
+            host=RDS_HOST,
+            database=RDS_DBNAME,
+            user=RDS_USERNAME,
+            password=RDS_PASSWORD,
+            port=RDS_PORT,
+        )
+        logging.info("Successfully connected to the RDS PostgreSQL database.")
+        return conn
+    except Exception as e:
+        logging.error(f"Failed to connect to RDS: {e}")
+        return None
+
+
+def test_rds_connection():
+    """
+    Test the connection to the AWS RDS PostgreSQL database.
+    Returns True if the connection is successful, False otherwise.
+    """
+    conn = connect_to_rds()
+    if conn is None:
+        return False
+    conn.close()
+    return True
+
+
+@METRICS.timed("db_load")
+def save_to_rds(csv_path, run_timestamp):
+    """
+    Upsert the combined CSV into the normalized contracts/attachments/runs schema
+    in an AWS RDS PostgreSQL database.
+    Rows are bulk loaded with COPY FROM STDIN over a single connection and merged in one transaction,
+    falling back to execute_values if COPY fails.
+    Returns the run_id, or None if the load failed.
+    """
+    conn = connect_to_rds()
+    if conn is None:
+        METRICS.increment("db_load_failures")
+        logging.error("Aborting save operation due to failed database connection.")
+        return None
+
+    try:
+        try:
+            run_id = load_run(conn, csv_path, run_timestamp)
+        except psycopg2.Error as e:
+            # Nothing was merged and the staged rows were dropped, so the whole load is retried
+            METRICS.increment("db_copy_fallbacks")
+            logging.warning(f"COPY load failed ({e}); falling back to execute_values.")
+            run_id = load_run(conn, csv_path, run_timestamp, use_copy=False)
+        logging.info(f"Data successfully upserted into RDS as run {run_id}.")
+        return run_id
+    except Exception as e:
+        METRICS.increment("db_load_failures")
+        logging.error(f"Failed to save data to RDS: {e}")
+        return None
+    finally:
+        conn.close()
+        logging.info("Database connection closed.")
@@ -0,0 +1,165 @@
+"""
+How the scraper paces and retries its requests to SAM.gov.
+
+  RetryPolicy          exponential backoff with full jitter between attempts
+  RateLimiter          spaces requests out to a fixed rate, shared by all workers
+  AdaptiveRateLimiter  a RateLimiter that halves its rate when responses fail or get slow
+                       and raises it again step by step while they are healthy
+  CircuitBreaker       pauses every worker for a cool-down when the recent failure rate spikes
+  HostCircuitBreakers  one CircuitBreaker per host
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from metrics import METRICS
+
+
+class RetriesExhausted(Exception):
+    """Every attempt allowed by a RetryPolicy failed."""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: after failed attempt n, sleep a random time up to base * 2^(n-1)."""
+
+    def __init__(self, attempts=3, base_delay=2.0, max_delay=60.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        """Seconds to wait after failed attempt number `attempt` (starting at 1)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def sleep(self, attempt):
+        delay = self.backoff(attempt)
+        with METRICS.timer("retry_backoff"):
+            time.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter shared by all workers.
+    Spaces calls out so that at most `rate` of them start per second (0 disables limiting).
+    """
+
+    def __init__(self, rate):
+        self.rate = rate if rate and rate > 0 else 0.0
+        self.interval = 1.0 / self.rate if self.rate else 0.0
+        self._lock = threading.Lock()
+        self._next_allowed = time.monotonic()
+
+    def wait(self):
+        """Block until the caller is allowed to make its next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_allowed)
+            self._next_allowed = scheduled + self.interval
+        delay = scheduled - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, latency, ok=True):
+        """Report the outcome of a request (used by AdaptiveRateLimiter)."""
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    RateLimiter whose rate follows the health of the site: a failed request, or one slower
+    than `target_latency` seconds, halves the rate (down to `min_rate`, at most once per
+    `target_latency` seconds); every healthy request raises it by a tenth of `rate`, up to `rate`.
+    A `rate` of 0 disables limiting and adaptation.
+    """
+
+    def __init__(self, rate, min_rate=0.1, target_latency=15.0):
+        super().__init__(rate)
+        self.max_rate = self.rate
+        self.min_rate = min(min_rate, self.max_rate)
+        self.target_latency = target_latency
+        self._last_decrease = 0.0
+
+    def _set_rate(self, rate):
+        self.rate = rate
+        self.interval = 1.0 / rate
+
+    def record(self, latency, ok=True):
+        if not self.max_rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if not ok or latency > self.target_latency:
+                if now - self._last_decrease < self.target_latency or self.rate <= self.min_rate:
+                    return
+                self._last_decrease = now
+                self._set_rate(max(self.min_rate, self.rate / 2))
+                METRICS.increment("rate_limit_decreases")
+                reason = "a failed request" if not ok else f"a {latency:.1f}s response"
+                logging.warning(f"Slowing down to {self.rate:.2f} requests/second after {reason}.")
+            elif self.rate < self.max_rate:
+                self._set_rate(min(self.max_rate, self.rate + self.max_rate / 10))
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of the last `window` requests to one host. Once at least `min_calls`
+    have been recorded and `failure_rate` of them failed, the breaker opens: every worker
+    calling wait() is paused for `cooldown` seconds, after which requests resume with a
+    fresh window. A `failure_rate` of 0 disables the breaker.
+    """
+
+    def __init__(self, host, window=20, failure_rate=0.5, cooldown=60.0, min_calls=None):
+        self.host = host
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.min_calls = min_calls or max(1, window // 2)
+        self._outcomes = deque(maxlen=max(1, window))
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return time.monotonic() < self._open_until
+
+    def record(self, ok):
+        if not self.failure_rate:
+            return
+        with self._lock:
+            self._outcomes.append(ok)
+            failures, calls = self._outcomes.count(False), len(self._outcomes)
+            if calls < self.min_calls or failures / calls < self.failure_rate:
+                return
+            self._open_until = time.monotonic() + self.cooldown
+            self._outcomes.clear()
+        METRICS.increment("circuit_breaker_opens")
+        logging.warning(f"{failures} of the last {calls} requests to {self.host} failed; "
+                        f"pausing all workers for {self.cooldown:g}s.")
+
+    def wait(self):
+        """Block while the breaker is open."""
+        while True:
+            remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            with METRICS.timer("circuit_breaker_pause"):
+                time.sleep(remaining)
+
+
+class HostCircuitBreakers:
+    """Creates and hands out one CircuitBreaker per host, all with the same settings."""
+
+    def __init__(self, window=20, failure_rate=0.5, cooldown=60.0):
+        self.settings = {"window": window, "failure_rate": failure_rate, "cooldown": cooldown}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host, **self.settings)
+            return self._breakers[host]
@@ -0,0 +1,208 @@
+"""
+What changed between two runs' combined CSVs.
+
+Both CSVs are loaded into pandas and every row is given its contract's Notice ID (attachment rows
+leave it blank). Contracts are then compared on a hashed fingerprint of their fields with one
+outer merge on Notice ID, and attachments of notices in both runs with one outer merge on
+(Notice ID, File Link); only the fields present in both CSVs are compared, so a CSV from before
+a column was added can still be diffed. Fields are compared one by one only for the contracts
+whose fingerprints differ. All comparisons are vectorized column operations, so 100k-row runs
+diff in a few seconds. The change report has one row per change:
+
+  new_notice          notice not in the previous run
+  removed_notice      notice of the previous run that is no longer listed
+  due_date_moved      offers due date changed (Previous/Current hold the dates)
+  notice_updated      any other contract field changed (Current names the fields)
+  attachment_added    file link not listed for the notice before
+  attachment_removed  file link no longer listed for the notice
+  attachment_updated  same file link with a new file name or updated date
+"""
+import argparse
+import logging
+import os
+import re
+
+import pandas as pd
+
+from file_numbers import next_file_number
+
+CONTRACT_FIELDS = [
+    "Contract Name", "Department", "Contract Link", "Last Modified Date",
+    "General Published Date", "Original Published Date", "Updated Date Offers Due", "Original Date Offers Due",
+]
+ATTACHMENT_FIELDS = ["File Name", "Updated Date"]
+DUE_DATE_FIELD = "Updated Date Offers Due"
+REPORT_COLUMNS = ["Change", "Notice ID", "Contract Name", "Department", "Contract Link", "File Link", "Previous", "Current"]
+CHANGE_TYPES = [
+    "new_notice", "removed_notice", "due_date_moved", "notice_updated",
+    "attachment_added", "attachment_removed", "attachment_updated",
+]
+# Pointer to the last combined CSV that was diffed, kept in the output directory
+LAST_OUTPUT_FILE = ".last_combined_output"
+COMBINED_OUTPUT = re.compile(r"^final_combined_data_(\d+)_.*\.csv$")
+
+
+def load_run(csv_path):
+    """
+    Read a combined CSV as strings and split it into (contracts, attachments) frames keyed by Notice ID.
+    Failed rows without a Notice ID and the summary row are dropped. Returns (contracts, attachments,
+    the CONTRACT_FIELDS the CSV has); missing fields are left empty.
+    """
+    columns = ["Contract Number", "Notice ID", "File Link"] + CONTRACT_FIELDS + ATTACHMENT_FIELDS
+    rows = pd.read_csv(csv_path, dtype=str, keep_default_na=False, usecols=lambda column: column in columns)
+    fields = [field for field in CONTRACT_FIELDS if field in rows.columns]
+    rows = rows.reindex(columns=columns, fill_value="")
+    rows = rows[rows["Contract Number"] != "Summary"]
+    # Attachment rows leave the Notice ID blank; give them their contract's
+    notice_ids = rows["Notice ID"].where(rows["Notice ID"] != "")
+    rows = rows.assign(**{"Notice ID": notice_ids.groupby(rows["Contract Number"]).transform("first")})
+    rows = rows[rows["Notice ID"].notna()]
+
+    contracts = rows[rows["Contract Name"] != ""].drop_duplicates("Notice ID")[["Notice ID"] + CONTRACT_FIELDS]
+    attachments = rows[rows["File Link"].str.startswith("http")]
+    attachments = attachments.drop_duplicates(["Notice ID", "File Link"])[["Notice ID", "File Link"] + ATTACHMENT_FIELDS]
+    attachments = attachments.assign(
+        fingerprint=pd.util.hash_pandas_object(attachments[ATTACHMENT_FIELDS], index=False)
+    )
+    return contracts.reset_index(drop=True), attachments.reset_index(drop=True), fields
+
+
+def _changes(frame, change, previous="", current="", file_link=""):
+    """Report rows for `change` from a frame with the contract columns of the current (or previous) run."""
+    return pd.DataFrame({
+        "Change": change,
+        "Notice ID": frame["Notice ID"],
+        "Contract Name": frame["Contract Name"],
+        "Department": frame["Department"],
+        "Contract Link": frame["Contract Link"],
+        "File Link": file_link,
+        "Previous": previous,
+        "Current": current,
+    })
+
+
+def _file_label(attachments, suffix=""):
+    """File name of each attachment, followed by its updated date when it has one."""
+    dates = attachments[f"Updated Date{suffix}"]
+    return attachments[f"File Name{suffix}"] + (" (" + dates + ")").where(dates != "", "")
+
+
+def diff_runs(previous_path, current_path):
+    """Compare two combined CSVs. Returns the change report as a DataFrame (REPORT_COLUMNS)."""
+    previous_contracts, previous_attachments, previous_fields = load_run(previous_path)
+    current_contracts, current_attachments, current_fields = load_run(current_path)
+    # Only fields both CSVs have are compared
+    fields = [field for field in current_fields if field in previous_fields]
+    for frame in (previous_contracts, current_contracts):
+        frame["fingerprint"] = pd.util.hash_pandas_object(frame[fields], index=False)
+
+    contracts = previous_contracts.merge(
+        current_contracts, on="Notice ID", how="outer", suffixes=("_previous", ""), indicator=True
+    )
+    # Contract columns from whichever run has the notice, for the report
+    removed_notices = contracts["_merge"] == "left_only"
+    for field in REPORT_COLUMNS[2:5]:
+        contracts.loc[removed_notices, field] = contracts.loc[removed_notices, f"{field}_previous"]
+
+    both = contracts[(contracts["_merge"] == "both") & (contracts["fingerprint"] != contracts["fingerprint_previous"])]
+    due_moved = (both[DUE_DATE_FIELD] != both[f"{DUE_DATE_FIELD}_previous"]) if DUE_DATE_FIELD in fields \
+        else pd.Series(False, index=both.index)
+    other_fields = [field for field in fields if field != DUE_DATE_FIELD]
+    changed_fields = pd.DataFrame({field: both[field] != both[f"{field}_previous"] for field in other_fields},
+                                  index=both.index)
+    updated = changed_fields.any(axis=1)
+    changed_names = changed_fields.loc[updated].dot(pd.Index(other_fields) + ", ").str.rstrip(", ")
+
+    # Attachments are only compared for notices listed in both runs
+    attachments = previous_attachments.merge(
+        current_attachments, on=["Notice ID", "File Link"], how="outer", suffixes=("_previous", ""), indicator=True
+    )
+    notices = contracts[["Notice ID"] + REPORT_COLUMNS[2:5]].assign(in_both=contracts["_merge"] == "both")
+    attachments = attachments.merge(notices, on="Notice ID", how="left")
+    attachments = attachments[attachments["in_both"].fillna(False).astype(bool)].fillna("")
+    added = attachments[attachments["_merge"] == "right_only"]
+    removed = attachments[attachments["_merge"] == "left_only"]
+    modified = attachments[(attachments["_merge"] == "both")
+                           & (attachments["fingerprint"] != attachments["fingerprint_previous"])]
+
+    report = pd.concat([
+        _changes(contracts[contracts["_merge"] == "right_only"], "new_notice"),
+        _changes(contracts[contracts["_merge"] == "left_only"], "removed_notice"),
+        _changes(both[due_moved], "due_date_moved",
+                 both.loc[due_moved, f"{DUE_DATE_FIELD}_previous"], both.loc[due_moved, DUE_DATE_FIELD]),
+        _changes(both[updated], "notice_updated", "", changed_names),
+        _changes(added, "attachment_added", "", added["File Name"], added["File Link"]),
+        _changes(removed, "attachment_removed", removed["File Name_previous"], "", removed["File Link"]),
+        _changes(modified, "attachment_updated", _file_label(modified, "_previous"), _file_label(modified),
+                 modified["File Link"]),
+    ], ignore_index=True)
+    report["Change"] = pd.Categorical(report["Change"], categories=CHANGE_TYPES, ordered=True)
+    return report.sort_values(["Change", "Notice ID"], kind="stable")[REPORT_COLUMNS].reset_index(drop=True)
+
+
+def change_counts(report):
+    """Number of report rows of each change type."""
+    counts = report["Change"].value_counts()
+    return {change: int(counts.get(change, 0)) for change in CHANGE_TYPES}
+
+
+def previous_output_path(directory, current_path):
+    """
+    The combined CSV to compare `current_path` with: the last one diffed in `directory`, or if
+    none was recorded yet, the highest-numbered final_combined_data CSV before it. None if there is none.
+    """
+    pointer = os.path.join(directory, LAST_OUTPUT_FILE)
+    if os.path.exists(pointer):
+        with open(pointer, encoding="utf-8") as file:
+            path = os.path.join(directory, file.read().strip())
+        if os.path.exists(path) and os.path.abspath(path) != os.path.abspath(current_path):
+            return path
+    current = COMBINED_OUTPUT.match(os.path.basename(current_path))
+    candidates = [
+        (int(match.group(1)), name) for match, name in
+        ((COMBINED_OUTPUT.match(name), name) for name in os.listdir(directory))
+        if match and name != os.path.basename(current_path)
+        and (current is None or int(match.group(1)) < int(current.group(1)))
+    ]
+    return os.path.join(directory, max(candidates)[1]) if candidates else None
+
+
+def record_last_output(directory, output_path):
+    """Remember `output_path` as the run the next one is compared with."""
+    with open(os.path.join(directory, LAST_OUTPUT_FILE), "w", encoding="utf-8") as file:
+        file.write(os.path.basename(output_path))
+
+
+def write_change_report(output_path, run_timestamp, previous_path=None):
+    """
+    Diff the run's combined CSV with the previous run's and write changes_<n>_<timestamp>.csv
+    next to it. Returns (report path, counts), or (None, None) if there is no previous run.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    previous_path = previous_path or previous_output_path(directory, output_path)
+    if previous_path is None:
+        logging.info("No previous run to compare with; skipping the change report.")
+        record_last_output(directory, output_path)
+        return None, None
+
+    report = diff_runs(previous_path, output_path)
+    report_path = os.path.join(directory, f"changes_{next_file_number(directory, 'changes_')}_{run_timestamp}.csv")
+    report.to_csv(report_path, index=False)
+    record_last_output(directory, output_path)
+    counts = change_counts(report)
+    logging.info(f"Changes since {os.path.basename(previous_path)}: "
+                 + ", ".join(f"{count} {change}" for change, count in counts.items())
+                 + f". Report saved to {report_path}")
+    return report_path, counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Report what changed between two combined CSVs.")
+    parser.add_argument("previous", help="final_combined_data CSV of the earlier run")
+    parser.add_argument("current", help="final_combined_data CSV of the later run")
+    parser.add_argument("report", help="Change report CSV to write")
+    args = parser.parse_args()
+    changes = diff_runs(args.previous, args.current)
+    changes.to_csv(args.report, index=False)
+    logging.info(f"{len(changes)} changes written to {args.report}: {change_counts(changes)}")
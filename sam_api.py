@@ -0,0 +1,176 @@
+"""
+HTTP fast path for SAM.gov opportunity detail data.
+
+The SAM.gov front end loads everything scrape_attachments reads (published dates,
+response dates and attachment links) as JSON from its backend. SamApiClient fetches
+and parses that JSON directly over pooled keep-alive connections, so a browser is
+only needed when the fast path fails.
+"""
+import logging
+import re
+import threading
+from datetime import datetime, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9: keep the timestamps' own UTC offsets
+    ZoneInfo = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # Optional dependency; without it the Selenium path is always used
+    requests = None
+
+OPPORTUNITY_PATH = "/api/prod/opps/v2/opportunities/{opportunity_id}"
+RESOURCES_PATH = "/api/prod/opps/v3/opportunities/{opportunity_id}/resources"
+FILE_DOWNLOAD_PATH = "/api/prod/opps/v3/opportunities/resources/files/{resource_id}/download?&token="
+
+# Where each scraped date lives in the opportunity JSON, in the order scrape_attachments returns them
+DATE_FIELD_PATHS = [
+    ("postedDate",),  # General (updated) published date
+    ("originalPostedDate",),  # Original published date
+    ("data2", "solicitation", "deadlines", "response"),  # Updated date offers due
+    ("originalResponseDate",),  # Original date offers due
+]
+RESPONSE_TIMEZONE_PATH = ("data2", "solicitation", "deadlines", "responseTz")
+
+OPPORTUNITY_ID_PATTERN = re.compile(r"/opp/([^/?#]+)")
+
+
+def opportunity_id_from_link(contract_link):
+    """Return the opportunity id from a https://sam.gov/opp/<id>/view link, or None."""
+    match = OPPORTUNITY_ID_PATTERN.search(contract_link or "")
+    return match.group(1) if match else None
+
+
+def _get_path(data, path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def format_sam_datetime(value, tz_name=None, date_only=False):
+    """
+    Format an ISO-8601 timestamp from the API the way the SAM.gov page displays it,
+    e.g. "Mar 04, 2025 03:01 pm CST" (or "Mar 04, 2025" when `date_only`).
+    Values that cannot be parsed are returned unchanged.
+    """
+    if not value:
+        return ""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if tz_name and ZoneInfo is not None:
+        try:
+            parsed = parsed.astimezone(ZoneInfo(tz_name))
+        except Exception:
+            pass
+
+    if date_only:
+        return parsed.strftime("%b %d, %Y")
+    return f"{parsed.strftime('%b %d, %Y %I:%M')} {parsed.strftime('%p').lower()} {parsed.tzname()}".strip()
+
+
+class SamApiClient:
+    """
+    Fetches opportunity details from the SAM.gov JSON API.
+    Each thread gets its own keep-alive requests.Session so the client can be shared by worker threads.
+    """
+
+    def __init__(self, base_url="https://sam.gov", timeout=10, pool_size=10):
+        if requests is None:
+            raise ImportError("The HTTP fast path requires the 'requests' package.")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get_json(self, path):
+        """GET `path` relative to the base URL and return the decoded JSON (None on 404)."""
+        response = self._session().get(self.base_url + path, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_attachments(self, opportunity_id):
+        """Return the opportunity's attachments in the same shape scrape_attachments produces."""
+        resources = self.get_json(RESOURCES_PATH.format(opportunity_id=opportunity_id)) or {}
+        attachment_lists = _get_path(resources, ("_embedded", "opportunityAttachmentList")) or []
+
+        documents = []
+        for attachment_list in attachment_lists:
+            for attachment in attachment_list.get("attachments") or []:
+                if str(attachment.get("deletedFlag", "0")) == "1":
+                    continue
+                if attachment.get("type") == "link":
+                    file_link = attachment.get("uri") or ""
+                else:
+                    file_link = self.base_url + FILE_DOWNLOAD_PATH.format(resource_id=attachment.get("resourceId"))
+                documents.append({
+                    "File Name": attachment.get("name") or attachment.get("uri") or "",
+                    "File Link": file_link,
+                    "Updated Date": format_sam_datetime(attachment.get("postedDate"), date_only=True)
+                })
+        return documents
+
+    def fetch_details(self, contract_link):
+        """
+        Fetch the dates and attachments for a contract link.
+        Returns the same tuple as scrape_attachments, or None if the fast path failed
+        and the caller should fall back to Selenium.
+        """
+        opportunity_id = opportunity_id_from_link(contract_link)
+        if not opportunity_id:
+            return None
+
+        try:
+            opportunity = self.get_json(OPPORTUNITY_PATH.format(opportunity_id=opportunity_id))
+            if not opportunity:
+                logging.warning(f"API fast path found no opportunity for {contract_link}.")
+                return None
+
+            response_tz = _get_path(opportunity, RESPONSE_TIMEZONE_PATH)
+            dates = [
+                format_sam_datetime(_get_path(opportunity, path), tz_name=response_tz)
+                for path in DATE_FIELD_PATHS
+            ]
+            if not any(dates):
+                logging.warning(f"API fast path returned no date fields for {contract_link}.")
+                return None
+
+            documents = self.fetch_attachments(opportunity_id)
+        except Exception as e:
+            logging.warning(f"API fast path failed for {contract_link}: {e}")
+            return None
+
+        logging.info(f"Fetched {contract_link} via API fast path with {len(documents)} attachments.")
+        return (documents, *dates)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
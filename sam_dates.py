@@ -0,0 +1,52 @@
+"""
+Parsing of the date strings SAM.gov displays, e.g. "Mar 04, 2025 03:01 pm CST" or "Mar 04, 2025".
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+# US timezone abbreviations used on SAM.gov, as UTC offsets in hours
+TIMEZONE_OFFSETS = {
+    "UTC": 0, "GMT": 0,
+    "EST": -5, "EDT": -4,
+    "CST": -6, "CDT": -5,
+    "MST": -7, "MDT": -6,
+    "PST": -8, "PDT": -7,
+    "AKST": -9, "AKDT": -8,
+    "HST": -10, "HDT": -9,
+    "AST": -4, "ChST": 10, "SST": -11,
+}
+
+DATETIME_FORMATS = ["%b %d, %Y %I:%M %p", "%b %d, %Y %H:%M"]
+DATE_FORMATS = ["%b %d, %Y", "%Y-%m-%d"]
+
+TIMEZONE_SUFFIX = re.compile(r"\s+([A-Za-z]{2,5})$")
+
+
+def parse_sam_datetime(value):
+    """
+    Parse a SAM.gov date/time string into a timezone-aware datetime.
+    Date-only values become midnight UTC, and values without a known timezone are taken as UTC.
+    Returns None for empty or unparseable values.
+    """
+    text = (value or "").strip()
+    if not text:
+        return None
+
+    tz = timezone.utc
+    match = TIMEZONE_SUFFIX.search(text)
+    if match and match.group(1) in TIMEZONE_OFFSETS:
+        tz = timezone(timedelta(hours=TIMEZONE_OFFSETS[match.group(1)]))
+        text = text[:match.start()]
+
+    for fmt in DATETIME_FORMATS + DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=tz)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_sam_date(value):
+    """Parse a SAM.gov date (or date/time) string into a date, or None."""
+    parsed = parse_sam_datetime(value)
+    return parsed.date() if parsed else None
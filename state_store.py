@@ -0,0 +1,117 @@
+"""
+Persistent local state for incremental runs.
+
+Keeps one SQLite row per Notice ID with the last-seen modified date from the search
+results, a fingerprint of its attachment list and the cached detail fields, so
+contracts that have not changed since the last run can skip their detail scrape.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notices (
+    notice_id TEXT PRIMARY KEY,
+    last_modified TEXT,
+    attachment_fingerprint TEXT,
+    details TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_scraped TEXT NOT NULL
+)
+"""
+
+SEARCH_DATE_FORMAT = "%b %d, %Y"  # e.g. "Mar 04, 2025" as shown on search result cards
+
+
+def attachment_fingerprint(documents):
+    """Stable hash of an attachment list, independent of the order the page lists them in."""
+    entries = sorted(
+        (document.get("File Name", ""), document.get("File Link", ""), document.get("Updated Date", ""))
+        for document in documents
+    )
+    return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+def _parse_search_date(value):
+    try:
+        return datetime.strptime(value, SEARCH_DATE_FORMAT).date()
+    except (TypeError, ValueError):
+        return None
+
+
+class StateStore:
+    """
+    SQLite-backed record of what each notice looked like when it was last scraped.
+    The connection is shared behind a lock so search shards on other threads can query it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def _get(self, notice_id):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT last_modified, attachment_fingerprint, details, last_scraped FROM notices WHERE notice_id = ?",
+                (notice_id,)
+            ).fetchone()
+
+    def is_unchanged(self, notice_id, last_modified):
+        """
+        True if the notice was already scraped with the same modified date.
+        Search cards only show the day, so a notice modified on the day it was last scraped
+        is treated as changed in case it was updated again after the scrape.
+        """
+        modified_day = _parse_search_date(last_modified)
+        if not notice_id or modified_day is None:
+            return False
+        record = self._get(notice_id)
+        if record is None or record[0] != last_modified:
+            return False
+        return datetime.fromisoformat(record[3]).date() > modified_day
+
+    def cached_details(self, notice_id):
+        """Return the cached scrape_attachments tuple for a notice, or None."""
+        record = self._get(notice_id)
+        return tuple(json.loads(record[2])) if record else None
+
+    def record(self, notice_id, last_modified, details):
+        """
+        Store freshly scraped details for a notice.
+        Returns True if its attachment list changed since the previous scrape.
+        """
+        if not notice_id:
+            return False
+        fingerprint = attachment_fingerprint(details[0])
+        previous = self._get(notice_id)
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._upsert(notice_id, last_modified, fingerprint, details, now)
+        attachments_changed = previous is not None and previous[1] != fingerprint
+        if attachments_changed:
+            logging.info(f"Attachments changed for notice {notice_id}.")
+        return attachments_changed
+
+    def _upsert(self, notice_id, last_modified, fingerprint, details, now):
+        self.conn.execute(
+            """
+            INSERT INTO notices (notice_id, last_modified, attachment_fingerprint, details, first_seen, last_scraped)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (notice_id) DO UPDATE SET
+                last_modified = excluded.last_modified,
+                attachment_fingerprint = excluded.attachment_fingerprint,
+                details = excluded.details,
+                last_scraped = excluded.last_scraped
+            """,
+            (notice_id, last_modified, fingerprint, json.dumps(list(details)), now, now)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
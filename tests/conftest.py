@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(REPO_ROOT, "benchmarks")
+sys.path[:0] = [REPO_ROOT, BENCHMARKS]
+
+from stub_server import DEFAULT_ROOT, start_stub_server  # noqa: E402
+
+
+@pytest.fixture
+def stub_server():
+    """Start benchmarks/stub_server.py on a free port. Call it with a fixture root; returns the base URL."""
+    servers = []
+
+    def start(root=DEFAULT_ROOT):
+        server, base_url = start_stub_server(root)
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
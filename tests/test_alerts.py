@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import alerts
+
+NOW = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def contract(notice_id, name="", department="", due="", file_names=()):
+    return {"notice_id": notice_id, "name": name, "department": department, "link": f"https://sam.gov/opp/{notice_id}",
+            "due": due, "file_names": list(file_names)}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = alerts.AlertIndex(str(tmp_path / "alerts.sqlite3"))
+    index.update([
+        contract("N1", "Zero Trust Architecture Support", "DEPT OF DEFENSE", "Mar 14, 2025 05:00 pm EST"),
+        contract("N2", "Trust Fund Accounting for Zero Based Budgets", "TREASURY, DEPARTMENT OF THE",
+                 "Apr 30, 2025 05:00 pm EST"),
+        contract("N3", "Cloud Hosting", "DEPT OF DEFENSE", "Mar 20, 2025 05:00 pm EST",
+                 file_names=["ZTNA_Requirements.pdf"]),
+        contract("N4", "Cloud Migration", "DEFENSE LOGISTICS AGENCY", "Mar 12, 2025 05:00 pm EST"),
+    ])
+    yield index
+    index.close()
+
+
+def matched(index, *specs, notice_ids=None):
+    rules = [alerts.AlertRule(spec) for spec in specs]
+    return [(rule.name, notice_id, terms) for rule, notice_id, terms in index.evaluate(rules, notice_ids, NOW)]
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert alerts.tokenize("Zero-Trust (ZTNA) v2.0") == ["zero", "trust", "ztna", "v2", "0"]
+    assert alerts.tokenize(None) == []
+
+
+def test_keyword_matches_any_term_in_any_field(index):
+    assert matched(index, {"name": "ZT", "keywords": ["ztna", "architecture"]}) == [
+        ("ZT", "N1", ["architecture"]),
+        ("ZT", "N3", ["ztna"]),
+    ]
+
+
+def test_phrase_needs_consecutive_words(index):
+    # N2 has both words, but not next to each other
+    assert matched(index, {"name": "ZT", "keywords": "zero trust"}) == [("ZT", "N1", ["zero trust"])]
+
+
+def test_keyword_fields_limit_where_terms_are_searched(index):
+    assert matched(index, {"name": "Files", "keywords": ["ztna"], "fields": ["name"]}) == []
+    assert matched(index, {"name": "Files", "keywords": ["ztna"], "fields": ["file_names"]}) == [
+        ("Files", "N3", ["ztna"])
+    ]
+
+
+def test_department_needs_all_its_words(index):
+    assert [notice_id for _, notice_id, _ in matched(index, {"name": "DoD", "departments": ["DEPT OF DEFENSE"]})] == [
+        "N1", "N3"
+    ]
+
+
+def test_every_condition_must_hold(index):
+    rule = {"name": "DoD cloud due soon", "keywords": ["cloud"], "departments": ["defense"], "due_within_days": 7}
+    assert matched(index, rule) == [("DoD cloud due soon", "N4", ["cloud"])]
+
+
+def test_due_within_days_counts_from_now(index):
+    assert [notice_id for _, notice_id, _ in matched(index, {"name": "Soon", "due_within_days": 5})] == ["N1", "N4"]
+
+
+def test_evaluation_is_limited_to_the_given_notices(index):
+    assert matched(index, {"name": "Cloud", "keywords": ["cloud"]}, notice_ids=["N4"]) == [("Cloud", "N4", ["cloud"])]
+
+
+def test_changed_contract_is_reindexed(index):
+    index.update([contract("N3", "Data Center Hosting", "DEPT OF DEFENSE", file_names=["SOW.pdf"])])
+
+    assert matched(index, {"name": "ZT", "keywords": ["ztna"]}) == []
+    assert matched(index, {"name": "DC", "keywords": ["data center"]}) == [("DC", "N3", ["data center"])]
+
+
+def test_rule_without_conditions_or_with_unknown_keys_is_rejected():
+    with pytest.raises(ValueError, match="no conditions"):
+        alerts.AlertRule({"name": "Empty", "keywords": ["  "]})
+    with pytest.raises(ValueError, match="unknown keys"):
+        alerts.AlertRule({"name": "Typo", "keyword": ["cloud"]})
+    with pytest.raises(ValueError, match="unknown fields"):
+        alerts.AlertRule({"name": "Field", "keywords": ["cloud"], "fields": ["title"]})
+
+
+def test_run_alerts_writes_the_report(tmp_path):
+    csv_path = tmp_path / "final_combined_data_1_run.csv"
+    csv_path.write_text(
+        "Contract Number,Notice ID,Contract Name,Department,Contract Link,Updated Date Offers Due,File Name\n"
+        "1,N1,Zero Trust Pilot,DEPT OF DEFENSE,https://sam.gov/opp/N1,,\n"
+        "1,,,,,,ZTNA_Plan.pdf\n"
+        "2,N2,Janitorial Services,GSA,https://sam.gov/opp/N2,,\n"
+        "Summary,Total Contracts: 2,,,,,\n",
+        encoding="utf-8"
+    )
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text('[{"name": "ZT", "keywords": ["ztna"], "fields": ["file_names"]}]', encoding="utf-8")
+    report_path = tmp_path / "alerts.csv"
+
+    count = alerts.run_alerts(str(csv_path), str(rules_path), str(tmp_path / "index.sqlite3"), str(report_path))
+
+    assert count == 1
+    assert report_path.read_text(encoding="utf-8").splitlines() == [
+        ",".join(alerts.REPORT_COLUMNS),
+        "ZT,N1,Zero Trust Pilot,DEPT OF DEFENSE,,https://sam.gov/opp/N1,ztna",
+    ]
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from checkpoint import Checkpoint
+
+DETAILS = ([{"File Name": "sow.pdf", "File Link": "https://sam.gov/files/sow", "Updated Date": ""}],
+           "Mar 04, 2025", "", "", "")
+
+
+def page(*notice_ids):
+    return [{"Notice ID": notice_id, "Contract Name": f"Contract {notice_id}"} for notice_id in notice_ids]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoint.jsonl")
+
+
+def test_recording_keeps_only_completed_keys_in_memory(path):
+    checkpoint = Checkpoint(path)
+    checkpoint.record_page(1, page("N1", "N2"))
+    checkpoint.record_contract("N1", DETAILS)
+    checkpoint.close()
+
+    assert checkpoint.completed_pages == {(None, 1)}
+    assert (checkpoint.pages, checkpoint.contracts) == ({}, {})
+    with open(path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+
+
+def test_resume_replays_pages_contracts_and_searches(path):
+    checkpoint = Checkpoint(path)
+    checkpoint.record_page(2, page("N3"))
+    checkpoint.record_page(1, page("N1", "N2"))
+    checkpoint.record_contract("N1", DETAILS)
+    checkpoint.record_search_complete()
+    checkpoint.close()
+
+    resumed = Checkpoint(path, resume=True)
+    resumed.close()
+
+    assert resumed.search_complete
+    assert [contract["Notice ID"] for contract in resumed.search_contracts()] == ["N1", "N2", "N3"]
+    assert resumed.contracts == {"N1": DETAILS}
+    assert resumed.completed_pages == {(None, 1), (None, 2)}
+
+
+def test_search_contracts_by_shard(path):
+    checkpoint = Checkpoint(path)
+    checkpoint.record_page(1, page("B1"), shard="541512")
+    checkpoint.record_page(2, page("A2"), shard="236220")
+    checkpoint.record_page(1, page("A1"), shard="236220")
+    checkpoint.record_search_complete("236220")
+    checkpoint.close()
+
+    resumed = Checkpoint(path, resume=True)
+    resumed.close()
+
+    assert resumed.completed_searches == {"236220"}
+    assert not resumed.search_complete
+    assert [contract["Notice ID"] for contract in resumed.search_contracts("541512")] == ["B1"]
+    assert [contract["Notice ID"] for contract in resumed.search_contracts(all_shards=True)] == ["A1", "A2", "B1"]
+
+
+def test_partially_written_last_line_is_ignored(path):
+    checkpoint = Checkpoint(path)
+    checkpoint.record_page(1, page("N1"))
+    checkpoint.close()
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"type": "page", "shard": null, "page": 2, "contr')
+
+    resumed = Checkpoint(path, resume=True)
+    resumed.close()
+
+    assert list(resumed.pages) == [(None, 1)]
+
+
+def test_fresh_run_starts_over(path):
+    checkpoint = Checkpoint(path)
+    checkpoint.record_page(1, page("N1"))
+    checkpoint.close()
+
+    fresh = Checkpoint(path)
+    fresh.close()
+
+    assert fresh.pages == {}
+    assert os.path.getsize(path) == 0
+
+
+def test_resume_without_a_checkpoint_and_clear(path):
+    checkpoint = Checkpoint(path, resume=True)
+    assert (checkpoint.pages, checkpoint.completed_searches) == ({}, set())
+
+    checkpoint.record_page(1, page("N1"))
+    checkpoint.clear()
+    assert not os.path.exists(path)
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+pytest.importorskip("requests")
+
+import downloads  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+CONTENT = os.urandom(3 * downloads.CHUNK_SIZE + 123)
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def base_url(tmp_path, stub_server):
+    files = tmp_path / "files"
+    files.mkdir()
+    (files / "rfp.pdf").write_bytes(CONTENT)
+    (files / "rfp-copy.pdf").write_bytes(CONTENT)
+    (files / "other.pdf").write_bytes(b"other attachment")
+    return stub_server(str(files))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = downloads.AttachmentStore(str(tmp_path / "store"), timeout=5, retries=2)
+    yield store
+    store.close()
+
+
+def read_object(store, sha256):
+    with open(store.object_path(sha256), "rb") as file:
+        return file.read()
+
+
+def test_download_then_cached(store, base_url):
+    first = store.download(f"{base_url}/rfp.pdf", "N1", "rfp.pdf")
+    assert first["status"] == "downloaded"
+    assert first["sha256"] == SHA256
+    assert read_object(store, SHA256) == CONTENT
+    assert not os.listdir(os.path.join(store.root, "partial"))
+
+    second = store.download(f"{base_url}/rfp.pdf", "N2", "rfp.pdf")
+    assert second["status"] == "cached"
+    assert second["path"] == first["path"]
+
+
+def test_same_content_from_another_url_is_stored_once(store, base_url):
+    assert store.download(f"{base_url}/rfp.pdf", "N1")["status"] == "downloaded"
+    duplicate = store.download(f"{base_url}/rfp-copy.pdf", "N2")
+    assert duplicate["status"] == "deduplicated"
+    assert duplicate["sha256"] == SHA256
+
+    objects = [name for _, _, names in os.walk(os.path.join(store.root, "objects")) for name in names]
+    assert objects == [SHA256]
+    assert not os.listdir(os.path.join(store.root, "partial"))
+
+
+def test_interrupted_download_resumes_with_a_range_request(store, base_url):
+    url = f"{base_url}/rfp.pdf"
+    with open(store.partial_path(url), "wb") as file:
+        file.write(CONTENT[:downloads.CHUNK_SIZE + 7])
+    resumed_before = METRICS.counters.get("downloads_resumed", 0)
+
+    result = store.download(url, "N1")
+
+    assert result["status"] == "downloaded"
+    assert result["sha256"] == SHA256
+    assert read_object(store, SHA256) == CONTENT
+    assert METRICS.counters.get("downloads_resumed", 0) == resumed_before + 1
+
+
+def test_partial_file_that_is_already_complete(store, base_url):
+    url = f"{base_url}/rfp.pdf"
+    with open(store.partial_path(url), "wb") as file:
+        file.write(CONTENT)
+
+    result = store.download(url, "N1")
+
+    assert result["status"] == "downloaded"
+    assert read_object(store, SHA256) == CONTENT
+
+
+def test_missing_file_fails_after_retries(store, base_url):
+    result = store.download(f"{base_url}/missing.pdf", "N1")
+    assert result["status"] == "failed"
+    assert result["sha256"] is None
+
+
+def test_download_attachments_indexes_shared_urls_for_every_notice(store, base_url):
+    attachments = [
+        (f"{base_url}/rfp.pdf", "N1", "rfp.pdf"),
+        (f"{base_url}/other.pdf", "N1", "other.pdf"),
+        (f"{base_url}/rfp.pdf", "N2", "rfp (N2).pdf"),
+    ]
+    results = downloads.download_attachments(store, attachments, max_workers=2)
+
+    assert [result["url"] for result in results] == [url for url, _, _ in attachments]
+    assert results[0] is results[2]
+    with sqlite3.connect(os.path.join(store.root, "index.sqlite3")) as conn:
+        rows = conn.execute("SELECT notice_id, file_name, sha256 FROM files WHERE url = ? ORDER BY notice_id",
+                            (f"{base_url}/rfp.pdf",)).fetchall()
+    assert rows == [("N1", "rfp.pdf", SHA256), ("N2", "rfp (N2).pdf", SHA256)]
@@ -0,0 +1,123 @@
+import csv
+import email
+import gzip
+import io
+import os
+import zipfile
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+import emailer  # noqa: E402
+
+REGION = "us-east-1"
+SENDER = "scraper@example.com"
+BUCKET = "scraping-results"
+RUN = "2025-03-04_09-15-00"
+
+
+@pytest.fixture
+def output_csv(tmp_path):
+    path = tmp_path / f"final_combined_data_1_{RUN}.csv"
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, ["Contract Name", "Notice ID", "Department", "Contract Link", "Contract Number",
+                                       "Original Published Date", "Updated Date Offers Due", "File Name"])
+        writer.writeheader()
+        for number in range(1, 201):
+            writer.writerow({"Contract Name": f"Contract {number}", "Notice ID": f"N{number}", "Department": "DoD",
+                             "Contract Link": f"https://sam.gov/opp/{number}/view", "Contract Number": number,
+                             "File Name": os.urandom(16).hex()})
+        writer.writerow({"Contract Number": "Summary"})
+    return str(path)
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Mocked SES (with a verified sender) and S3 (with the results bucket)."""
+    for name, value in {"AWS_REGION": REGION, "AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                        "EMAIL_SENDER": SENDER, "EMAIL_RECIPIENTS": "a@example.com, b@example.com"}.items():
+        monkeypatch.setenv(name, value)
+    for name in ("S3_BUCKET", "S3_PREFIX", "EMAIL_COMPRESSION", "EMAIL_ATTACHMENT_LIMIT_MB"):
+        monkeypatch.delenv(name, raising=False)
+    with moto.mock_aws():
+        boto3.client("ses", region_name=REGION).verify_email_identity(EmailAddress=SENDER)
+        boto3.client("s3", region_name=REGION).create_bucket(Bucket=BUCKET)
+        yield
+
+
+def sent_messages():
+    from moto.core import DEFAULT_ACCOUNT_ID
+    from moto.ses.models import ses_backends
+    return [email.message_from_string(message.raw_data)
+            for message in ses_backends[DEFAULT_ACCOUNT_ID][REGION].sent_messages]
+
+
+def attachments(message):
+    return [part for part in message.walk() if part.get_filename()]
+
+
+def body_text(message):
+    return next(part.get_payload(decode=True).decode() for part in message.walk()
+                if part.get_content_type() == "text/plain")
+
+
+@pytest.mark.parametrize("compression, extension", [("gzip", ".gz"), ("zip", ".zip"), ("none", "")])
+def test_compress_file_round_trip(output_csv, compression, extension):
+    with open(output_csv, "rb") as file:
+        original = file.read()
+    compressed_path, name = emailer.compress_file(output_csv, compression)
+    try:
+        assert name == os.path.basename(output_csv) + extension
+        if compression == "gzip":
+            with gzip.open(compressed_path, "rb") as file:
+                assert file.read() == original
+            assert os.path.getsize(compressed_path) < len(original)
+        elif compression == "zip":
+            with zipfile.ZipFile(compressed_path) as archive:
+                assert archive.read(os.path.basename(output_csv)) == original
+        else:
+            with open(compressed_path, "rb") as file:
+                assert file.read() == original
+    finally:
+        os.remove(compressed_path)
+
+
+def test_small_output_is_attached_compressed(aws, output_csv):
+    assert emailer.send_email_with_attachment(output_csv, RUN)
+
+    [message] = sent_messages()
+    assert message["Subject"] == f"Scraping Results - {RUN}"
+    [attachment] = attachments(message)
+    assert attachment.get_filename() == os.path.basename(output_csv) + ".gz"
+    with open(output_csv, "rb") as file:
+        assert gzip.decompress(attachment.get_payload(decode=True)) == file.read()
+
+
+def test_large_output_is_linked_from_s3(aws, monkeypatch, output_csv):
+    monkeypatch.setenv("S3_BUCKET", BUCKET)
+    monkeypatch.setenv("EMAIL_COMPRESSION", "zip")
+    monkeypatch.setenv("EMAIL_ATTACHMENT_LIMIT_MB", "0.001")  # About 1 KB, below the compressed CSV
+
+    assert emailer.send_email_with_attachment(output_csv, RUN)
+
+    key = f"scraping-results/{os.path.basename(output_csv)}.zip"
+    s3 = boto3.client("s3", region_name=REGION)
+    uploaded = s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+    with open(output_csv, "rb") as file, zipfile.ZipFile(io.BytesIO(uploaded)) as archive:
+        assert archive.read(os.path.basename(output_csv)) == file.read()
+
+    [message] = sent_messages()
+    assert attachments(message) == []
+    text = body_text(message)
+    assert "too large to attach" in text
+    assert BUCKET in text and key.split("/")[-1] in text
+    assert "the link expires in 7 days" in text  # EMAIL_LINK_EXPIRY_HOURS defaults to 168
+
+
+def test_large_output_without_a_bucket_is_not_sent(aws, monkeypatch, output_csv):
+    monkeypatch.setenv("EMAIL_ATTACHMENT_LIMIT_MB", "0.001")
+
+    assert not emailer.send_email_with_attachment(output_csv, RUN)
+    assert sent_messages() == []
@@ -0,0 +1,112 @@
+import pytest
+
+import retry_policy
+from metrics import METRICS
+
+
+class Clock:
+    """Stands in for time.monotonic and time.sleep; sleeping just moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry_policy.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(retry_policy.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: (low, high))
+    policy = retry_policy.RetryPolicy(attempts=0, base_delay=2, max_delay=20)
+
+    assert policy.attempts == 1
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [(0, 2), (0, 4), (0, 8), (0, 16), (0, 20)]
+
+
+def test_rate_limiter_spaces_calls_out(clock):
+    limiter = retry_policy.RateLimiter(4)
+    for _ in range(3):
+        limiter.wait()
+    assert clock.slept == [0.25, 0.25]
+
+    retry_policy.RateLimiter(0).wait()
+    assert clock.slept == [0.25, 0.25]
+
+
+def test_adaptive_rate_halves_on_trouble_and_recovers_step_by_step(clock):
+    limiter = retry_policy.AdaptiveRateLimiter(2, min_rate=0.5, target_latency=10)
+
+    limiter.record(0.5, ok=False)
+    assert limiter.rate == 1
+    limiter.record(0.5, ok=False)  # Within target_latency of the last decrease
+    assert limiter.rate == 1
+
+    clock.now += 11
+    limiter.record(12)  # Too slow
+    assert (limiter.rate, limiter.interval) == (0.5, 2)
+    clock.now += 11
+    limiter.record(0.5, ok=False)
+    assert limiter.rate == 0.5  # Never below min_rate
+
+    for _ in range(10):
+        limiter.record(0.5)
+    assert limiter.rate == 2
+
+
+def test_adaptive_rate_of_zero_stays_unlimited(clock):
+    limiter = retry_policy.AdaptiveRateLimiter(0)
+    limiter.record(100, ok=False)
+    limiter.wait()
+    assert (limiter.rate, clock.slept) == (0, [])
+
+
+def test_circuit_breaker_opens_pauses_and_resets(clock):
+    breaker = retry_policy.CircuitBreaker("sam.gov", window=4, failure_rate=0.5, cooldown=30)
+    opens_before = METRICS.counters.get("circuit_breaker_opens", 0)
+
+    breaker.record(False)  # Fewer than min_calls (window // 2) recorded
+    assert not breaker.is_open
+    breaker.record(False)
+    assert breaker.is_open
+    assert METRICS.counters.get("circuit_breaker_opens", 0) == opens_before + 1
+
+    clock.now += 10
+    breaker.wait()
+    assert clock.slept == [20]
+    assert not breaker.is_open
+
+    # The window starts over once the breaker has opened
+    breaker.record(True)
+    breaker.record(True)
+    breaker.record(False)
+    assert not breaker.is_open
+
+
+def test_disabled_circuit_breaker_never_opens(clock):
+    breaker = retry_policy.CircuitBreaker("sam.gov", window=2, failure_rate=0)
+    for _ in range(5):
+        breaker.record(False)
+    breaker.wait()
+    assert not breaker.is_open
+    assert clock.slept == []
+
+
+def test_one_breaker_per_host():
+    breakers = retry_policy.HostCircuitBreakers(window=4, failure_rate=0.5, cooldown=5)
+    sam = breakers.for_url("https://SAM.gov/opp/1/view")
+
+    assert breakers.for_url("https://sam.gov/api/prod/opps") is sam
+    assert breakers.for_url("https://s3.amazonaws.com/file.pdf") is not sam
+    assert (sam.host, sam.cooldown) == ("sam.gov", 5)
@@ -0,0 +1,98 @@
+import csv
+import os
+
+import pytest
+
+pytest.importorskip("pandas")
+
+import run_diff  # noqa: E402
+
+COLUMNS = ["Contract Number", "Contract Name", "Notice ID", "Department", "Contract Link", "Last Modified Date",
+           "General Published Date", "Original Published Date", "Updated Date Offers Due",
+           "Original Date Offers Due", "File Name", "File Link", "Updated Date"]
+
+
+def notice(number, notice_id, due="Apr 04, 2025 05:00 pm EST", name=None, attachments=()):
+    """Combined CSV rows of one contract: the contract row carries its first attachment."""
+    contract = {"Contract Number": number, "Contract Name": name or f"Contract {notice_id}", "Notice ID": notice_id,
+                "Department": "DoD", "Contract Link": f"https://sam.gov/opp/{notice_id}/view",
+                "Last Modified Date": "Mar 04, 2025", "Updated Date Offers Due": due,
+                "Original Date Offers Due": "Apr 04, 2025 05:00 pm EST"}
+    rows = [dict(contract)]
+    for index, (file_name, updated) in enumerate(attachments):
+        if index:
+            rows.append({"Contract Number": number})
+        rows[-1].update({"File Name": file_name, "File Link": f"https://sam.gov/files/{notice_id}/{file_name}",
+                         "Updated Date": updated})
+    return rows
+
+
+def write_run(path, *notices, columns=COLUMNS):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, columns, extrasaction="ignore")
+        writer.writeheader()
+        for rows in notices:
+            writer.writerows(rows)
+        writer.writerow({"Contract Number": "Summary", "Contract Name": f"Total Contracts: {len(notices)}"})
+    return str(path)
+
+
+def changes(report):
+    return [(row["Change"], row["Notice ID"], row["File Link"].rsplit("/", 1)[-1], row["Previous"], row["Current"])
+            for row in report.to_dict("records")]
+
+
+def test_every_change_type(tmp_path):
+    previous = write_run(
+        tmp_path / "previous.csv",
+        notice(1, "N1", attachments=[("sow.pdf", "Mar 01, 2025"), ("old.pdf", "")]),
+        notice(2, "N2"),
+        notice(3, "N3", attachments=[("rfp.pdf", "Mar 01, 2025")]),
+        notice(4, "N4"),
+    )
+    current = write_run(
+        tmp_path / "current.csv",
+        notice(1, "N1", attachments=[("sow.pdf", "Mar 05, 2025"), ("qa.pdf", "")]),
+        notice(2, "N2", due="Apr 11, 2025 05:00 pm EST"),
+        notice(3, "N3", name="Renamed", attachments=[("rfp.pdf", "Mar 01, 2025")]),
+        notice(4, "N5", attachments=[("new.pdf", "")]),
+    )
+
+    assert changes(run_diff.diff_runs(previous, current)) == [
+        ("new_notice", "N5", "", "", ""),
+        ("removed_notice", "N4", "", "", ""),
+        ("due_date_moved", "N2", "", "Apr 04, 2025 05:00 pm EST", "Apr 11, 2025 05:00 pm EST"),
+        ("notice_updated", "N3", "", "", "Contract Name"),
+        ("attachment_added", "N1", "qa.pdf", "", "qa.pdf"),
+        ("attachment_removed", "N1", "old.pdf", "old.pdf", ""),
+        ("attachment_updated", "N1", "sow.pdf", "sow.pdf (Mar 01, 2025)", "sow.pdf (Mar 05, 2025)"),
+    ]
+
+
+def test_identical_runs_have_no_changes(tmp_path):
+    rows = notice(1, "N1", attachments=[("sow.pdf", "Mar 01, 2025")])
+    report = run_diff.diff_runs(write_run(tmp_path / "a.csv", rows), write_run(tmp_path / "b.csv", rows))
+
+    assert report.empty
+    assert run_diff.change_counts(report) == dict.fromkeys(run_diff.CHANGE_TYPES, 0)
+
+
+def test_fields_missing_from_the_older_csv_are_not_compared(tmp_path):
+    legacy_columns = [column for column in COLUMNS if column != "Last Modified Date"]
+    previous = write_run(tmp_path / "previous.csv", notice(1, "N1"), columns=legacy_columns)
+    current_rows = notice(1, "N1")
+    current_rows[0]["Last Modified Date"] = "Mar 09, 2025"
+
+    assert run_diff.diff_runs(previous, write_run(tmp_path / "current.csv", current_rows)).empty
+
+
+def test_write_change_report_compares_with_the_last_run(tmp_path):
+    first = write_run(tmp_path / "final_combined_data_1_run1.csv", notice(1, "N1"))
+    assert run_diff.write_change_report(first, "run1") == (None, None)
+
+    second = write_run(tmp_path / "final_combined_data_2_run2.csv", notice(1, "N1"), notice(2, "N2"))
+    report_path, counts = run_diff.write_change_report(second, "run2")
+
+    assert os.path.basename(report_path) == "changes_1_run2.csv"
+    assert counts == dict(dict.fromkeys(run_diff.CHANGE_TYPES, 0), new_notice=1)
+    assert run_diff.previous_output_path(str(tmp_path), str(tmp_path / "final_combined_data_3_run3.csv")) == second
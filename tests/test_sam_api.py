@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("requests")
+
+import sam_api  # noqa: E402
+
+OPPORTUNITY_ID = "6bffc1b37cef4ff9aed00ef852712cf6"
+CONTRACT_LINK = f"https://sam.gov/opp/{OPPORTUNITY_ID}/view"
+
+
+@pytest.fixture
+def client(stub_server):
+    client = sam_api.SamApiClient(stub_server(), timeout=5)
+    yield client
+    client.close()
+
+
+def test_opportunity_id_from_link():
+    assert sam_api.opportunity_id_from_link(CONTRACT_LINK) == OPPORTUNITY_ID
+    assert sam_api.opportunity_id_from_link("https://sam.gov/search/?page=1") is None
+    assert sam_api.opportunity_id_from_link(None) is None
+
+
+def test_format_sam_datetime():
+    assert sam_api.format_sam_datetime("2025-03-04T21:01:00.000+00:00", "America/Chicago") == "Mar 04, 2025 03:01 pm CST"
+    assert sam_api.format_sam_datetime("2025-02-25T17:44:00.000+00:00", date_only=True) == "Feb 25, 2025"
+    assert sam_api.format_sam_datetime("") == ""
+    assert sam_api.format_sam_datetime("not a date") == "not a date"
+
+
+def test_fetch_details_matches_scrape_attachments(client):
+    documents, general, original, updated_due, original_due = client.fetch_details(CONTRACT_LINK)
+
+    assert general == "Mar 04, 2025 03:01 pm CST"
+    assert original == "Feb 25, 2025 11:44 am CST"
+    assert updated_due == "Mar 12, 2025 03:00 pm CDT"
+    assert original_due == "Mar 12, 2025 03:00 pm CDT"
+    assert [document["File Name"] for document in documents] == [
+        "W912NW-25-Q-0046 Questions and Answers.pdf",
+        "W912NW-25-Q-0046 SCADA INTEGRATION.pdf",
+    ]
+    assert documents[0]["File Link"] == client.base_url + sam_api.FILE_DOWNLOAD_PATH.format(
+        resource_id="30943358da71484783b4599b448904e8"
+    )
+    assert [document["Updated Date"] for document in documents] == ["Mar 04, 2025", "Feb 25, 2025"]
+
+
+def test_fetch_details_falls_back_when_missing(client):
+    assert client.fetch_details("https://sam.gov/opp/0000/view") is None
+    assert client.fetch_details("https://sam.gov/search/") is None
+
+
+def test_fetch_details_falls_back_on_connection_errors():
+    client = sam_api.SamApiClient("http://127.0.0.1:9", timeout=1)
+    try:
+        assert client.fetch_details(CONTRACT_LINK) is None
+    finally:
+        client.close()
+
+
+def test_fetch_attachments_skips_deleted_and_keeps_links(tmp_path, stub_server):
+    resources = tmp_path / "api/prod/opps/v3/opportunities/abc/resources.json"
+    resources.parent.mkdir(parents=True)
+    resources.write_text(
+        '{"_embedded": {"opportunityAttachmentList": [{"attachments": ['
+        '{"resourceId": "r1", "name": "kept.pdf", "type": "file", "deletedFlag": "0"},'
+        '{"resourceId": "r2", "name": "deleted.pdf", "type": "file", "deletedFlag": "1"},'
+        '{"uri": "https://example.com/spec", "type": "link", "deletedFlag": "0"}'
+        ']}]}}'
+    )
+    client = sam_api.SamApiClient(stub_server(str(tmp_path)))
+    try:
+        documents = client.fetch_attachments("abc")
+    finally:
+        client.close()
+    assert [(document["File Name"], document["File Link"]) for document in documents] == [
+        ("kept.pdf", client.base_url + sam_api.FILE_DOWNLOAD_PATH.format(resource_id="r1")),
+        ("https://example.com/spec", "https://example.com/spec"),
+    ]
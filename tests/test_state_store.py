@@ -0,0 +1,68 @@
+import pytest
+
+from state_store import StateStore, attachment_fingerprint
+
+SOW = {"File Name": "sow.pdf", "File Link": "https://sam.gov/files/sow", "Updated Date": "Mar 01, 2025"}
+QA = {"File Name": "qa.pdf", "File Link": "https://sam.gov/files/qa", "Updated Date": "Mar 03, 2025"}
+DETAILS = ([SOW], "Mar 04, 2025 03:01 pm CST", "Mar 03, 2025 09:15 am CST", "Apr 04, 2025 05:00 pm EST", "")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / "state.sqlite3"))
+    yield store
+    store.close()
+
+
+def scraped_at(store, notice_id, timestamp):
+    store.conn.execute("UPDATE notices SET last_scraped = ? WHERE notice_id = ?", (timestamp, notice_id))
+    store.conn.commit()
+
+
+def test_unchanged_once_scraped_on_a_later_day(store):
+    store.record("N1", "Mar 04, 2025", DETAILS)
+    scraped_at(store, "N1", "2025-03-05T08:00:00")
+
+    assert store.is_unchanged("N1", "Mar 04, 2025")
+    assert not store.is_unchanged("N1", "Mar 06, 2025")  # Modified since
+    assert not store.is_unchanged("N2", "Mar 04, 2025")  # Never scraped
+
+
+def test_scraped_on_the_modified_day_counts_as_changed(store):
+    # It may have been modified again later that day
+    store.record("N1", "Mar 04, 2025", DETAILS)
+    scraped_at(store, "N1", "2025-03-04T23:59:00")
+
+    assert not store.is_unchanged("N1", "Mar 04, 2025")
+
+
+@pytest.mark.parametrize("notice_id, last_modified", [("", "Mar 04, 2025"), ("N1", ""), ("N1", "yesterday")])
+def test_missing_or_unparseable_keys_are_never_unchanged(store, notice_id, last_modified):
+    store.record("N1", last_modified, DETAILS)
+    scraped_at(store, "N1", "2025-03-09T08:00:00")
+
+    assert not store.is_unchanged(notice_id, last_modified)
+
+
+def test_cached_details_round_trip(store, tmp_path):
+    store.record("N1", "Mar 04, 2025", DETAILS)
+    store.close()
+
+    reopened = StateStore(str(tmp_path / "state.sqlite3"))
+    try:
+        assert reopened.cached_details("N1") == DETAILS
+        assert reopened.cached_details("N2") is None
+    finally:
+        reopened.close()
+
+
+def test_record_reports_attachment_changes(store):
+    assert store.record("N1", "Mar 04, 2025", ([SOW, QA], "", "", "", "")) is False  # First scrape
+    assert store.record("N1", "Mar 05, 2025", ([QA, SOW], "", "", "", "")) is False  # Same list, other order
+    assert store.record("N1", "Mar 06, 2025", ([SOW], "", "", "", "")) is True
+    assert store.record("", "Mar 06, 2025", DETAILS) is False
+
+
+def test_attachment_fingerprint_ignores_order_but_not_dates():
+    assert attachment_fingerprint([SOW, QA]) == attachment_fingerprint([QA, SOW])
+    assert attachment_fingerprint([SOW]) != attachment_fingerprint([dict(SOW, **{"Updated Date": "Mar 02, 2025"})])
@@ -0,0 +1,161 @@
+"""
+WorkQueue tests against a real Postgres database. Set TEST_POSTGRES_DSN (a libpq connection
+string, e.g. "host=localhost dbname=postgres user=postgres") to run them; each test works in a
+schema of its own that is dropped afterwards.
+"""
+import os
+import uuid
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from work_queue import WorkQueue  # noqa: E402
+
+DSN = os.getenv("TEST_POSTGRES_DSN")
+pytestmark = pytest.mark.skipif(not DSN, reason="TEST_POSTGRES_DSN is not set")
+
+RUN = "2025-03-04_09-15-00"
+
+
+@pytest.fixture
+def connect():
+    """Open connections that all use one throwaway schema."""
+    schema = f"test_work_queue_{uuid.uuid4().hex[:12]}"
+    connections = []
+
+    def open_connection():
+        try:
+            conn = psycopg2.connect(DSN)
+        except psycopg2.OperationalError as e:
+            pytest.skip(f"Postgres is not reachable: {e}")
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            cursor.execute(f"SET search_path TO {schema}")
+        conn.commit()
+        connections.append(conn)
+        return conn
+
+    yield open_connection
+    with connections[0].cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+    connections[0].commit()
+    for conn in connections:
+        conn.close()
+
+
+@pytest.fixture
+def work_queue(connect):
+    work_queue = WorkQueue(connect(), lease_seconds=60, max_attempts=2)
+    work_queue.create_run(RUN)
+    work_queue.enqueue(RUN, [({"Notice ID": f"N{position}"}, None) for position in range(1, 4)])
+    return work_queue
+
+
+def expire_leases(work_queue):
+    work_queue._execute("UPDATE scrape_jobs SET lease_expires_at = now() - interval '1 second' "
+                        "WHERE status = 'running'")
+
+
+def test_claims_pending_jobs_in_order(work_queue):
+    work_queue.enqueue(RUN, [({"Notice ID": "N4"}, ([], "", "", "", ""))])  # Details known: done already
+
+    [(_, _, position, contract)] = work_queue.claim("worker-1", RUN)
+    claimed = work_queue.claim("worker-1", RUN, limit=10)
+
+    assert (position, contract["Notice ID"]) == (1, "N1")
+    assert sorted((position, contract["Notice ID"]) for _, _, position, contract in claimed) == [
+        (2, "N2"), (3, "N3")
+    ]
+    assert work_queue.claim("worker-1", RUN) == []
+    assert work_queue.status_counts(RUN) == {"pending": 0, "running": 3, "done": 1, "failed": 0}
+
+
+def test_resumed_search_appends_only_new_notices(work_queue):
+    # The search ran again and now finds N1 gone, N5 ahead of N2 and N3
+    added = work_queue.enqueue(RUN, [({"Notice ID": "N5"}, None), ({"Notice ID": "N2"}, None),
+                                     ({"Notice ID": "N3"}, None), ({"Notice ID": "N5"}, None)])
+
+    claimed = work_queue.claim("worker-1", RUN, limit=10)
+
+    assert added == 1
+    assert sorted((position, contract["Notice ID"]) for _, _, position, contract in claimed) == [
+        (1, "N1"), (2, "N2"), (3, "N3"), (4, "N5")
+    ]
+
+
+def test_concurrent_workers_never_claim_the_same_job(work_queue, connect):
+    other_queue = WorkQueue(connect(), lease_seconds=60, max_attempts=2)
+
+    first = work_queue.claim("worker-1", RUN, limit=2)
+    second = other_queue.claim("worker-2", RUN, limit=2)
+
+    assert len(first) == 2 and len(second) == 1
+    assert not {job_id for job_id, *_ in first} & {job_id for job_id, *_ in second}
+
+
+def test_claims_only_jobs_of_the_given_run(work_queue):
+    assert work_queue.claim("worker-1", "another-run", limit=10) == []
+    assert len(work_queue.claim("worker-1", RUN, limit=10)) == 3
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(work_queue):
+    [(job_id, _, position, _)] = work_queue.claim("crashed-worker", RUN)
+    assert work_queue.reclaim_expired(RUN) == 0
+
+    expire_leases(work_queue)
+    assert work_queue.reclaim_expired("another-run") == 0
+    assert work_queue.reclaim_expired(RUN) == 1
+
+    [(reclaimed_id, _, reclaimed_position, _)] = work_queue.claim("worker-2", RUN)
+    assert (reclaimed_id, reclaimed_position) == (job_id, position)
+    # The crashed worker lost its lease, so its late result is rejected
+    assert not work_queue.complete(job_id, "crashed-worker", ([], "", "", "", ""))
+    assert work_queue.complete(job_id, "worker-2", ([], "Mar 04, 2025", "", "", ""))
+
+
+def test_heartbeat_extends_the_lease(work_queue):
+    [(job_id, *_)] = work_queue.claim("worker-1", RUN)
+    expire_leases(work_queue)
+
+    assert work_queue.heartbeat("worker-1", [job_id]) == 1
+    assert work_queue.heartbeat("worker-2", [job_id]) == 0  # Only the lease holder can extend it
+    assert work_queue.reclaim_expired(RUN) == 0
+
+
+def test_expired_lease_fails_the_job_after_its_last_attempt(work_queue):
+    for _ in range(2):
+        [(job_id, *_)] = work_queue.claim("worker-1", RUN)
+        expire_leases(work_queue)
+        work_queue.reclaim_expired(RUN)
+
+    assert work_queue.status_counts(RUN) == {"pending": 2, "running": 0, "done": 0, "failed": 1}
+
+
+def test_failed_attempts_are_retried_then_failed(work_queue):
+    [(job_id, *_)] = work_queue.claim("worker-1", RUN)
+    assert work_queue.fail(job_id, "worker-1", "timeout") == "pending"
+    assert job_id in [claimed_id for claimed_id, *_ in work_queue.claim("worker-1", RUN, limit=10)]
+    assert work_queue.fail(job_id, "worker-1", "timeout") == "failed"
+
+
+def test_results_in_position_order_and_complete_run(work_queue):
+    for job_id, _, position, _ in work_queue.claim("worker-1", RUN, limit=10)[::-1]:
+        work_queue.complete(job_id, "worker-1", ([], f"published {position}", "", "", ""))
+
+    results = list(work_queue.iter_results(RUN))
+    assert [(position, details[1], scraped) for position, _, details, scraped in results] == [
+        (1, "published 1", True), (2, "published 2", True), (3, "published 3", True)
+    ]
+
+    work_queue.complete_run(RUN)
+    assert work_queue.latest_open_run() is None
+    assert work_queue.status_counts(RUN) == {"pending": 0, "running": 0, "done": 0, "failed": 0}
+
+
+def test_new_run_closes_abandoned_runs(work_queue):
+    work_queue.create_run("next-run")
+
+    assert work_queue.latest_open_run() == ("next-run", False)
+    assert work_queue.status_counts(RUN) == {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    assert work_queue.claim("worker-1", RUN) == []
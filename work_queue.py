@@ -0,0 +1,277 @@
+"""
+Postgres-backed job queue for spreading contract detail scraping over any number of processes and hosts.
+
+  scrape_queue_runs  one row per coordinated run: whether its search has finished and the run has completed
+  scrape_jobs        one row per notice of a run, in result order (position = Contract Number)
+
+Job life cycle: the coordinator enqueues search results as "pending" (or "done" straight away
+when their details are already known). A worker claims a batch with FOR UPDATE SKIP LOCKED,
+which marks the jobs "running" under a lease it keeps extending with heartbeats while it scrapes.
+Each job ends "done" with its details, or goes back to "pending" (after a backoff) when the
+scrape fails, until it has used up its attempts and becomes "failed". Jobs whose lease expired
+(the worker crashed or hung) are reclaimed the same way. Jobs are only claimed and reclaimed
+within one run, and starting a run closes older runs that never completed, so workers never
+scrape jobs of an abandoned run into a new run's output. Every operation is one short
+transaction, so one WorkQueue can be shared by the threads of a worker process.
+"""
+import logging
+import threading
+
+from psycopg2.extras import Json, execute_values
+
+# Workers starting together would race on CREATE TABLE IF NOT EXISTS, so the schema is created under a lock
+SCHEMA_LOCK_ID = 7242031
+
+SCHEMA_SQL = """
+SELECT pg_advisory_xact_lock(%(lock_id)s);
+
+CREATE TABLE IF NOT EXISTS scrape_queue_runs (
+    run_timestamp TEXT PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    search_complete BOOLEAN NOT NULL DEFAULT FALSE,
+    completed_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    job_id BIGSERIAL PRIMARY KEY,
+    run_timestamp TEXT NOT NULL REFERENCES scrape_queue_runs (run_timestamp) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    notice_id TEXT,
+    contract JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    worker_id TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    details JSONB,
+    error TEXT,
+    scraped BOOLEAN NOT NULL DEFAULT FALSE,
+    UNIQUE (run_timestamp, position)
+);
+
+-- A re-run search enqueues each notice once; an index so it also applies to existing tables
+CREATE UNIQUE INDEX IF NOT EXISTS scrape_jobs_notice_idx ON scrape_jobs (run_timestamp, notice_id);
+CREATE INDEX IF NOT EXISTS scrape_jobs_pending_idx ON scrape_jobs (available_at, job_id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS scrape_jobs_running_idx ON scrape_jobs (lease_expires_at) WHERE status = 'running';
+"""
+
+CLAIM_SQL = """
+UPDATE scrape_jobs
+SET status = 'running', worker_id = %(worker_id)s, attempts = attempts + 1,
+    lease_expires_at = now() + make_interval(secs => %(lease)s), heartbeat_at = now()
+WHERE job_id IN (
+    SELECT job_id FROM scrape_jobs
+    WHERE status = 'pending' AND available_at <= now() AND run_timestamp = %(run_timestamp)s
+    ORDER BY available_at, job_id
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING job_id, run_timestamp, position, contract
+"""
+
+# Expired leases go back to the queue, or fail once the job has used up its attempts
+RECLAIM_SQL = """
+UPDATE scrape_jobs
+SET status = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'pending' END,
+    error = 'Lease of worker ' || coalesce(worker_id, '?') || ' expired',
+    worker_id = NULL, lease_expires_at = NULL
+WHERE job_id IN (
+    SELECT job_id FROM scrape_jobs
+    WHERE status = 'running' AND lease_expires_at < now() AND run_timestamp = %(run_timestamp)s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING job_id
+"""
+
+
+class WorkQueue:
+    """Queue operations on one psycopg2 connection; every call runs and commits its own transaction."""
+
+    def __init__(self, conn, lease_seconds=300, max_attempts=3):
+        self.conn = conn
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._execute(SCHEMA_SQL, {"lock_id": SCHEMA_LOCK_ID})
+
+    def _execute(self, query, params=None, fetch=False):
+        with self._lock:
+            try:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall() if fetch else cursor.rowcount
+                self.conn.commit()
+                return rows
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    # Coordinator side
+
+    def create_run(self, run_timestamp):
+        """Register a run, closing (and dropping the jobs of) any older run that never completed."""
+        abandoned = self._execute(
+            "UPDATE scrape_queue_runs SET completed_at = now() "
+            "WHERE completed_at IS NULL AND run_timestamp <> %s RETURNING run_timestamp",
+            (run_timestamp,), fetch=True
+        )
+        for (abandoned_run,) in abandoned:
+            self._execute("DELETE FROM scrape_jobs WHERE run_timestamp = %s", (abandoned_run,))
+            logging.warning(f"Closed the abandoned queue run {abandoned_run}.")
+        self._execute(
+            "INSERT INTO scrape_queue_runs (run_timestamp) VALUES (%s) ON CONFLICT (run_timestamp) DO NOTHING",
+            (run_timestamp,)
+        )
+
+    def latest_open_run(self):
+        """Timestamp and search state of the most recent run that has not completed, or None."""
+        rows = self._execute(
+            "SELECT run_timestamp, search_complete FROM scrape_queue_runs "
+            "WHERE completed_at IS NULL ORDER BY created_at DESC LIMIT 1",
+            fetch=True
+        )
+        return rows[0] if rows else None
+
+    def enqueue(self, run_timestamp, jobs):
+        """
+        Add (contract, details or None) jobs to a run, after its last position. Jobs with details are
+        stored as done. Notices already in the run are left alone and take no position, so a resumed
+        search can enqueue its results again without duplicating or skipping any.
+        Returns the number of jobs added.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return 0
+        with self._lock:
+            try:
+                with self.conn.cursor() as cursor:
+                    # Serializes enqueues of the run, so positions are handed out once
+                    cursor.execute("SELECT 1 FROM scrape_queue_runs WHERE run_timestamp = %s FOR UPDATE",
+                                   (run_timestamp,))
+                    notice_ids = [contract.get("Notice ID") for contract, _ in jobs if contract.get("Notice ID")]
+                    cursor.execute(
+                        "SELECT notice_id FROM scrape_jobs WHERE run_timestamp = %s AND notice_id = ANY(%s)",
+                        (run_timestamp, notice_ids)
+                    )
+                    seen = {notice_id for (notice_id,) in cursor.fetchall()}
+                    cursor.execute("SELECT coalesce(max(position), 0) FROM scrape_jobs WHERE run_timestamp = %s",
+                                   (run_timestamp,))
+                    position = cursor.fetchone()[0]
+                    rows = []
+                    for contract, details in jobs:
+                        notice_id = contract.get("Notice ID") or None
+                        if notice_id in seen:
+                            continue
+                        if notice_id:
+                            seen.add(notice_id)
+                        position += 1
+                        rows.append((
+                            run_timestamp, position, notice_id, Json(contract),
+                            "done" if details is not None else "pending",
+                            Json(list(details)) if details is not None else None
+                        ))
+                    if rows:
+                        execute_values(
+                            cursor,
+                            "INSERT INTO scrape_jobs (run_timestamp, position, notice_id, contract, status, details) "
+                            "VALUES %s",
+                            rows
+                        )
+                self.conn.commit()
+                return len(rows)
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def mark_search_complete(self, run_timestamp):
+        self._execute("UPDATE scrape_queue_runs SET search_complete = TRUE WHERE run_timestamp = %s",
+                      (run_timestamp,))
+
+    def status_counts(self, run_timestamp):
+        """Number of jobs of a run in each status."""
+        rows = self._execute(
+            "SELECT status, count(*) FROM scrape_jobs WHERE run_timestamp = %s GROUP BY status",
+            (run_timestamp,), fetch=True
+        )
+        counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def iter_results(self, run_timestamp, batch_size=1000):
+        """
+        Yield (position, contract, details or None, scraped) for every finished job of a run in
+        position order, streamed with a server-side cursor. Failed jobs have no details.
+        The queue's connection is held until the iteration finishes.
+        """
+        with self._lock:
+            try:
+                with self.conn.cursor(name="scrape_results") as cursor:
+                    cursor.itersize = batch_size
+                    cursor.execute(
+                        "SELECT position, contract, details, scraped FROM scrape_jobs "
+                        "WHERE run_timestamp = %s AND status IN ('done', 'failed') ORDER BY position",
+                        (run_timestamp,)
+                    )
+                    for position, contract, details, scraped in cursor:
+                        yield position, contract, tuple(details) if details is not None else None, scraped
+            finally:
+                self.conn.rollback()
+
+    def complete_run(self, run_timestamp):
+        """Mark a run as completed and drop its jobs (their results are in the CSV and the database)."""
+        self._execute("DELETE FROM scrape_jobs WHERE run_timestamp = %s", (run_timestamp,))
+        self._execute("UPDATE scrape_queue_runs SET completed_at = now() WHERE run_timestamp = %s",
+                      (run_timestamp,))
+
+    # Shared by the coordinator and workers
+
+    def reclaim_expired(self, run_timestamp):
+        """Return jobs of a run whose lease expired to the queue. Returns the number of reclaimed jobs."""
+        rows = self._execute(RECLAIM_SQL, {"max_attempts": self.max_attempts, "run_timestamp": run_timestamp},
+                             fetch=True)
+        if rows:
+            logging.warning(f"Reclaimed {len(rows)} jobs whose worker stopped sending heartbeats.")
+        return len(rows)
+
+    # Worker side
+
+    def claim(self, worker_id, run_timestamp, limit=1):
+        """Claim up to `limit` pending jobs of a run. Returns a list of (job_id, run_timestamp, position, contract)."""
+        return self._execute(
+            CLAIM_SQL,
+            {"worker_id": worker_id, "run_timestamp": run_timestamp, "lease": self.lease_seconds, "limit": limit},
+            fetch=True
+        )
+
+    def heartbeat(self, worker_id, job_ids):
+        """Extend the leases of jobs still held by `worker_id`."""
+        if not job_ids:
+            return 0
+        return self._execute(
+            "UPDATE scrape_jobs SET heartbeat_at = now(), lease_expires_at = now() + make_interval(secs => %s) "
+            "WHERE job_id = ANY(%s) AND worker_id = %s AND status = 'running'",
+            (self.lease_seconds, list(job_ids), worker_id)
+        )
+
+    def complete(self, job_id, worker_id, details):
+        """Store the details of a job. Returns False if the job's lease was lost to another worker."""
+        return self._execute(
+            "UPDATE scrape_jobs SET status = 'done', details = %s, scraped = TRUE, error = NULL, "
+            "lease_expires_at = NULL WHERE job_id = %s AND worker_id = %s AND status = 'running'",
+            (Json(list(details)), job_id, worker_id)
+        ) == 1
+
+    def fail(self, job_id, worker_id, error, retry_delay=0):
+        """
+        Record a failed attempt: the job is retried after `retry_delay` seconds, or marked
+        failed once it has used up its attempts. Returns the job's new status.
+        """
+        rows = self._execute(
+            "UPDATE scrape_jobs SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END, "
+            "error = %s, worker_id = NULL, lease_expires_at = NULL, "
+            "available_at = now() + make_interval(secs => %s) "
+            "WHERE job_id = %s AND worker_id = %s AND status = 'running' RETURNING status",
+            (self.max_attempts, str(error), retry_delay, job_id, worker_id), fetch=True
+        )
+        return rows[0][0] if rows else None